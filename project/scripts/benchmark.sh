@@ -0,0 +1,30 @@
+#!/bin/bash
+
+##################################################################
+##  Constants                                                   ##
+##################################################################
+
+INSTANCE_FOLDER_PATH="data/original"
+RESULTS_PATH="data/benchmarks/results.json"
+BASELINE_PATH="data/benchmarks/baseline.json"
+# Numbers of iterations, so the solutions don't depend on how fast
+# the machine is and only throughput is compared loosely.
+CHECKPOINTS=(100 500)
+SEED=0
+RUNS=3
+
+
+##################################################################
+##  Functionality                                               ##
+##################################################################
+
+# Pass --save_baseline to record a new baseline instead of comparing
+# against the current one.
+python3 src/benchmark.py --instance_folder_path $INSTANCE_FOLDER_PATH \
+                         --results_path $RESULTS_PATH \
+                         --baseline_path $BASELINE_PATH \
+                         --iterations \
+                         --checkpoints $(echo ${CHECKPOINTS[@]}) \
+                         --seed $SEED \
+                         --runs $RUNS \
+                         "$@"
@@ -0,0 +1,192 @@
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .objective import Objective
+from .route import Route
+
+ACCEPTANCE_CRITERIA = (
+    "improvement",
+    "annealing",
+    "record_to_record",
+    "late_acceptance",
+)
+
+
+class AcceptanceCriterion:
+    def __init__(self, initial_cost: float):
+        self._current_cost = float(initial_cost)
+        self._best_cost = float(initial_cost)
+
+    # region Properties
+    @property
+    def current_cost(self) -> float:
+        return self._current_cost
+
+    @property
+    def best_cost(self) -> float:
+        return self._best_cost
+
+    # endregion
+
+    def is_acceptable(self, candidate_cost: float) -> bool:
+        return candidate_cost < self._current_cost
+
+    def accept(self, delta: float) -> bool:
+        # Decides whether a move that changes the cost of the current
+        # solution by delta is taken, and if so applies it.
+        candidate_cost = self._current_cost + delta
+        accepted = self.is_acceptable(candidate_cost=candidate_cost)
+
+        if accepted:
+            self.set_current_cost(cost=candidate_cost)
+
+        return accepted
+
+    def set_current_cost(self, cost: float):
+        # For moves that are always taken (e.g. local search), so
+        # the criterion keeps up with the current solution.
+        self._current_cost = float(cost)
+        self._best_cost = min(self._best_cost, self._current_cost)
+
+    def restart(self, cost: float):
+        # The search continues from a different solution, which is
+        # both the current and the best one from now on.
+        self._current_cost = float(cost)
+        self._best_cost = float(cost)
+
+    def start(self, duration: float):
+        # Called when the criterion starts being used, with the time
+        # left for it. Only matters to criteria that change over time.
+        pass
+
+
+class SimulatedAnnealing(AcceptanceCriterion):
+    def __init__(
+        self,
+        initial_cost: float,
+        initial_temperature: float,
+        final_temperature: float,
+        duration: float,
+    ):
+        super().__init__(initial_cost=initial_cost)
+
+        if not 0 < final_temperature <= initial_temperature:
+            raise ValueError(
+                "Expected arguments final_temperature and initial_temperature to "
+                "satisfy 0 < final_temperature <= initial_temperature, instead they "
+                f"are {final_temperature} and {initial_temperature}."
+            )
+
+        self._initial_temperature = float(initial_temperature)
+        self._final_temperature = float(final_temperature)
+        self._duration = max(float(duration), 1e-9)
+        self._start_time = time.monotonic()
+
+    # region Properties
+    @property
+    def temperature(self) -> float:
+        # Geometric cooling over wall-clock time rather than over
+        # iterations, so the schedule fits the time budget however
+        # fast the iterations are.
+        progress = min(1.0, (time.monotonic() - self._start_time) / self._duration)
+
+        return (
+            self._initial_temperature
+            * (self._final_temperature / self._initial_temperature) ** progress
+        )
+
+    # endregion
+
+    def start(self, duration: float):
+        # The cooling schedule starts over, e.g. once route elimination
+        # is done and the criterion is used for the first time.
+        self._duration = max(float(duration), 1e-9)
+        self._start_time = time.monotonic()
+
+    def is_acceptable(self, candidate_cost: float) -> bool:
+        delta = candidate_cost - self._current_cost
+
+        if delta < 0:
+            return True
+
+        return np.random.random() < np.exp(-delta / self.temperature)
+
+
+class RecordToRecord(AcceptanceCriterion):
+    def __init__(self, initial_cost: float, deviation: float):
+        super().__init__(initial_cost=initial_cost)
+
+        self._deviation = float(deviation)
+
+    def is_acceptable(self, candidate_cost: float) -> bool:
+        return candidate_cost < self._best_cost + self._deviation
+
+
+class LateAcceptance(AcceptanceCriterion):
+    def __init__(self, initial_cost: float, history_length: int):
+        super().__init__(initial_cost=initial_cost)
+
+        if history_length < 1:
+            raise ValueError(
+                "Expected argument history_length to be a positive integer, instead "
+                f"it is {history_length}."
+            )
+
+        self._history = np.full(history_length, float(initial_cost))
+        self._n_iterations = 0
+
+    def restart(self, cost: float):
+        super().restart(cost=cost)
+
+        self._history.fill(float(cost))
+
+    def accept(self, delta: float) -> bool:
+        # Compare against the current cost from history_length
+        # iterations ago, then overwrite it with today's.
+        index = self._n_iterations % len(self._history)
+        candidate_cost = self._current_cost + delta
+        accepted = (
+            candidate_cost <= self._history[index]
+            or candidate_cost < self._current_cost
+        )
+
+        if accepted:
+            self.set_current_cost(cost=candidate_cost)
+
+        self._history[index] = self._current_cost
+        self._n_iterations += 1
+
+        return accepted
+
+
+def get_acceptance_criterion(
+    name: str, routes: List[Route], duration: float, objective: Objective
+) -> Optional[AcceptanceCriterion]:
+    # The thresholds scale with the starting solution (its distance
+    # under the default objective), so the same settings work on
+    # every instance.
+    if name not in ACCEPTANCE_CRITERIA:
+        raise ValueError(
+            f"Expected argument name to be one of {ACCEPTANCE_CRITERIA}, instead it "
+            f"is {name}."
+        )
+
+    if name == "improvement":
+        return None
+
+    initial_cost = objective.cost(routes=routes)
+    scale = objective.get_scale(routes=routes)
+
+    if name == "annealing":
+        return SimulatedAnnealing(
+            initial_cost=initial_cost,
+            initial_temperature=max(0.01 * scale, 1e-6),
+            final_temperature=max(0.0001 * scale, 1e-8),
+            duration=duration,
+        )
+    elif name == "record_to_record":
+        return RecordToRecord(initial_cost=initial_cost, deviation=0.01 * scale)
+    else:
+        return LateAcceptance(initial_cost=initial_cost, history_length=100)
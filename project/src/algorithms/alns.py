@@ -0,0 +1,524 @@
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .acceptance import AcceptanceCriterion
+from .insertion import InsertionScheduler, get_regret_order
+from .instance import Instance
+from .merger import MergerScheduler
+from .objective import Objective
+from .route import Route
+from .scheduler import Scheduler
+
+DESTROY_OPERATORS = ("random", "worst_distance", "shaw", "time_window")
+REPAIR_OPERATORS = ("greedy", "regret", "rebuild")
+
+# Ropke & Pisinger's scores for a new best solution, a solution
+# better than the current one and an accepted worse one.
+NEW_BEST_SCORE = 33.0
+IMPROVEMENT_SCORE = 9.0
+ACCEPTED_SCORE = 13.0
+
+
+class OperatorStatistics:
+    __slots__ = (
+        "_weight",
+        "_n_uses",
+        "_n_accepted",
+        "_n_improvements",
+        "_n_new_best",
+        "_cpu_time",
+        "_segment_score",
+        "_segment_cpu_time",
+    )
+
+    def __init__(self):
+        self._weight = 1.0
+        self._n_uses = 0
+        self._n_accepted = 0
+        self._n_improvements = 0
+        self._n_new_best = 0
+        self._cpu_time = 0.0
+        self._segment_score = 0.0
+        self._segment_cpu_time = 0.0
+
+    # region Properties
+    @property
+    def weight(self) -> float:
+        return self._weight
+
+    @property
+    def n_uses(self) -> int:
+        return self._n_uses
+
+    @property
+    def cpu_time(self) -> float:
+        return self._cpu_time
+
+    # endregion
+
+    def record(self, cpu_time: float, score: float, accepted: bool, improved: bool):
+        self._n_uses += 1
+        self._cpu_time += cpu_time
+        self._segment_cpu_time += cpu_time
+        self._segment_score += score
+        self._n_accepted += int(accepted)
+        self._n_improvements += int(improved)
+        self._n_new_best += int(score == NEW_BEST_SCORE)
+
+    def update_weight(self, reaction: float, minimum_weight: float):
+        # Blends in the score earned per CPU-second since the last
+        # update, so expensive operators have to earn more to keep
+        # being picked. Unused operators keep their weight.
+        if self._segment_cpu_time > 0:
+            self._weight = (1 - reaction) * self._weight + reaction * (
+                self._segment_score / self._segment_cpu_time
+            )
+
+        self._weight = max(self._weight, minimum_weight)
+        self._segment_score = 0.0
+        self._segment_cpu_time = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "weight": self._weight,
+            "n_uses": self._n_uses,
+            "n_accepted": self._n_accepted,
+            "n_improvements": self._n_improvements,
+            "n_new_best": self._n_new_best,
+            "cpu_time": self._cpu_time,
+        }
+
+
+class ALNSScheduler(Scheduler):
+    @staticmethod
+    def _check_alns_args(
+        min_removal: float, max_removal: float, segment_length: int, reaction: float
+    ):
+        if not 0 < min_removal <= max_removal <= 1:
+            raise ValueError(
+                "Expected arguments min_removal and max_removal to satisfy "
+                "0 < min_removal <= max_removal <= 1, instead they are "
+                f"{min_removal} and {max_removal}."
+            )
+
+        if not isinstance(segment_length, int):
+            raise TypeError(
+                "Expected argument segment_length to be an int, instead it is "
+                f"{type(segment_length)}."
+            )
+
+        if segment_length < 1:
+            raise ValueError(
+                "Expected argument segment_length to be a positive integer, instead "
+                f"it is {segment_length}."
+            )
+
+        if not 0 <= reaction <= 1:
+            raise ValueError(
+                f"Expected argument reaction to be in [0, 1], instead it is {reaction}."
+            )
+
+        return float(min_removal), float(max_removal), segment_length, float(reaction)
+
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Instance,
+        min_removal: float = 0.05,
+        max_removal: float = 0.2,
+        max_removed_customers: int = 50,
+        segment_length: int = 50,
+        reaction: float = 0.2,
+        merger_scheduler: Optional[MergerScheduler] = None,
+        objective: Optional[Objective] = None,
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        (
+            self._min_removal,
+            self._max_removal,
+            self._segment_length,
+            self._reaction,
+        ) = self._check_alns_args(
+            min_removal=min_removal,
+            max_removal=max_removal,
+            segment_length=segment_length,
+            reaction=reaction,
+        )
+        self._max_removed_customers = max_removed_customers
+
+        self._insertion_scheduler = InsertionScheduler(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        # Shared with the caller if given, so both use the same cache
+        # of rebuilt routes.
+        if merger_scheduler is None:
+            merger_scheduler = MergerScheduler(
+                n_vehicles=n_vehicles,
+                vehicle_capacity=vehicle_capacity,
+                instance=instance,
+                objective=objective,
+            )
+
+        self._merger_scheduler = merger_scheduler
+        self._objective = objective
+
+        self._destroy_operators: Dict[str, Callable[[List[Route], int], List[int]]] = {
+            "random": self.destroy_random,
+            "worst_distance": self.destroy_worst_distance,
+            "shaw": self.destroy_shaw,
+            "time_window": self.destroy_time_window,
+        }
+        self._repair_operators: Dict[
+            str, Callable[[List[Route], List[int], List[Route]], List[Route]]
+        ] = {
+            "greedy": self.repair_greedy,
+            "regret": self.repair_regret,
+            "rebuild": self.repair_rebuild,
+        }
+        self._statistics = {
+            name: OperatorStatistics() for name in DESTROY_OPERATORS + REPAIR_OPERATORS
+        }
+
+        # Normalisation constants for Shaw relatedness.
+        self._max_distance = max(float(np.max(instance.distances)), 1e-9)
+        self._max_time = max(float(np.max(instance.due_times)), 1e-9)
+        self._max_demand = max(float(np.max(instance.demands)), 1e-9)
+
+        self._criterion: Optional[AcceptanceCriterion] = None
+        self._best_cost = np.inf
+        self._n_iterations = 0
+
+    # region Properties
+    @property
+    def objective(self) -> Objective:
+        # The merger's, unless one was given.
+        if self._objective is None:
+            return self._merger_scheduler.objective
+
+        return self._objective
+
+    @property
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        return {name: x.as_dict() for name, x in self._statistics.items()}
+
+    # endregion
+
+    # region Destroy Operators
+    @staticmethod
+    def get_customers(routes: List[Route]) -> np.ndarray:
+        return np.array([x for route in routes for x in route.indices if x != 0])
+
+    @staticmethod
+    def pick_randomized(order: np.ndarray, n: int, power: float) -> List[int]:
+        # Takes n elements, biased towards the front of order by
+        # raising a uniform number to the given power.
+        order = list(order)
+        picked = list()
+
+        while len(picked) < n and len(order) != 0:
+            index = int(np.random.random() ** power * len(order))
+            picked.append(int(order.pop(index)))
+
+        return picked
+
+    def destroy_random(self, routes: List[Route], n: int) -> List[int]:
+        customers = self.get_customers(routes=routes)
+
+        return np.random.choice(customers, size=n, replace=False).tolist()
+
+    def destroy_worst_distance(self, routes: List[Route], n: int) -> List[int]:
+        # Customers that save the most distance when removed.
+        distances = self.instance.distances
+        customers, savings = list(), list()
+
+        for route in routes:
+            indices = np.array(route.indices)
+            customers.append(indices[1:-1])
+            savings.append(
+                distances[indices[:-2], indices[1:-1]]
+                + distances[indices[1:-1], indices[2:]]
+                - distances[indices[:-2], indices[2:]]
+            )
+
+        customers, savings = np.concatenate(customers), np.concatenate(savings)
+
+        return self.pick_randomized(order=customers[np.argsort(-savings)], n=n, power=3)
+
+    def pick_related(
+        self, customers: np.ndarray, n: int, relatedness: Callable[[int], np.ndarray]
+    ) -> List[int]:
+        # Start from a random customer, then repeatedly add one that's
+        # related to a random customer removed so far.
+        pending = np.ones(len(customers), dtype=bool)
+        first = np.random.randint(len(customers))
+        pending[first] = False
+        removed = [int(customers[first])]
+
+        while len(removed) < n and np.any(pending):
+            reference = removed[np.random.randint(len(removed))]
+            candidates = customers[pending]
+            order = candidates[np.argsort(relatedness(reference)[pending])]
+            customer = self.pick_randomized(order=order, n=1, power=6)[0]
+            removed.append(customer)
+            pending[customers == customer] = False
+
+        return removed
+
+    def destroy_shaw(self, routes: List[Route], n: int) -> List[int]:
+        # Ropke & Pisinger's relatedness: close by, ready at a similar
+        # time and with a similar demand. Lower is more related.
+        instance = self.instance
+        customers = self.get_customers(routes=routes)
+
+        def relatedness(reference: int) -> np.ndarray:
+            return (
+                9 * instance.distances[reference, customers] / self._max_distance
+                + 3
+                * np.abs(
+                    instance.ready_times[customers]
+                    - int(instance.ready_times[reference])
+                )
+                / self._max_time
+                + 2
+                * np.abs(instance.demands[customers] - int(instance.demands[reference]))
+                / self._max_demand
+            )
+
+        return self.pick_related(customers=customers, n=n, relatedness=relatedness)
+
+    def destroy_time_window(self, routes: List[Route], n: int) -> List[int]:
+        # Customers whose time windows are centred close together,
+        # wherever they are.
+        instance = self.instance
+        customers = self.get_customers(routes=routes)
+        centres = (instance.ready_times[customers] + instance.due_times[customers]) / 2
+
+        def relatedness(reference: int) -> np.ndarray:
+            reference_centre = (
+                int(instance.ready_times[reference])
+                + int(instance.due_times[reference])
+            ) / 2
+
+            return np.abs(centres - reference_centre)
+
+        return self.pick_related(customers=customers, n=n, relatedness=relatedness)
+
+    # endregion
+
+    # region Repair Operators
+    def insert_customers(
+        self, routes: List[Route], customers: List[int], regret_k: int
+    ) -> List[Route]:
+        # Same scheme as regret-k construction, but starting from the
+        # given routes: the cost matrix is only recomputed for the
+        # route that changed. With regret_k = 1 this is plain cheapest
+        # insertion. Customers that fit nowhere open a new route.
+        instance = self.instance
+        scheduler = self._insertion_scheduler
+        customers = np.array(customers, dtype=int)
+        pending = np.ones(len(customers), dtype=bool)
+        costs = np.full((len(customers), len(routes)), np.inf)
+        positions = np.zeros(costs.shape, dtype=int)
+
+        def evaluate(route_index: int):
+            rows = np.flatnonzero(pending)
+            costs[rows, route_index], positions[rows, route_index] = (
+                scheduler.get_insertion_costs(
+                    route=routes[route_index], customers=customers[rows]
+                )
+            )
+
+        for route_index in range(len(routes)):
+            evaluate(route_index)
+
+        while np.any(pending):
+            rows = np.flatnonzero(pending)
+            route_costs = np.sort(costs[rows], axis=1)
+            best_costs = route_costs[:, 0]
+            feasible = np.isfinite(best_costs)
+
+            if not np.any(feasible):
+                routes.append(
+                    scheduler.open_route(
+                        instance=instance, seed=int(customers[rows[0]])
+                    )
+                )
+                pending[rows[0]] = False
+                costs = np.hstack((costs, np.full((len(customers), 1), np.inf)))
+                positions = np.hstack(
+                    (positions, np.zeros((len(customers), 1), dtype=int))
+                )
+                evaluate(len(routes) - 1)
+                continue
+
+            # Same order as regret-k construction, with regret_k = 1
+            # it's the cheapest insertion.
+            row = int(
+                rows[get_regret_order(route_costs=route_costs, regret_k=regret_k)[0]]
+            )
+
+            route_index = int(np.argmin(costs[row]))
+            route = Route(instance=instance, customers=routes[route_index].customers)
+            route.insert_stop(
+                customer=instance.get_customer(int(customers[row])),
+                index=int(positions[row, route_index]),
+            )
+            routes[route_index] = route
+            pending[row] = False
+
+            evaluate(route_index)
+
+        return routes
+
+    def repair_greedy(
+        self, routes: List[Route], removed: List[int], original_routes: List[Route]
+    ) -> List[Route]:
+        return self.insert_customers(
+            routes=routes, customers=np.random.permutation(removed), regret_k=1
+        )
+
+    def repair_regret(
+        self, routes: List[Route], removed: List[int], original_routes: List[Route]
+    ) -> List[Route]:
+        return self.insert_customers(routes=routes, customers=removed, regret_k=2)
+
+    def repair_rebuild(
+        self, routes: List[Route], removed: List[int], original_routes: List[Route]
+    ) -> Optional[List[Route]]:
+        # The merger's greedy rebuild of every route that lost a
+        # customer, so the destroy operator picks which routes get
+        # merged rather than a random subset.
+        removed = set(removed)
+        touched = [x for x in original_routes if not removed.isdisjoint(x.indices)]
+        untouched = [x for x in original_routes if removed.isdisjoint(x.indices)]
+        rebuilt = self._merger_scheduler.rebuild_routes(routes=touched)
+
+        if rebuilt is None:
+            return None
+
+        return untouched + rebuilt
+
+    # endregion
+
+    def select(self, names: Tuple[str, ...]) -> str:
+        weights = np.array([self._statistics[x].weight for x in names])
+
+        return names[np.random.choice(len(names), p=weights / np.sum(weights))]
+
+    def remove_customers(self, routes: List[Route], removed: Set[int]) -> List[Route]:
+        instance = self.instance
+        new_routes = list()
+
+        for route in routes:
+            if removed.isdisjoint(route.indices):
+                new_routes.append(route)
+                continue
+
+            customers = [x for x in route.indices if x not in removed]
+
+            if len(customers) > 2:
+                new_routes.append(
+                    Route(
+                        instance=instance,
+                        customers=[instance.get_customer(x) for x in customers],
+                    )
+                )
+
+        return new_routes
+
+    def update_weights(self):
+        mean_weight = float(np.mean([x.weight for x in self._statistics.values()]))
+
+        for statistics in self._statistics.values():
+            statistics.update_weight(
+                reaction=self._reaction, minimum_weight=0.01 * mean_weight
+            )
+
+    def optimize_solution(
+        self,
+        routes: List[Route],
+        acceptance: Optional[AcceptanceCriterion] = None,
+        cost: Optional[float] = None,
+    ) -> Optional[List[Route]]:
+        # One destroy and repair. Returns the new routes if they were
+        # accepted, None otherwise. Without an acceptance criterion
+        # only improvements are accepted. Callers that keep track of
+        # the cost of the routes (e.g. Search) pass it along, so only
+        # the routes a repair replaces are ever evaluated.
+        objective = self.objective
+        current_cost = objective.cost(routes=routes) if cost is None else cost
+
+        if acceptance is None:
+            if self._criterion is None or self._criterion.current_cost != current_cost:
+                self._criterion = AcceptanceCriterion(initial_cost=current_cost)
+
+            acceptance = self._criterion
+
+        self._best_cost = min(self._best_cost, current_cost)
+
+        n_customers = sum(len(route) - 2 for route in routes)
+
+        if n_customers < 2:
+            return None
+
+        n_removed = np.random.randint(
+            max(1, int(self._min_removal * n_customers)),
+            max(
+                2,
+                min(int(self._max_removal * n_customers), self._max_removed_customers),
+            )
+            + 1,
+        )
+        n_removed = min(n_removed, n_customers)
+
+        destroy_name = self.select(names=DESTROY_OPERATORS)
+        repair_name = self.select(names=REPAIR_OPERATORS)
+
+        start_time = time.process_time()
+        removed = self._destroy_operators[destroy_name](routes, n_removed)
+        partial_routes = self.remove_customers(routes=routes, removed=set(removed))
+        destroy_time = time.process_time() - start_time
+
+        start_time = time.process_time()
+        new_routes = self._repair_operators[repair_name](
+            partial_routes, removed, routes
+        )
+        repair_time = time.process_time() - start_time
+
+        score, accepted, improved = 0.0, False, False
+
+        if new_routes is not None:
+            new_cost = current_cost + objective.cost_delta(
+                old_routes=routes, new_routes=new_routes
+            )
+            accepted = acceptance.accept(delta=new_cost - current_cost)
+            improved = new_cost < current_cost
+
+            if accepted and new_cost < self._best_cost:
+                score = NEW_BEST_SCORE
+                self._best_cost = new_cost
+            elif accepted and improved:
+                score = IMPROVEMENT_SCORE
+            elif accepted:
+                score = ACCEPTED_SCORE
+
+        self._statistics[destroy_name].record(
+            cpu_time=destroy_time, score=score, accepted=accepted, improved=improved
+        )
+        self._statistics[repair_name].record(
+            cpu_time=repair_time, score=score, accepted=accepted, improved=improved
+        )
+
+        self._n_iterations += 1
+
+        if self._n_iterations % self._segment_length == 0:
+            self.update_weights()
+
+        return new_routes if accepted else None
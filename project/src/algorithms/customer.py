@@ -1,10 +1,25 @@
 import copy
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import numpy as np
 
+DEFAULT_N_NEIGHBOURS = 32
+
+CUSTOMER_FIELDS = (
+    "number",
+    "x",
+    "y",
+    "demand",
+    "ready_time",
+    "due_time",
+    "service_time",
+)
+CUSTOMER_DTYPE = np.dtype([(field, np.int64) for field in CUSTOMER_FIELDS])
+
 
 class Customer:
+    __slots__ = tuple(f"_{field}" for field in CUSTOMER_FIELDS)
+
     @staticmethod
     def _check_init_args(
         number: int,
@@ -14,11 +29,7 @@ class Customer:
         ready_time: int,
         due_time: int,
         service_time: int,
-        serviced_at: Optional[int],
-    ) -> Tuple[int, int, int, int, int, int, int, int]:
-        if serviced_at is None:
-            serviced_at = 0
-
+    ) -> Tuple[int, int, int, int, int, int, int]:
         # region Type Checking
         try:
             number = int(number)
@@ -76,15 +87,9 @@ class Customer:
                 f"instead it is {type(service_time)}."
             )
 
-        if not isinstance(serviced_at, int):
-            raise TypeError(
-                "Expected argument serviced_at to be an int, instead it is "
-                f"{type(serviced_at)}."
-            )
-
         # endregion
 
-        return number, x, y, demand, ready_time, due_time, service_time, serviced_at
+        return number, x, y, demand, ready_time, due_time, service_time
 
     def __init__(
         self,
@@ -95,7 +100,6 @@ class Customer:
         ready_time: int,
         due_time: int,
         service_time: int,
-        serviced_at: Optional[int] = None,
     ):
         (
             number,
@@ -105,7 +109,6 @@ class Customer:
             ready_time,
             due_time,
             service_time,
-            serviced_at,
         ) = self._check_init_args(
             number=number,
             x=x,
@@ -114,7 +117,6 @@ class Customer:
             ready_time=ready_time,
             due_time=due_time,
             service_time=service_time,
-            serviced_at=serviced_at,
         )
 
         self._number = number
@@ -124,7 +126,23 @@ class Customer:
         self._ready_time = ready_time
         self._due_time = due_time
         self._service_time = service_time
-        self._serviced_at = serviced_at
+
+    @classmethod
+    def from_row(cls, row: Tuple[int, int, int, int, int, int, int]) -> "Customer":
+        # Skips the checks, for rows of a table that has already been
+        # checked as a whole, e.g. a compiled instance.
+        customer = cls.__new__(cls)
+        (
+            customer._number,
+            customer._x,
+            customer._y,
+            customer._demand,
+            customer._ready_time,
+            customer._due_time,
+            customer._service_time,
+        ) = row
+
+        return customer
 
     # region Properties
     @property
@@ -163,19 +181,6 @@ class Customer:
     def service_time(self):
         return self._service_time
 
-    @property
-    def serviced_at(self) -> int:
-        return self._serviced_at
-
-    @serviced_at.setter
-    def serviced_at(self, value: int):
-        if not isinstance(value, int):
-            raise TypeError(
-                f"Expected argument value to be an int, instead it is {type(value)}."
-            )
-
-        self._serviced_at = value
-
     # endregion
 
     def distance(self, other: "Customer") -> float:
@@ -190,7 +195,6 @@ class Customer:
             self.ready_time,
             self.due_time,
             self.service_time,
-            self.serviced_at,
         )
 
     # region Dunder Methods
@@ -201,7 +205,7 @@ class Customer:
         return (
             f"Customer {self.number} @ ({self.x}, {self.y}) worth {self.demand}: ready "
             f"at {self.ready_time}, due at {self.due_time}, requires "
-            f"{self.service_time}, serviced at {self.serviced_at}"
+            f"{self.service_time}"
         )
 
     def __eq__(self, other: "Customer"):
@@ -216,6 +220,194 @@ class Customer:
     # endregion
 
 
+class CustomerTable:
+    @staticmethod
+    def _check_init_args(customers: Iterable[Customer]) -> List[Customer]:
+        try:
+            iter(customers)
+        except TypeError:
+            raise TypeError(
+                "Expected argument customers to be an iterable, instead it is "
+                f"{type(customers)}."
+            )
+
+        customers = sorted(set(customers), key=lambda x: x.number)
+
+        if len(customers) == 0:
+            raise ValueError("Expected argument customers to be non-empty.")
+
+        for customer in customers:
+            if not isinstance(customer, Customer):
+                raise TypeError(
+                    "Expected all elements of argument customers to be of type "
+                    f"Customer, but found an element of type {type(customer)}."
+                )
+
+        if customers[0].number < 0:
+            raise ValueError(
+                "Expected all elements of argument customers to have a non-negative "
+                f"number, but found customer {customers[0].number}."
+            )
+
+        return customers
+
+    @staticmethod
+    def _check_array_args(customers: np.ndarray) -> np.ndarray:
+        if not np.issubdtype(customers.dtype, np.integer):
+            raise TypeError(
+                "Expected argument customers to be an integer array, instead it has "
+                f"dtype {customers.dtype}."
+            )
+
+        if customers.ndim != 2 or customers.shape[1] != len(CUSTOMER_FIELDS):
+            raise ValueError(
+                "Expected argument customers to have shape "
+                f"(n, {len(CUSTOMER_FIELDS)}), instead it has shape {customers.shape}."
+            )
+
+        if len(customers) == 0:
+            raise ValueError("Expected argument customers to be non-empty.")
+
+        numbers = customers[:, 0]
+
+        if np.min(numbers) < 0:
+            raise ValueError(
+                "Expected all rows of argument customers to have a non-negative "
+                f"number, but found customer {np.min(numbers)}."
+            )
+
+        if np.max(np.bincount(numbers)) > 1:
+            raise ValueError(
+                "Expected all rows of argument customers to have a different number."
+            )
+
+        return customers
+
+    @staticmethod
+    def initialize_table(customers: List[Customer]) -> np.ndarray:
+        # Rows are addressed by customer number, numbers that
+        # don't belong to a customer are marked with -1.
+        table = np.zeros(customers[-1].number + 1, dtype=CUSTOMER_DTYPE)
+        table["number"] = -1
+
+        for customer in customers:
+            table[customer.number] = customer.as_tuple()
+
+        return table
+
+    @staticmethod
+    def initialize_table_from_array(customers: np.ndarray) -> np.ndarray:
+        table = np.zeros(np.max(customers[:, 0]) + 1, dtype=CUSTOMER_DTYPE)
+        table["number"] = -1
+
+        for i, field in enumerate(CUSTOMER_FIELDS):
+            table[field][customers[:, 0]] = customers[:, i]
+
+        return table
+
+    def __init__(self, customers: Union[np.ndarray, Iterable[Customer]]):
+        # An array of customer rows is turned into the table as a
+        # whole, and its Customer objects are only created once they
+        # are asked for.
+        if isinstance(customers, np.ndarray):
+            self._table = self.initialize_table_from_array(
+                customers=self._check_array_args(customers=customers)
+            )
+            self._customers: Optional[List[Customer]] = None
+            self._customers_by_number: Dict[int, Customer] = dict()
+        else:
+            customers = self._check_init_args(customers=customers)
+
+            self._table = self.initialize_table(customers=customers)
+            self._customers = customers
+            self._customers_by_number = {x.number: x for x in customers}
+
+        self._table.flags.writeable = False
+        self._n_customers = int(np.count_nonzero(self._table["number"] >= 0))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Iterable[int]]) -> "CustomerTable":
+        return cls(customers=[Customer(*row) for row in rows])
+
+    # region Properties
+    @property
+    def table(self) -> np.ndarray:
+        return self._table
+
+    @property
+    def customers(self) -> List[Customer]:
+        return list(self._get_customers())
+
+    @property
+    def numbers(self) -> np.ndarray:
+        return self._table["number"]
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        return np.stack((self._table["x"], self._table["y"]), axis=-1)
+
+    @property
+    def demands(self) -> np.ndarray:
+        return self._table["demand"]
+
+    @property
+    def ready_times(self) -> np.ndarray:
+        return self._table["ready_time"]
+
+    @property
+    def due_times(self) -> np.ndarray:
+        return self._table["due_time"]
+
+    @property
+    def service_times(self) -> np.ndarray:
+        return self._table["service_time"]
+
+    # endregion
+
+    def _get_customers(self) -> List[Customer]:
+        if self._customers is None:
+            self._customers = list()
+
+            for row in self._table[self._table["number"] >= 0].tolist():
+                customer = self._customers_by_number.get(row[0])
+
+                if customer is None:
+                    customer = Customer.from_row(row)
+                    self._customers_by_number[row[0]] = customer
+
+                self._customers.append(customer)
+
+        return self._customers
+
+    def has_customer(self, number: int) -> bool:
+        return (
+            isinstance(number, (int, np.integer))
+            and 0 <= number < len(self._table)
+            and bool(self._table["number"][number] >= 0)
+        )
+
+    # region Dunder Methods
+    def __len__(self):
+        return self._n_customers
+
+    def __iter__(self):
+        return iter(self._get_customers())
+
+    def __getitem__(self, number: int) -> Customer:
+        customer = self._customers_by_number.get(number)
+
+        if customer is None:
+            if not self.has_customer(number=number):
+                raise KeyError(number)
+
+            customer = Customer.from_row(self._table[number].tolist())
+            self._customers_by_number[number] = customer
+
+        return customer
+
+    # endregion
+
+
 class CustomerGraph:
     @staticmethod
     def _check_init_args(customers: Iterable[Customer]):
@@ -324,7 +516,7 @@ class CustomerGraph:
         )[0]
 
     def get_soonest_neighbour_with_time(
-        self, customer: Customer, to_ignore: Iterable[Customer] = tuple()
+        self, customer: Customer, time: int, to_ignore: Iterable[Customer] = tuple()
     ):
         key = customer.coords
 
@@ -336,19 +528,18 @@ class CustomerGraph:
         min_neighbour = copy.deepcopy(self._customers[starting_index - 1])
         min_time = max(
             min_neighbour.ready_time,
-            customer.serviced_at + self.get_distance(customer, min_neighbour),
+            time + self.get_distance(customer, min_neighbour),
         )
 
         for other in self._customers[starting_index:]:
             if key != other.coords and other not in to_ignore:
-                time = max(
-                    min_neighbour.ready_time,
-                    customer.serviced_at + self.get_distance(customer, min_neighbour),
+                other_time = max(
+                    other.ready_time, time + self.get_distance(customer, other)
                 )
 
-                if time < min_time:
+                if other_time < min_time:
                     min_neighbour = copy.deepcopy(other)
-                    min_time = time
+                    min_time = other_time
 
         if min_neighbour in to_ignore:
             return None, None
@@ -356,10 +547,10 @@ class CustomerGraph:
         return min_neighbour, min_time
 
     def get_soonest_neighbour(
-        self, customer: Customer, to_ignore: Iterable[Customer] = tuple()
+        self, customer: Customer, time: int, to_ignore: Iterable[Customer] = tuple()
     ):
         return self.get_soonest_neighbour_with_time(
-            customer=customer, to_ignore=to_ignore
+            customer=customer, time=time, to_ignore=to_ignore
         )[0]
 
     # region Dunder Methods
@@ -370,3 +561,218 @@ class CustomerGraph:
         return to_return
 
     # endregion
+
+
+class MatrixCustomerGraph(CustomerGraph):
+    @staticmethod
+    def _check_init_args(customers: Iterable[Customer]):
+        customers = CustomerGraph._check_init_args(customers=customers)
+
+        for customer in customers:
+            if customer.number < 0:
+                raise ValueError(
+                    "Expected all elements of argument customers to have a "
+                    f"non-negative number, but found customer {customer.number}."
+                )
+
+        return sorted(customers, key=lambda x: x.number)
+
+    @staticmethod
+    def get_coordinates(customers: List[Customer]) -> np.ndarray:
+        coordinates = np.zeros(
+            (max(customer.number for customer in customers) + 1, 2), dtype=float
+        )
+
+        for customer in customers:
+            coordinates[customer.number] = customer.coords
+
+        return coordinates
+
+    @staticmethod
+    def get_distance_matrix(coordinates: np.ndarray) -> np.ndarray:
+        coordinates = np.asarray(coordinates, dtype=float)
+        differences = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+
+        return np.sqrt(np.sum(differences * differences, axis=-1))
+
+    @staticmethod
+    def initialize_graph(customers: List[Customer]) -> np.ndarray:
+        return MatrixCustomerGraph.get_distance_matrix(
+            coordinates=MatrixCustomerGraph.get_coordinates(customers=customers)
+        )
+
+    def __init__(
+        self,
+        customers: Iterable[Customer],
+        distances: Optional[np.ndarray] = None,
+        n_neighbours: int = DEFAULT_N_NEIGHBOURS,
+    ):
+        customers = self._check_init_args(customers=customers)
+
+        if not isinstance(n_neighbours, int):
+            raise TypeError(
+                "Expected argument n_neighbours to be an int, instead it is "
+                f"{type(n_neighbours)}."
+            )
+
+        if n_neighbours < 1:
+            raise ValueError(
+                "Expected argument n_neighbours to be a positive integer, instead it "
+                f"is {n_neighbours}."
+            )
+
+        self._customers = customers
+        self._customers_by_number = {x.number: x for x in customers}
+        self._numbers = np.array([x.number for x in customers], dtype=int)
+
+        if distances is None:
+            self._graph = self.initialize_graph(customers=customers)
+        else:
+            if not isinstance(distances, np.ndarray):
+                raise TypeError(
+                    "Expected argument distances to be a np.ndarray, instead it is "
+                    f"{type(distances)}."
+                )
+
+            if distances.ndim != 2 or distances.shape[0] <= self._numbers[-1]:
+                raise ValueError(
+                    "Expected argument distances to be a square matrix covering "
+                    f"customer {self._numbers[-1]}, instead it has shape "
+                    f"{distances.shape}."
+                )
+
+            self._graph = distances
+
+        self._neighbours = self.initialize_neighbours(n_neighbours=n_neighbours)
+        self._cursors = {x: 0 for x in self._neighbours}
+        self._visited = np.zeros(self._graph.shape[0], dtype=bool)
+
+    def initialize_neighbours(self, n_neighbours: int) -> Dict[int, List[int]]:
+        n_neighbours = min(n_neighbours, len(self._numbers) - 1)
+
+        distances = self._graph[np.ix_(self._numbers, self._numbers)]
+        np.fill_diagonal(distances, np.inf)
+
+        if n_neighbours < len(self._numbers) - 1:
+            order = np.argpartition(distances, kth=n_neighbours - 1, axis=1)
+            order = order[:, :n_neighbours]
+        else:
+            order = np.tile(np.arange(len(self._numbers)), (len(self._numbers), 1))
+
+        # Sort by distance, breaking ties by customer number.
+        order = np.take_along_axis(
+            order,
+            np.lexsort((order, np.take_along_axis(distances, order, axis=1)), axis=1),
+            axis=1,
+        )[:, :n_neighbours]
+
+        return dict(zip(self._numbers.tolist(), self._numbers[order].tolist()))
+
+    # region Properties
+    @property
+    def graph(self):
+        graph = self._graph.view()
+        graph.flags.writeable = False
+
+        return graph
+
+    # endregion
+
+    def _check_membership(self, customer: Customer):
+        if customer.number not in self._customers_by_number:
+            raise KeyError(f"Customer {customer.number} isn't in the graph!")
+
+    def _get_candidates(
+        self, customer: Customer, to_ignore: Iterable[Customer]
+    ) -> np.ndarray:
+        self._check_membership(customer=customer)
+
+        candidates = self._numbers[
+            (self._numbers != customer.number) & ~self._visited[self._numbers]
+        ]
+        to_ignore = [x.number for x in to_ignore]
+
+        if len(to_ignore) != 0:
+            candidates = candidates[~np.isin(candidates, to_ignore)]
+
+        return candidates
+
+    def get_distance(self, x: Customer, y: Customer) -> float:
+        self._check_membership(customer=x)
+        self._check_membership(customer=y)
+
+        return float(self._graph[x.number, y.number])
+
+    def get_neighbours(self, customer: Customer) -> List[int]:
+        self._check_membership(customer=customer)
+
+        return list(self._neighbours[customer.number])
+
+    def mark_visited(self, customer: Customer):
+        self._check_membership(customer=customer)
+        self._visited[customer.number] = True
+
+    def is_visited(self, customer: Customer) -> bool:
+        return bool(self._visited[customer.number])
+
+    def iterate_neighbours(self, customer: Customer) -> Iterator[Customer]:
+        self._check_membership(customer=customer)
+
+        number = customer.number
+        neighbours = self._neighbours[number]
+
+        # Everything before the cursor is visited, and since
+        # visits are never undone the cursor only moves forward.
+        cursor = self._cursors[number]
+
+        while cursor < len(neighbours) and self._visited[neighbours[cursor]]:
+            cursor += 1
+
+        self._cursors[number] = cursor
+
+        for neighbour in neighbours[cursor:]:
+            if not self._visited[neighbour]:
+                yield self._customers_by_number[neighbour]
+
+        if len(neighbours) == len(self._numbers) - 1:
+            return
+
+        # The candidate list is exhausted, so fall back to sorting
+        # the remaining unvisited customers by distance.
+        candidates = self._get_candidates(customer=customer, to_ignore=tuple())
+        candidates = candidates[~np.isin(candidates, neighbours)]
+        candidates = candidates[
+            np.argsort(self._graph[number, candidates], kind="stable")
+        ]
+
+        for neighbour in candidates.tolist():
+            if not self._visited[neighbour]:
+                yield self._customers_by_number[neighbour]
+
+    def get_closest_neighbour_with_distance(
+        self, customer: Customer, to_ignore: Iterable[Customer] = tuple()
+    ):
+        for neighbour in self.iterate_neighbours(customer=customer):
+            if neighbour not in to_ignore:
+                return neighbour, float(self._graph[customer.number, neighbour.number])
+
+        return None, None
+
+    def get_soonest_neighbour_with_time(
+        self, customer: Customer, time: int, to_ignore: Iterable[Customer] = tuple()
+    ):
+        candidates = self._get_candidates(customer=customer, to_ignore=to_ignore)
+
+        if len(candidates) == 0:
+            return None, None
+
+        ready_times = np.array(
+            [self._customers_by_number[x].ready_time for x in candidates]
+        )
+        times = np.maximum(ready_times, time + self._graph[customer.number, candidates])
+        index = int(np.argmin(times))
+
+        return (
+            self._customers_by_number[int(candidates[index])],
+            float(times[index]),
+        )
@@ -0,0 +1,172 @@
+import bisect
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .instance import Instance
+from .objective import Objective
+from .route import Route
+
+
+def get_route_set_key(routes: List[Route]) -> bytes:
+    # Canonical digest of a solution. The order of the stops matters
+    # within a route, but not the order of the routes, so they're
+    # sorted before hashing. The depot separates them.
+    stops = sorted(tuple(route.indices)[1:-1] for route in routes)
+    indices = np.fromiter((x for route in stops for x in (*route, 0)), dtype=np.int32)
+
+    return hashlib.blake2b(indices.tobytes(), digest_size=16).digest()
+
+
+class EliteArchive:
+    @staticmethod
+    def _check_init_args(objective: Objective, capacity: int):
+        if not isinstance(objective, Objective):
+            raise TypeError(
+                "Expected argument objective to be an Objective, instead it is "
+                f"{type(objective)}."
+            )
+
+        if not isinstance(capacity, int):
+            raise TypeError(
+                "Expected argument capacity to be an int, instead it is "
+                f"{type(capacity)}."
+            )
+
+        if capacity < 1:
+            raise ValueError(
+                "Expected argument capacity to be a positive integer, instead it is "
+                f"{capacity}."
+            )
+
+        return objective, capacity
+
+    def __init__(self, objective: Objective, capacity: int = 8):
+        self._objective, self._capacity = self._check_init_args(
+            objective=objective, capacity=capacity
+        )
+
+        # Solutions are kept as customer numbers rather than routes,
+        # so an entry costs a few hundred bytes however long the run
+        # is, and turned back into routes only when one is drawn.
+        # The ranking is sorted by cost, best first.
+        self._entries: Dict[bytes, Tuple[Tuple[int, ...], ...]] = dict()
+        self._ranking: List[Tuple[float, bytes]] = list()
+
+        self._n_added = 0
+        self._n_duplicates = 0
+        self._n_rejected = 0
+
+    # region Properties
+    @property
+    def objective(self) -> Objective:
+        return self._objective
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def instance(self) -> Instance:
+        return self._objective.instance
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._ranking) >= self._capacity
+
+    @property
+    def costs(self) -> List[float]:
+        return [cost for cost, _ in self._ranking]
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "n_entries": len(self._ranking),
+            "n_added": self._n_added,
+            "n_duplicates": self._n_duplicates,
+            "n_rejected": self._n_rejected,
+        }
+
+    # endregion
+
+    def add(self, routes: List[Route], cost: Optional[float] = None) -> bool:
+        # Returns whether the solution made it into the archive. The
+        # cost can be passed along by callers that keep track of it
+        # anyway, e.g. Search.
+        if cost is None:
+            cost = self._objective.cost(routes=routes)
+
+        cost = float(cost)
+
+        if self.is_full and cost >= self._ranking[-1][0]:
+            self._n_rejected += 1
+
+            return False
+
+        key = get_route_set_key(routes=routes)
+
+        if key in self._entries:
+            self._n_duplicates += 1
+
+            return False
+
+        self._entries[key] = tuple(tuple(route.indices) for route in routes)
+        bisect.insort(self._ranking, (cost, key))
+        self._n_added += 1
+
+        if len(self._ranking) > self._capacity:
+            _, worst_key = self._ranking.pop()
+            del self._entries[worst_key]
+
+        return True
+
+    def _to_routes(self, key: bytes) -> List[Route]:
+        instance = self.instance
+
+        return [
+            Route(
+                instance=instance, customers=[instance.get_customer(x) for x in route]
+            )
+            for route in self._entries[key]
+        ]
+
+    def get(self, rank: int = 0) -> List[Route]:
+        if not 0 <= rank < len(self._ranking):
+            raise IndexError(
+                f"Attempted to get the solution at rank {rank} but there are only "
+                f"{len(self._ranking)} solutions in the archive!"
+            )
+
+        return self._to_routes(key=self._ranking[rank][1])
+
+    def sample(
+        self, random: Optional[np.random.Generator] = None
+    ) -> Optional[List[Route]]:
+        # A uniformly drawn solution, e.g. as the start of a restart.
+        # Uses the global random state unless a generator is given.
+        if len(self._ranking) == 0:
+            return None
+
+        if random is None:
+            rank = np.random.randint(len(self._ranking))
+        else:
+            rank = int(random.integers(len(self._ranking)))
+
+        return self.get(rank=rank)
+
+    def clear(self):
+        self._entries.clear()
+        self._ranking.clear()
+
+    # region Dunder Methods
+    def __len__(self):
+        return len(self._ranking)
+
+    def __contains__(self, routes: List[Route]) -> bool:
+        return get_route_set_key(routes=routes) in self._entries
+
+    def __iter__(self) -> Iterator[List[Route]]:
+        return (self._to_routes(key=key) for _, key in self._ranking)
+
+    # endregion
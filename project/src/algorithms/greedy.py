@@ -1,10 +1,8 @@
-import copy
 import sys
-from typing import Iterable, List, Set
+from typing import Iterable, Optional
 
-import numpy as np
-
-from .customer import Customer, CustomerGraph
+from .customer import Customer, MatrixCustomerGraph
+from .instance import Instance
 from .route import Route
 from .scheduler import Scheduler
 
@@ -13,67 +11,72 @@ def first_time_when_done(customer: Customer):
     return customer.ready_time + customer.service_time
 
 
-def rounded_distance(x: Customer, y: Customer):
-    return int(np.ceil(x.distance(y)) + 0.1)
-
-
-def is_eligible(x: Customer, depot: Customer):
-    return (first_time_when_done(x) + rounded_distance(x, depot)) <= depot.due_time
+def is_eligible(x: Customer, depot: Customer, instance: Instance):
+    return (first_time_when_done(x) + instance.travel_time(x, depot)) <= depot.due_time
 
 
-def get_earliest_service_time(customer: Customer, depot: Customer):
+def get_earliest_service_time(customer: Customer, depot: Customer, instance: Instance):
     return max(
         depot.ready_time,
-        customer.ready_time - (rounded_distance(customer, depot) + depot.service_time),
+        customer.ready_time
+        - (instance.travel_time(customer, depot) + depot.service_time),
     )
 
 
 class GreedyScheduler(Scheduler):
-    def __init__(self, n_vehicles: int, vehicle_capacity: int):
-        super().__init__(n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity)
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Optional[Instance] = None,
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
 
     def get_nearest_viable_customer(
         self,
         max_cost: int,
-        last_customer: Customer,
-        graph: CustomerGraph,
-        to_ignore: Set[Customer],
+        route: Route,
+        graph: MatrixCustomerGraph,
+        instance: Instance,
     ):
-        to_ignore = copy.deepcopy(to_ignore)
+        last_customer = route[-1]
+        base_time = route.arrival_times[-1] + last_customer.service_time
 
-        base_time = last_customer.serviced_at + last_customer.service_time
+        feasible_arcs = instance.feasible_arcs[last_customer.number]
 
-        while True:
-            nearest_customer = graph.get_closest_neighbour(
-                customer=last_customer, to_ignore=to_ignore
-            )
-
-            if nearest_customer is None:
-                return None
+        for nearest_customer in graph.iterate_neighbours(customer=last_customer):
+            if not feasible_arcs[nearest_customer.number]:
+                continue
 
-            nearest_time = base_time + rounded_distance(last_customer, nearest_customer)
+            nearest_time = base_time + instance.travel_time(
+                last_customer, nearest_customer
+            )
 
             if (
-                nearest_time > nearest_customer.due_time
-                or nearest_customer.demand > max_cost
+                nearest_time <= nearest_customer.due_time
+                and nearest_customer.demand <= max_cost
             ):
-                to_ignore.add(nearest_customer)
-            else:
                 return nearest_customer
 
         return None
 
     def construct_solution(self, customers: Iterable[Customer]):
+        instance = self.get_instance(customers=customers)
         depot = [x for x in customers if x.number == 0][0]
 
         # Remove customers that can't be serviced before depot
         # closes
-        eligible_customers = {x for x in customers if is_eligible(x=x, depot=depot)}
+        eligible_customers = {
+            x for x in customers if is_eligible(x=x, depot=depot, instance=instance)
+        }
 
         # Build a CustomerGraph from the eligible customers
-        graph = CustomerGraph(customers=eligible_customers)
+        graph = instance.get_graph(customers=eligible_customers)
 
         customers_to_ignore = {x for x in customers if x.number == 0}
+        graph.mark_visited(customer=depot)
 
         # Sort customers so priority is given to those that have
         # earlier due times, earlier ready times and smaller
@@ -93,8 +96,8 @@ class GreedyScheduler(Scheduler):
                 index += 1
                 continue
 
-            current_route = Route()
-            current_route.add_stop(customer=copy.deepcopy(depot))
+            current_route = Route(instance=instance)
+            current_route.add_stop(customer=depot)
 
             while index < len(customer_pick_order):
                 if customer_pick_order[index] in customers_to_ignore:
@@ -105,17 +108,19 @@ class GreedyScheduler(Scheduler):
                 first = customer_pick_order[index]
                 nearest = self.get_nearest_viable_customer(
                     max_cost=max_cost,
-                    last_customer=current_route[-1],
+                    route=current_route,
                     graph=graph,
-                    to_ignore=customers_to_ignore,
+                    instance=instance,
                 )
 
                 route_start = (
-                    current_route[-1].serviced_at + current_route[-1].service_time
+                    current_route.arrival_times[-1] + current_route[-1].service_time
+                )
+                first_time = route_start + instance.travel_time(
+                    current_route[-1], first
                 )
-                first_time = route_start + rounded_distance(current_route[-1], first)
                 first_end = (
-                    first_time + first.service_time + rounded_distance(first, depot)
+                    first_time + first.service_time + instance.travel_time(first, depot)
                 )
 
                 if nearest is None:
@@ -131,13 +136,13 @@ class GreedyScheduler(Scheduler):
                         # Only first is viable
                         current_customer = first
                 else:
-                    nearest_time = route_start + rounded_distance(
+                    nearest_time = route_start + instance.travel_time(
                         current_route[-1], nearest
                     )
                     nearest_end = (
                         nearest_time
                         + nearest.service_time
-                        + rounded_distance(nearest, depot)
+                        + instance.travel_time(nearest, depot)
                     )
 
                     if (
@@ -181,6 +186,7 @@ class GreedyScheduler(Scheduler):
 
                 current_route.add_stop(customer=current_customer)
                 customers_to_ignore.add(current_customer)
+                graph.mark_visited(customer=current_customer)
 
             # If the last customer is a depot, we failed to find
             # a solution.
@@ -192,7 +198,7 @@ class GreedyScheduler(Scheduler):
                 )
                 break
             else:
-                current_route.add_stop(customer=copy.deepcopy(depot))
+                current_route.add_stop(customer=depot)
                 routes.append(current_route)
 
         return routes
@@ -0,0 +1,297 @@
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .customer import Customer
+from .instance import Instance
+from .route import Route
+from .scheduler import Scheduler
+
+INSERTION_METHODS = ("i1", "regret")
+
+
+def get_regret_order(route_costs: np.ndarray, regret_k: int) -> np.ndarray:
+    # The order regret-k insertion serves customers in, given the
+    # cost of inserting every customer (row) into every route, sorted
+    # per row and inf where it doesn't fit. Customers that fit into
+    # fewer of their k cheapest routes are served first, then the
+    # ones we'd regret the most not serving now, i.e. with the
+    # largest gap between their cheapest insertion and the next
+    # k - 1 cheapest ones. Customers that fit nowhere come last.
+    route_costs = route_costs[:, :regret_k]
+    best_costs = route_costs[:, 0]
+    n_options = np.sum(np.isfinite(route_costs), axis=1)
+    n_options[n_options == 0] = regret_k + 1
+
+    with np.errstate(invalid="ignore"):
+        gaps = route_costs - best_costs[:, np.newaxis]
+
+    regrets = np.sum(np.where(np.isfinite(gaps), gaps, 0.0), axis=1)
+
+    return np.lexsort((best_costs, -regrets, n_options))
+
+
+class InsertionScheduler(Scheduler):
+    @staticmethod
+    def _check_insertion_args(
+        method: str, regret_k: int, mu: float, alpha: float, lambda_: float
+    ):
+        if method not in INSERTION_METHODS:
+            raise ValueError(
+                f"Expected argument method to be one of {INSERTION_METHODS}, instead "
+                f"it is {method}."
+            )
+
+        if not isinstance(regret_k, int):
+            raise TypeError(
+                "Expected argument regret_k to be an int, instead it is "
+                f"{type(regret_k)}."
+            )
+
+        if regret_k < 1:
+            raise ValueError(
+                "Expected argument regret_k to be a positive integer, instead it is "
+                f"{regret_k}."
+            )
+
+        mu, alpha, lambda_ = float(mu), float(alpha), float(lambda_)
+
+        if not 0.0 <= alpha <= 1.0:
+            raise ValueError(
+                f"Expected argument alpha to be in [0, 1], instead it is {alpha}."
+            )
+
+        return method, regret_k, mu, alpha, lambda_
+
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Optional[Instance] = None,
+        method: str = "regret",
+        regret_k: int = 2,
+        mu: float = 1.0,
+        alpha: float = 1.0,
+        lambda_: float = 2.0,
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        (
+            self._method,
+            self._regret_k,
+            self._mu,
+            self._alpha,
+            self._lambda,
+        ) = self._check_insertion_args(
+            method=method, regret_k=regret_k, mu=mu, alpha=alpha, lambda_=lambda_
+        )
+
+    # region Properties
+    @property
+    def method(self) -> str:
+        return self._method
+
+    @property
+    def regret_k(self) -> int:
+        return self._regret_k
+
+    # endregion
+
+    def get_insertion_costs(
+        self, route: Route, customers: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Solomon's c1 criterion for every customer and position:
+        # a weighted sum of the detour and the push forward of the
+        # successor's arrival time. Returns the cheapest cost for
+        # each customer (inf if it doesn't fit anywhere) and the
+        # index it should be inserted at.
+        instance = route.instance
+        indices = np.array(route.indices)
+        previous, following = indices[np.newaxis, :-1], indices[np.newaxis, 1:]
+        customers = customers[:, np.newaxis]
+
+        feasible, _, successor_arrival_times = route.evaluate_insertions(
+            customers=customers[:, 0]
+        )
+
+        detour = (
+            instance.distances[previous, customers]
+            + instance.distances[customers, following]
+            - self._mu * instance.distances[previous, following]
+        )
+        push = successor_arrival_times - np.array(route.arrival_times[1:])
+
+        costs = self._alpha * detour + (1.0 - self._alpha) * push
+        costs[~feasible] = np.inf
+
+        positions = np.argmin(costs, axis=1)
+
+        return costs[np.arange(len(costs)), positions], positions + 1
+
+    def get_seed(self, instance: Instance, customers: np.ndarray) -> int:
+        # Prefer the customer that's due the earliest, and among
+        # those the one farthest away from the depot.
+        order = np.lexsort(
+            (-instance.distances[0, customers], instance.due_times[customers])
+        )
+
+        return int(customers[order[0]])
+
+    def open_route(self, instance: Instance, seed: int) -> Route:
+        depot = instance.depot
+
+        return Route(
+            instance=instance,
+            customers=(depot, instance.get_customer(seed), depot),
+        )
+
+    def get_eligible_customers(
+        self, instance: Instance, customers: Iterable[Customer]
+    ) -> np.ndarray:
+        candidates = np.array([x.number for x in customers if x.number != 0])
+        empty_route = Route(instance=instance, customers=(instance.depot,) * 2)
+        feasible, _, _ = empty_route.evaluate_insertions(customers=candidates)
+
+        if not np.all(feasible[:, 0]):
+            print(
+                f"WARNING - {int(np.sum(~feasible[:, 0]))} customers can't be "
+                "serviced by any vehicle and were left out.",
+                file=sys.stderr,
+            )
+
+        return candidates[feasible[:, 0]]
+
+    def construct_i1(self, instance: Instance, customers: np.ndarray) -> List[Route]:
+        routes = list()
+        pending = np.ones(len(customers), dtype=bool)
+
+        while np.any(pending):
+            seed = self.get_seed(instance=instance, customers=customers[pending])
+            pending[customers == seed] = False
+
+            route = self.open_route(instance=instance, seed=seed)
+
+            while np.any(pending):
+                candidates = customers[pending]
+                costs, positions = self.get_insertion_costs(
+                    route=route, customers=candidates
+                )
+                feasible = np.isfinite(costs)
+
+                if not np.any(feasible):
+                    break
+
+                # Solomon's c2 criterion rewards serving customers
+                # far away from the depot now rather than later.
+                benefits = self._lambda * instance.distances[0, candidates] - costs
+                benefits[~feasible] = -np.inf
+                best = int(np.argmax(benefits))
+
+                route.insert_stop(
+                    customer=instance.get_customer(int(candidates[best])),
+                    index=int(positions[best]),
+                )
+                pending[customers == candidates[best]] = False
+
+            routes.append(route)
+
+        return routes
+
+    def get_initial_seeds(
+        self, instance: Instance, customers: np.ndarray, n_seeds: int
+    ) -> List[int]:
+        # Spread the seeds out: start from the customer farthest
+        # away from the depot, then keep adding the customer that's
+        # farthest away from the depot and every seed so far.
+        seeds = list()
+        closest = instance.distances[0, customers].copy()
+
+        for _ in range(min(n_seeds, len(customers))):
+            seed = int(customers[np.argmax(closest)])
+            seeds.append(seed)
+            closest = np.minimum(closest, instance.distances[seed, customers])
+
+        return seeds
+
+    def construct_regret(
+        self, instance: Instance, customers: np.ndarray
+    ) -> List[Route]:
+        routes = list()
+        pending = np.ones(len(customers), dtype=bool)
+
+        # Cheapest insertion cost and position of every customer
+        # into every open route. Only the column of the route that
+        # was changed needs to be recomputed after an insertion.
+        costs = np.full((len(customers), max(self.n_vehicles, 1)), np.inf)
+        positions = np.zeros(costs.shape, dtype=int)
+
+        def evaluate(route_index: int):
+            rows = np.flatnonzero(pending)
+            costs[rows, route_index], positions[rows, route_index] = (
+                self.get_insertion_costs(
+                    route=routes[route_index], customers=customers[rows]
+                )
+            )
+
+        def add_route(seed: int):
+            nonlocal costs, positions
+
+            pending[customers == seed] = False
+            routes.append(self.open_route(instance=instance, seed=seed))
+
+            if len(routes) > costs.shape[1]:
+                costs = np.hstack((costs, np.full(costs.shape, np.inf)))
+                positions = np.hstack((positions, np.zeros_like(positions)))
+
+        # Start with as many routes as the capacity bound demands,
+        # otherwise every customer only ever has one route to pick
+        # from and there's nothing to regret.
+        n_seeds = int(
+            np.ceil(np.sum(instance.demands[customers]) / instance.vehicle_capacity)
+        )
+
+        for seed in self.get_initial_seeds(
+            instance=instance, customers=customers, n_seeds=n_seeds
+        ):
+            add_route(seed)
+
+        for route_index in range(len(routes)):
+            evaluate(route_index)
+
+        while np.any(pending):
+            rows = np.flatnonzero(pending)
+            route_costs = np.sort(costs[rows, : len(routes)], axis=1)
+            best_costs = route_costs[:, 0]
+            feasible = np.isfinite(best_costs)
+
+            if not np.any(feasible):
+                add_route(self.get_seed(instance=instance, customers=customers[rows]))
+                evaluate(len(routes) - 1)
+                continue
+
+            order = get_regret_order(route_costs=route_costs, regret_k=self._regret_k)
+            row = int(rows[order[0]])
+
+            route_index = int(np.argmin(costs[row, : len(routes)]))
+            routes[route_index].insert_stop(
+                customer=instance.get_customer(int(customers[row])),
+                index=int(positions[row, route_index]),
+            )
+            pending[row] = False
+
+            evaluate(route_index)
+
+        return [route for route in routes if len(route) > 2]
+
+    def construct_solution(self, customers: Iterable[Customer]) -> List[Route]:
+        customers = list(customers)
+        instance = self.get_instance(customers=customers)
+        candidates = self.get_eligible_customers(instance=instance, customers=customers)
+
+        if self._method == "i1":
+            return self.construct_i1(instance=instance, customers=candidates)
+        else:
+            return self.construct_regret(instance=instance, customers=candidates)
@@ -0,0 +1,253 @@
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+from .customer import Customer, CustomerTable, MatrixCustomerGraph
+
+
+class Instance:
+    @staticmethod
+    def _check_init_args(
+        customers: Union[CustomerTable, Iterable[Customer]],
+        n_vehicles: int,
+        vehicle_capacity: int,
+    ):
+        if not isinstance(customers, CustomerTable):
+            customers = CustomerTable(customers=customers)
+
+        if not customers.has_customer(0):
+            raise ValueError(
+                "Expected argument customers to contain the depot (customer 0), but "
+                "it wasn't found."
+            )
+
+        if not isinstance(n_vehicles, int):
+            raise TypeError(
+                "Expected argument n_vehicles to be an int, instead it is "
+                f"{type(n_vehicles)}."
+            )
+
+        if not isinstance(vehicle_capacity, int):
+            raise TypeError(
+                "Expected argument vehicle_capacity to be an int, instead it is "
+                f"{type(vehicle_capacity)}."
+            )
+
+        return customers, n_vehicles, vehicle_capacity
+
+    @staticmethod
+    def _check_matrix_args(
+        customers: CustomerTable,
+        distances: Optional[np.ndarray],
+        travel_times: Optional[np.ndarray],
+    ):
+        shape = (len(customers.table),) * 2
+
+        if distances is not None:
+            distances = np.asarray(distances, dtype=float)
+
+            if distances.shape != shape:
+                raise ValueError(
+                    f"Expected argument distances to have shape {shape}, instead it "
+                    f"has shape {distances.shape}."
+                )
+
+        if travel_times is not None:
+            travel_times = np.asarray(travel_times, dtype=int)
+
+            if travel_times.shape != shape:
+                raise ValueError(
+                    f"Expected argument travel_times to have shape {shape}, instead it "
+                    f"has shape {travel_times.shape}."
+                )
+
+        return distances, travel_times
+
+    @staticmethod
+    def initialize_travel_times(distances: np.ndarray) -> np.ndarray:
+        return np.ceil(distances).astype(int)
+
+    @staticmethod
+    def initialize_feasible_arcs(
+        ready_times: np.ndarray,
+        due_times: np.ndarray,
+        service_times: np.ndarray,
+        travel_times: np.ndarray,
+    ) -> np.ndarray:
+        # Arc i -> j is feasible if, leaving the depot as early as
+        # possible for i and going straight to j, j is reached by
+        # its due time and the vehicle still gets back to the depot
+        # before it closes. That's a relaxation of every schedule
+        # going through i -> j, so an infeasible arc can be skipped
+        # without looking at any route.
+        earliest_start_times = np.maximum(
+            ready_times, ready_times[0] + service_times[0] + travel_times[0]
+        )
+        # The depot itself is left as soon as it opens, not after
+        # a trip to itself.
+        earliest_start_times[0] = ready_times[0]
+        departure_times = earliest_start_times + service_times
+        arrival_times = departure_times[:, np.newaxis] + travel_times
+        return_times = (
+            np.maximum(ready_times[np.newaxis, :], arrival_times)
+            + service_times[np.newaxis, :]
+            + travel_times[:, 0][np.newaxis, :]
+        )
+
+        return (arrival_times <= due_times[np.newaxis, :]) & (
+            return_times <= due_times[0]
+        )
+
+    def __init__(
+        self,
+        customers: Union[CustomerTable, Iterable[Customer]],
+        n_vehicles: int,
+        vehicle_capacity: int,
+        distances: Optional[np.ndarray] = None,
+        travel_times: Optional[np.ndarray] = None,
+    ):
+        customers, n_vehicles, vehicle_capacity = self._check_init_args(
+            customers=customers,
+            n_vehicles=n_vehicles,
+            vehicle_capacity=vehicle_capacity,
+        )
+        distances, travel_times = self._check_matrix_args(
+            customers=customers, distances=distances, travel_times=travel_times
+        )
+
+        self._table = customers
+        self._n_vehicles = n_vehicles
+        self._vehicle_capacity = vehicle_capacity
+
+        # Precomputed matrices (e.g. from a compiled instance) are
+        # used as they are, otherwise they're computed here.
+        if distances is None:
+            distances = MatrixCustomerGraph.get_distance_matrix(
+                coordinates=customers.coordinates
+            )
+
+        if travel_times is None:
+            travel_times = self.initialize_travel_times(distances=distances)
+
+        self._distances = distances
+        self._travel_times = travel_times
+
+        self._distances.flags.writeable = False
+        self._travel_times.flags.writeable = False
+
+        # Scheduling reads these once per stop, so keep the column
+        # views around instead of going through the table each time.
+        self._ready_times = customers.ready_times
+        self._due_times = customers.due_times
+        self._service_times = customers.service_times
+
+        self._feasible_arcs = self.initialize_feasible_arcs(
+            ready_times=self._ready_times,
+            due_times=self._due_times,
+            service_times=self._service_times,
+            travel_times=self._travel_times,
+        )
+        self._feasible_arcs.flags.writeable = False
+
+    # region Properties
+    @property
+    def table(self) -> CustomerTable:
+        return self._table
+
+    @property
+    def customers(self) -> List[Customer]:
+        return self._table.customers
+
+    @property
+    def depot(self) -> Customer:
+        return self._table[0]
+
+    @property
+    def n_vehicles(self) -> int:
+        return self._n_vehicles
+
+    @property
+    def vehicle_capacity(self) -> int:
+        return self._vehicle_capacity
+
+    @property
+    def distances(self) -> np.ndarray:
+        return self._distances
+
+    @property
+    def travel_times(self) -> np.ndarray:
+        return self._travel_times
+
+    @property
+    def feasible_arcs(self) -> np.ndarray:
+        return self._feasible_arcs
+
+    @property
+    def demands(self) -> np.ndarray:
+        return self._table.demands
+
+    @property
+    def ready_times(self) -> np.ndarray:
+        return self._ready_times
+
+    @property
+    def due_times(self) -> np.ndarray:
+        return self._due_times
+
+    @property
+    def service_times(self) -> np.ndarray:
+        return self._service_times
+
+    # endregion
+
+    def get_customer(self, number: int) -> Customer:
+        return self._table[number]
+
+    def distance(self, x: Customer, y: Customer) -> float:
+        return float(self._distances[x.number, y.number])
+
+    def travel_time(self, x: Customer, y: Customer) -> int:
+        return int(self._travel_times[x.number, y.number])
+
+    def get_arrival_time(
+        self, previous: int, previous_arrival_time: int, current: int
+    ) -> int:
+        return max(
+            int(self._ready_times[current]),
+            previous_arrival_time
+            + int(self._service_times[previous])
+            + int(self._travel_times[previous, current]),
+        )
+
+    def get_latest_arrival_time(
+        self, current: int, successor: int, successor_latest_arrival_time: int
+    ) -> int:
+        return min(
+            int(self._due_times[current]),
+            successor_latest_arrival_time
+            - int(self._service_times[current])
+            - int(self._travel_times[current, successor]),
+        )
+
+    def get_graph(
+        self, customers: Optional[Iterable[Customer]] = None
+    ) -> MatrixCustomerGraph:
+        if customers is None:
+            customers = self._table
+
+        return MatrixCustomerGraph(customers=customers, distances=self._distances)
+
+    # region Dunder Methods
+    def __repr__(self):
+        return (
+            f"Instance(customers={len(self._table)},n={self.n_vehicles},"
+            f"c={self.vehicle_capacity})"
+        )
+
+    def __str__(self):
+        return repr(self)
+
+    def __len__(self):
+        return len(self._table)
+
+    # endregion
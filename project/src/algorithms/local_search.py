@@ -0,0 +1,548 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .instance import Instance
+from .objective import Objective
+from .route import Route
+from .scheduler import Scheduler
+
+LOCAL_SEARCH_OPERATORS = (
+    "relocate",
+    "swap",
+    "two_opt_star",
+    "or_opt",
+    "cross_exchange",
+)
+LOCAL_SEARCH_MODES = ("first", "best")
+
+IMPROVEMENT_EPSILON = 1e-9
+
+
+def is_feasible_concatenation(
+    instance: Instance,
+    prefix: Route,
+    prefix_end: int,
+    segment: Sequence[int],
+    suffix: Route,
+    suffix_start: int,
+) -> bool:
+    # Checks the time windows of prefix[:prefix_end] + segment +
+    # suffix[suffix_start:]. The prefix keeps its schedule and the
+    # suffix only needs its first arrival time compared against
+    # its latest arrival time, so this costs O(len(segment)).
+    previous = prefix.indices[prefix_end - 1]
+    arrival_time = prefix.arrival_times[prefix_end - 1]
+
+    for customer in segment:
+        if not instance.feasible_arcs[previous, customer]:
+            return False
+
+        arrival_time = instance.get_arrival_time(
+            previous=previous, previous_arrival_time=arrival_time, current=customer
+        )
+
+        if arrival_time > instance.due_times[customer]:
+            return False
+
+        previous = customer
+
+    if suffix_start >= len(suffix):
+        return True
+
+    if not instance.feasible_arcs[previous, suffix.indices[suffix_start]]:
+        return False
+
+    arrival_time = instance.get_arrival_time(
+        previous=previous,
+        previous_arrival_time=arrival_time,
+        current=suffix.indices[suffix_start],
+    )
+
+    return arrival_time <= suffix.latest_arrival_times[suffix_start]
+
+
+def get_segment_load(route: Route, start: int, end: int) -> int:
+    return route.loads[end - 1] - (route.loads[start - 1] if start > 0 else 0)
+
+
+class LocalSearchScheduler(Scheduler):
+    @staticmethod
+    def _check_local_search_args(
+        operators: Iterable[str], mode: str, n_neighbours: int, max_segment_length: int
+    ):
+        operators = tuple(operators)
+
+        for operator in operators:
+            if operator not in LOCAL_SEARCH_OPERATORS:
+                raise ValueError(
+                    "Expected all elements of argument operators to be one of "
+                    f"{LOCAL_SEARCH_OPERATORS}, but found {operator}."
+                )
+
+        if mode not in LOCAL_SEARCH_MODES:
+            raise ValueError(
+                f"Expected argument mode to be one of {LOCAL_SEARCH_MODES}, instead it "
+                f"is {mode}."
+            )
+
+        if not isinstance(n_neighbours, int):
+            raise TypeError(
+                "Expected argument n_neighbours to be an int, instead it is "
+                f"{type(n_neighbours)}."
+            )
+
+        if not isinstance(max_segment_length, int):
+            raise TypeError(
+                "Expected argument max_segment_length to be an int, instead it is "
+                f"{type(max_segment_length)}."
+            )
+
+        if n_neighbours < 1 or max_segment_length < 1:
+            raise ValueError(
+                "Expected arguments n_neighbours and max_segment_length to be "
+                f"positive integers, instead they are {n_neighbours} and "
+                f"{max_segment_length}."
+            )
+
+        return operators, mode, n_neighbours, max_segment_length
+
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Instance,
+        operators: Iterable[str] = LOCAL_SEARCH_OPERATORS,
+        mode: str = "first",
+        n_neighbours: int = 10,
+        max_segment_length: int = 3,
+        objective: Optional[Objective] = None,
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        if objective is None:
+            objective = Objective(instance=instance)
+        elif not isinstance(objective, Objective):
+            raise TypeError(
+                "Expected argument objective to be an Objective, instead it is "
+                f"{type(objective)}."
+            )
+
+        self._objective = objective
+
+        (
+            self._operators,
+            self._mode,
+            self._n_neighbours,
+            self._max_segment_length,
+        ) = self._check_local_search_args(
+            operators=operators,
+            mode=mode,
+            n_neighbours=n_neighbours,
+            max_segment_length=max_segment_length,
+        )
+
+        # Granular neighbourhoods: a move is only considered if it
+        # makes a customer adjacent to one of its nearest neighbours.
+        # Every move puts the customer right after the neighbour, so
+        # neighbours it can't follow are dropped up front.
+        graph = instance.get_graph(
+            customers=[x for x in instance.customers if x.number != 0]
+        )
+        self._neighbours = {
+            x.number: [
+                y
+                for y in graph.get_neighbours(customer=x)[: self._n_neighbours]
+                if instance.feasible_arcs[y, x.number]
+            ]
+            for x in instance.customers
+            if x.number != 0
+        }
+
+        self._local_optimum: Optional[List[Route]] = None
+
+    # region Properties
+    @property
+    def operators(self) -> Tuple[str, ...]:
+        return self._operators
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def objective(self) -> Objective:
+        return self._objective
+
+    # endregion
+
+    # region Move Evaluation
+    def _evaluate_relocate(self, a: Route, i: int, b: Route, j: int):
+        # Moves a[i] between b[j - 1] and b[j].
+        d = self.instance.distances
+        u = a.indices[i]
+
+        if not b.can_insert(customer=self.instance.get_customer(u), index=j):
+            return None
+
+        return (
+            d[a.indices[i - 1], a.indices[i + 1]]
+            - d[a.indices[i - 1], u]
+            - d[u, a.indices[i + 1]]
+            + d[b.indices[j - 1], u]
+            + d[u, b.indices[j]]
+            - d[b.indices[j - 1], b.indices[j]]
+        )
+
+    def _evaluate_swap(self, a: Route, i: int, b: Route, j: int):
+        # Exchanges a[i] and b[j].
+        instance = self.instance
+        d = instance.distances
+        u, v = a.indices[i], b.indices[j]
+        demand_difference = int(instance.demands[v]) - int(instance.demands[u])
+
+        if (
+            a.cost + demand_difference > instance.vehicle_capacity
+            or b.cost - demand_difference > instance.vehicle_capacity
+            or not is_feasible_concatenation(instance, a, i, (v,), a, i + 1)
+            or not is_feasible_concatenation(instance, b, j, (u,), b, j + 1)
+        ):
+            return None
+
+        return (
+            d[a.indices[i - 1], v]
+            + d[v, a.indices[i + 1]]
+            - d[a.indices[i - 1], u]
+            - d[u, a.indices[i + 1]]
+            + d[b.indices[j - 1], u]
+            + d[u, b.indices[j + 1]]
+            - d[b.indices[j - 1], v]
+            - d[v, b.indices[j + 1]]
+        )
+
+    def _evaluate_two_opt_star(self, a: Route, i: int, b: Route, j: int):
+        # Replaces the tails: a[:i + 1] + b[j:] and b[:j] + a[i + 1:].
+        instance = self.instance
+        d = instance.distances
+
+        if (
+            a.loads[i] + b.cost - b.loads[j - 1] > instance.vehicle_capacity
+            or b.loads[j - 1] + a.cost - a.loads[i] > instance.vehicle_capacity
+            or not is_feasible_concatenation(instance, a, i + 1, (), b, j)
+            or not is_feasible_concatenation(instance, b, j, (), a, i + 1)
+        ):
+            return None
+
+        return (
+            d[a.indices[i], b.indices[j]]
+            + d[b.indices[j - 1], a.indices[i + 1]]
+            - d[a.indices[i], a.indices[i + 1]]
+            - d[b.indices[j - 1], b.indices[j]]
+        )
+
+    def _evaluate_or_opt(self, a: Route, i: int, length: int, j: int):
+        # Moves a[i:i + length] between a[j - 1] and a[j].
+        instance = self.instance
+        d = instance.distances
+        indices = a.indices
+        segment = indices[i : i + length]
+
+        if j < i:
+            middle = segment + indices[j:i]
+            feasible = is_feasible_concatenation(instance, a, j, middle, a, i + length)
+        else:
+            middle = indices[i + length : j] + segment
+            feasible = is_feasible_concatenation(instance, a, i, middle, a, j)
+
+        if not feasible:
+            return None
+
+        return (
+            d[indices[i - 1], indices[i + length]]
+            - d[indices[i - 1], segment[0]]
+            - d[segment[-1], indices[i + length]]
+            + d[indices[j - 1], segment[0]]
+            + d[segment[-1], indices[j]]
+            - d[indices[j - 1], indices[j]]
+        )
+
+    def _evaluate_cross_exchange(
+        self, a: Route, i: int, length_a: int, b: Route, j: int, length_b: int
+    ):
+        # Exchanges a[i:i + length_a] and b[j:j + length_b].
+        instance = self.instance
+        d = instance.distances
+        segment_a = a.indices[i : i + length_a]
+        segment_b = b.indices[j : j + length_b]
+        load_difference = get_segment_load(b, j, j + length_b) - get_segment_load(
+            a, i, i + length_a
+        )
+
+        if (
+            a.cost + load_difference > instance.vehicle_capacity
+            or b.cost - load_difference > instance.vehicle_capacity
+            or not is_feasible_concatenation(instance, a, i, segment_b, a, i + length_a)
+            or not is_feasible_concatenation(instance, b, j, segment_a, b, j + length_b)
+        ):
+            return None
+
+        return (
+            d[a.indices[i - 1], segment_b[0]]
+            + d[segment_b[-1], a.indices[i + length_a]]
+            - d[a.indices[i - 1], segment_a[0]]
+            - d[segment_a[-1], a.indices[i + length_a]]
+            + d[b.indices[j - 1], segment_a[0]]
+            + d[segment_a[-1], b.indices[j + length_b]]
+            - d[b.indices[j - 1], segment_b[0]]
+            - d[segment_b[-1], b.indices[j + length_b]]
+        )
+
+    # endregion
+
+    def get_moves(
+        self,
+        routes: List[Route],
+        locations: Dict[int, Tuple[int, int]],
+        customer: int,
+        neighbour: int,
+    ):
+        # Yields (delta, operator, arguments) for every feasible
+        # move that puts customer right after neighbour.
+        a_index, i = locations[customer]
+        b_index, j = locations[neighbour]
+        a, b = routes[a_index], routes[b_index]
+
+        if a_index != b_index:
+            if "relocate" in self._operators:
+                delta = self._evaluate_relocate(a, i, b, j + 1)
+
+                if delta is not None:
+                    yield delta, "relocate", (a_index, i, b_index, j + 1)
+
+            if "swap" in self._operators and j + 1 < len(b) - 1:
+                delta = self._evaluate_swap(a, i, b, j + 1)
+
+                if delta is not None:
+                    yield delta, "swap", (a_index, i, b_index, j + 1)
+
+            if "two_opt_star" in self._operators:
+                delta = self._evaluate_two_opt_star(b, j, a, i)
+
+                if delta is not None:
+                    yield delta, "two_opt_star", (b_index, j, a_index, i)
+
+            if "cross_exchange" in self._operators:
+                for length_a in range(1, self._max_segment_length + 1):
+                    if i + length_a > len(a) - 1:
+                        break
+
+                    for length_b in range(1, self._max_segment_length + 1):
+                        if j + 1 + length_b > len(b) - 1:
+                            break
+
+                        if length_a == length_b == 1:
+                            continue
+
+                        delta = self._evaluate_cross_exchange(
+                            a, i, length_a, b, j + 1, length_b
+                        )
+
+                        if delta is not None:
+                            yield delta, "cross_exchange", (
+                                a_index,
+                                i,
+                                length_a,
+                                b_index,
+                                j + 1,
+                                length_b,
+                            )
+        elif "or_opt" in self._operators:
+            for length in range(1, self._max_segment_length + 1):
+                if i + length > len(a) - 1:
+                    break
+
+                if i <= j < i + length or j + 1 == i:
+                    continue
+
+                delta = self._evaluate_or_opt(a, i, length, j + 1)
+
+                if delta is not None:
+                    yield delta, "or_opt", (a_index, i, length, j + 1)
+
+    def empties_route(
+        self, routes: List[Route], operator: str, arguments: Tuple[int, ...]
+    ) -> bool:
+        if operator == "relocate":
+            return len(routes[arguments[0]]) == 3
+
+        if operator == "two_opt_star":
+            a_index, i, _, j = arguments
+
+            return j == 1 and i == len(routes[a_index]) - 2
+
+        return False
+
+    def get_loads(
+        self, routes: List[Route], operator: str, arguments: Tuple[int, ...]
+    ) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        # The loads of the routes a move changes, before and after.
+        if operator == "or_opt":
+            return (), ()
+
+        if operator == "cross_exchange":
+            a_index, i, length_a, b_index, j, length_b = arguments
+        else:
+            a_index, i, b_index, j = arguments
+            length_a = length_b = 1
+
+        a, b = routes[a_index], routes[b_index]
+
+        if operator == "two_opt_star":
+            new_loads = (
+                a.loads[i] + b.cost - b.loads[j - 1],
+                b.loads[j - 1] + a.cost - a.loads[i],
+            )
+        else:
+            moved_load = get_segment_load(a, i, i + length_a)
+
+            if operator != "relocate":
+                moved_load -= get_segment_load(b, j, j + length_b)
+
+            new_loads = (a.cost - moved_load, b.cost + moved_load)
+
+        return (a.cost, b.cost), new_loads
+
+    def get_move_cost(
+        self,
+        routes: List[Route],
+        operator: str,
+        arguments: Tuple[int, ...],
+        distance: float,
+    ) -> float:
+        # The change of the objective, from what the move evaluation
+        # already knows, without building the new routes.
+        n_routes = (
+            -1
+            if self.empties_route(routes=routes, operator=operator, arguments=arguments)
+            else 0
+        )
+
+        if not self._objective.uses_loads:
+            return self._objective.get_move_cost(n_routes=n_routes, distance=distance)
+
+        old_loads, new_loads = self.get_loads(
+            routes=routes, operator=operator, arguments=arguments
+        )
+
+        return self._objective.get_move_cost(
+            n_routes=n_routes,
+            distance=distance,
+            old_loads=old_loads,
+            new_loads=new_loads,
+        )
+
+    def apply_move(
+        self, routes: List[Route], operator: str, arguments: Tuple[int, ...]
+    ) -> List[Route]:
+        if operator == "relocate":
+            a_index, i, b_index, j = arguments
+            a, b = list(routes[a_index].indices), list(routes[b_index].indices)
+            b.insert(j, a.pop(i))
+            lists = {a_index: a, b_index: b}
+        elif operator == "swap":
+            a_index, i, b_index, j = arguments
+            a, b = list(routes[a_index].indices), list(routes[b_index].indices)
+            a[i], b[j] = b[j], a[i]
+            lists = {a_index: a, b_index: b}
+        elif operator == "two_opt_star":
+            a_index, i, b_index, j = arguments
+            a, b = list(routes[a_index].indices), list(routes[b_index].indices)
+            lists = {a_index: a[: i + 1] + b[j:], b_index: b[:j] + a[i + 1 :]}
+        elif operator == "or_opt":
+            a_index, i, length, j = arguments
+            a = list(routes[a_index].indices)
+            segment = a[i : i + length]
+
+            if j < i:
+                a = a[:j] + segment + a[j:i] + a[i + length :]
+            else:
+                a = a[:i] + a[i + length : j] + segment + a[j:]
+
+            lists = {a_index: a}
+        else:
+            a_index, i, length_a, b_index, j, length_b = arguments
+            a, b = list(routes[a_index].indices), list(routes[b_index].indices)
+            lists = {
+                a_index: a[:i] + b[j : j + length_b] + a[i + length_a :],
+                b_index: b[:j] + a[i : i + length_a] + b[j + length_b :],
+            }
+
+        new_routes = list()
+
+        for route_index, route in enumerate(routes):
+            if route_index not in lists:
+                new_routes.append(route)
+            elif len(lists[route_index]) > 2:
+                new_routes.append(
+                    Route(
+                        instance=self.instance,
+                        customers=[
+                            self.instance.get_customer(x) for x in lists[route_index]
+                        ],
+                    )
+                )
+
+        return new_routes
+
+    def optimize_solution(self, routes: List[Route]) -> Optional[List[Route]]:
+        if self._local_optimum is not None and routes == self._local_optimum:
+            return None
+
+        locations = dict()
+
+        for route_index, route in enumerate(routes):
+            for position, customer in enumerate(route.indices):
+                if customer != 0:
+                    locations[customer] = (route_index, position)
+
+        best_move = None
+
+        for customer in np.random.permutation(list(locations)).tolist():
+            for neighbour in self._neighbours[customer]:
+                if neighbour not in locations:
+                    continue
+
+                for delta, operator, arguments in self.get_moves(
+                    routes=routes,
+                    locations=locations,
+                    customer=customer,
+                    neighbour=neighbour,
+                ):
+                    delta = self.get_move_cost(
+                        routes=routes,
+                        operator=operator,
+                        arguments=arguments,
+                        distance=delta,
+                    )
+
+                    if delta >= -IMPROVEMENT_EPSILON:
+                        continue
+
+                    if self._mode == "first":
+                        return self.apply_move(
+                            routes=routes, operator=operator, arguments=arguments
+                        )
+
+                    if best_move is None or delta < best_move[0]:
+                        best_move = (delta, operator, arguments)
+
+        if best_move is None:
+            self._local_optimum = list(routes)
+
+            return None
+
+        return self.apply_move(
+            routes=routes, operator=best_move[1], arguments=best_move[2]
+        )
@@ -1,16 +1,18 @@
-import copy
+import hashlib
 import sys
-from typing import List, Optional, Set
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
-from .customer import Customer, CustomerGraph
+from .acceptance import AcceptanceCriterion
+from .customer import MatrixCustomerGraph
+from .instance import Instance
+from .objective import Objective
 from .route import Route
 from .scheduler import Scheduler
 
-
-def rounded_distance(x: Customer, y: Customer):
-    return int(np.ceil(x.distance(y)) + 0.1)
+MERGE_CRITERIA = ("load_spread", "objective")
 
 
 def route_loss(routes: List[Route]):
@@ -19,51 +21,170 @@ def route_loss(routes: List[Route]):
     )
 
 
+def get_customer_set_key(routes: List[Route]) -> bytes:
+    # Canonical digest of the customers the routes visit, so it
+    # doesn't depend on the order of the routes or of their stops.
+    indices = np.sort(np.concatenate([route.indices for route in routes]))
+
+    return hashlib.blake2b(
+        indices[indices != 0].astype(np.int32).tobytes(), digest_size=16
+    ).digest()
+
+
 class MergerScheduler(Scheduler):
-    def __init__(self, n_vehicles: int, vehicle_capacity: int):
-        super().__init__(n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity)
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Optional[Instance] = None,
+        cache_size: int = 1024,
+        objective: Optional[Objective] = None,
+        criterion: str = "load_spread",
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        if objective is not None and not isinstance(objective, Objective):
+            raise TypeError(
+                "Expected argument objective to be an Objective, instead it is "
+                f"{type(objective)}."
+            )
+
+        self._objective = objective
+
+        if criterion not in MERGE_CRITERIA:
+            raise ValueError(
+                f"Expected argument criterion to be one of {MERGE_CRITERIA}, instead "
+                f"it is {criterion}."
+            )
+
+        # What merge_routes counts as an improvement. Acceptance
+        # criteria always go by the objective.
+        self._criterion = criterion
+
+        if not isinstance(cache_size, int):
+            raise TypeError(
+                "Expected argument cache_size to be an int, instead it is "
+                f"{type(cache_size)}."
+            )
+
+        if cache_size < 0:
+            raise ValueError(
+                "Expected argument cache_size to be a non-negative integer, instead "
+                f"it is {cache_size}."
+            )
+
+        # The rebuild only depends on the set of customers, and the
+        # same subsets keep getting drawn late in a run, so the last
+        # cache_size outcomes are kept around. Cached routes are
+        # frozen (everything that changes one works on a copy), so
+        # they can be handed out again as they are.
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[bytes, Optional[Tuple[Route, ...]]]" = OrderedDict()
+        self._n_cache_hits = 0
+        self._n_cache_misses = 0
+
+    # region Properties
+    @property
+    def objective(self) -> Objective:
+        # Built on first use if none was given, as the instance might
+        # not be known before.
+        if self._objective is None:
+            self._objective = Objective(instance=self.instance)
+
+        return self._objective
+
+    @property
+    def criterion(self) -> str:
+        return self._criterion
+
+    @property
+    def cache_size(self) -> int:
+        return self._cache_size
+
+    @property
+    def n_cache_hits(self) -> int:
+        return self._n_cache_hits
+
+    @property
+    def n_cache_misses(self) -> int:
+        return self._n_cache_misses
+
+    @property
+    def cache_statistics(self) -> Dict[str, int]:
+        return {
+            "n_hits": self._n_cache_hits,
+            "n_misses": self._n_cache_misses,
+            "n_entries": len(self._cache),
+        }
+
+    # endregion
 
     def get_nearest_viable_customer(
         self,
         max_cost: int,
-        last_customer: Customer,
-        graph: CustomerGraph,
-        to_ignore: Set[Customer],
+        route: Route,
+        graph: MatrixCustomerGraph,
+        instance: Instance,
     ):
-        to_ignore = copy.deepcopy(to_ignore)
+        last_customer = route[-1]
+        base_time = route.arrival_times[-1] + last_customer.service_time
 
-        base_time = last_customer.serviced_at + last_customer.service_time
+        feasible_arcs = instance.feasible_arcs[last_customer.number]
 
-        while True:
-            nearest_customer = graph.get_closest_neighbour(
-                customer=last_customer, to_ignore=to_ignore
-            )
-
-            if nearest_customer is None:
-                return None
+        for nearest_customer in graph.iterate_neighbours(customer=last_customer):
+            if not feasible_arcs[nearest_customer.number]:
+                continue
 
-            nearest_time = base_time + rounded_distance(last_customer, nearest_customer)
+            nearest_time = base_time + instance.travel_time(
+                last_customer, nearest_customer
+            )
 
             if (
-                nearest_time > nearest_customer.due_time
-                or nearest_customer.demand > max_cost
+                nearest_time <= nearest_customer.due_time
+                and nearest_customer.demand <= max_cost
             ):
-                to_ignore.add(nearest_customer)
-            else:
                 return nearest_customer
 
         return None
 
-    def merge_routes(self, routes: List[Route]):
-        original_value = route_loss(routes=routes)
+    def rebuild_routes(self, routes: List[Route]) -> Optional[List[Route]]:
+        if self._cache_size == 0:
+            return self._rebuild_routes(routes=routes)
+
+        key = get_customer_set_key(routes=routes)
+
+        if key in self._cache:
+            self._n_cache_hits += 1
+            self._cache.move_to_end(key)
+            new_routes = self._cache[key]
+        else:
+            self._n_cache_misses += 1
+            new_routes = self._rebuild_routes(routes=routes)
+
+            if new_routes is not None:
+                new_routes = tuple(new_routes)
+
+                for route in new_routes:
+                    route.freeze()
 
-        depot = [x for x in routes[0] if x.number == 0][0]
+            self._cache[key] = new_routes
+
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return None if new_routes is None else list(new_routes)
+
+    def _rebuild_routes(self, routes: List[Route]) -> Optional[List[Route]]:
+        instance = routes[0].instance
+        depot = instance.depot
         customer_pool = set()
 
         for route in routes:
-            customer_pool.update({x for x in route.customers})
+            customer_pool.update(route.customers)
 
-        graph = CustomerGraph(customers=customer_pool)
+        graph = instance.get_graph(customers=customer_pool)
 
         customer_pool = list(
             sorted(
@@ -72,6 +193,7 @@ class MergerScheduler(Scheduler):
             )
         )
         customers_to_ignore = {depot}
+        graph.mark_visited(customer=depot)
 
         new_routes = list()
         index = 0
@@ -81,8 +203,8 @@ class MergerScheduler(Scheduler):
                 index += 1
                 continue
 
-            current_route = Route()
-            current_route.add_stop(copy.deepcopy(depot))
+            current_route = Route(instance=instance)
+            current_route.add_stop(depot)
 
             while index < len(customer_pool):
                 if customer_pool[index] in customers_to_ignore:
@@ -94,17 +216,19 @@ class MergerScheduler(Scheduler):
                 first = customer_pool[index]
                 nearest = self.get_nearest_viable_customer(
                     max_cost=max_cost,
-                    last_customer=current_route[-1],
+                    route=current_route,
                     graph=graph,
-                    to_ignore=customers_to_ignore,
+                    instance=instance,
                 )
 
                 route_start = (
-                    current_route[-1].serviced_at + current_route[-1].service_time
+                    current_route.arrival_times[-1] + current_route[-1].service_time
+                )
+                first_time = route_start + instance.travel_time(
+                    current_route[-1], first
                 )
-                first_time = route_start + rounded_distance(current_route[-1], first)
                 first_end = (
-                    first_time + first.service_time + rounded_distance(first, depot)
+                    first_time + first.service_time + instance.travel_time(first, depot)
                 )
 
                 if nearest is None:
@@ -120,13 +244,13 @@ class MergerScheduler(Scheduler):
                         # Only first is viable
                         current_customer = first
                 else:
-                    nearest_time = route_start + rounded_distance(
+                    nearest_time = route_start + instance.travel_time(
                         current_route[-1], nearest
                     )
                     nearest_end = (
                         nearest_time
                         + nearest.service_time
-                        + rounded_distance(nearest, depot)
+                        + instance.travel_time(nearest, depot)
                     )
 
                     if (
@@ -170,6 +294,7 @@ class MergerScheduler(Scheduler):
 
                 current_route.add_stop(customer=current_customer)
                 customers_to_ignore.add(current_customer)
+                graph.mark_visited(customer=current_customer)
 
             # If the last customer is a depot, we failed to find
             # a solution.
@@ -179,20 +304,33 @@ class MergerScheduler(Scheduler):
                     "find a new Route.",
                     file=sys.stderr,
                 )
-                break
+                return None
             else:
-                current_route.add_stop(customer=copy.deepcopy(depot))
+                current_route.add_stop(customer=depot)
                 new_routes.append(current_route)
 
-        new_value = route_loss(new_routes)
+        return new_routes
 
-        if new_value < original_value:
-            return new_routes
-        else:
+    def merge_routes(self, routes: List[Route]):
+        new_routes = self.rebuild_routes(routes=routes)
+
+        if new_routes is None:
             return None
 
+        if self._criterion == "objective":
+            is_improvement = self.objective.is_improvement(
+                self.objective.delta(old_routes=routes, new_routes=new_routes)
+            )
+        else:
+            is_improvement = route_loss(new_routes) < route_loss(routes)
+
+        return new_routes if is_improvement else None
+
     def optimize_solution(
-        self, routes: List[Route], max_selected_routes: Optional[int] = None
+        self,
+        routes: List[Route],
+        max_selected_routes: Optional[int] = None,
+        acceptance: Optional[AcceptanceCriterion] = None,
     ):
         if len(routes) < 2:
             return None
@@ -218,7 +356,19 @@ class MergerScheduler(Scheduler):
             else:
                 other_routes.append(routes[i])
 
-        new_routes = self.merge_routes(selected_routes)
+        if acceptance is None:
+            new_routes = self.merge_routes(selected_routes)
+        else:
+            # Let the acceptance criterion decide, even if the rebuild
+            # is worse than what it replaces.
+            new_routes = self.rebuild_routes(selected_routes)
+
+            if new_routes is not None and not acceptance.accept(
+                delta=self.objective.cost_delta(
+                    old_routes=selected_routes, new_routes=new_routes
+                )
+            ):
+                new_routes = None
 
         if new_routes is None:
             return None
@@ -0,0 +1,256 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .instance import Instance
+from .route import Route
+
+OBJECTIVE_COMPONENTS = ("vehicles", "distance", "concentration")
+OBJECTIVE_ORDERS = ("lexicographic", "weighted")
+
+# Acceptance criteria need a single number, so a lexicographic
+# objective is folded into one with every component weighing this
+# much more than the next. One vehicle less then beats any amount of
+# distance.
+LEXICOGRAPHIC_SCALE = 1000000
+
+DEFAULT_WEIGHTS = {
+    "vehicles": LEXICOGRAPHIC_SCALE,
+    "distance": 1.0,
+    "concentration": 1.0,
+}
+
+# Component differences smaller than this are rounding noise.
+OBJECTIVE_EPSILON = 1e-9
+
+
+class Objective:
+    @staticmethod
+    def _check_init_args(
+        instance: Instance,
+        components: Iterable[str],
+        order: str,
+        weights: Optional[Iterable[float]],
+    ):
+        if not isinstance(instance, Instance):
+            raise TypeError(
+                "Expected argument instance to be an Instance, instead it is "
+                f"{type(instance)}."
+            )
+
+        components = tuple(components)
+
+        if len(components) == 0 or len(set(components)) != len(components):
+            raise ValueError(
+                "Expected argument components to be a non-empty sequence without "
+                f"duplicates, instead it is {components}."
+            )
+
+        for component in components:
+            if component not in OBJECTIVE_COMPONENTS:
+                raise ValueError(
+                    "Expected all elements of argument components to be one of "
+                    f"{OBJECTIVE_COMPONENTS}, but found {component}."
+                )
+
+        if order not in OBJECTIVE_ORDERS:
+            raise ValueError(
+                f"Expected argument order to be one of {OBJECTIVE_ORDERS}, instead it "
+                f"is {order}."
+            )
+
+        if weights is not None:
+            if order != "weighted":
+                raise ValueError(
+                    "Expected argument weights to be None for a lexicographic "
+                    f"objective, instead it is {weights}."
+                )
+
+            weights = tuple(float(x) for x in weights)
+
+            if len(weights) != len(components):
+                raise ValueError(
+                    f"Expected argument weights to have {len(components)} elements, "
+                    f"one per component, instead it has {len(weights)}."
+                )
+
+        return instance, components, order, weights
+
+    def __init__(
+        self,
+        instance: Instance,
+        components: Iterable[str] = ("vehicles", "distance"),
+        order: str = "lexicographic",
+        weights: Optional[Iterable[float]] = None,
+    ):
+        (
+            self._instance,
+            self._components,
+            self._order,
+            weights,
+        ) = self._check_init_args(
+            instance=instance, components=components, order=order, weights=weights
+        )
+
+        if order == "lexicographic":
+            weights = tuple(
+                float(LEXICOGRAPHIC_SCALE ** (len(self._components) - i - 1))
+                for i in range(len(self._components))
+            )
+        elif weights is None:
+            weights = tuple(DEFAULT_WEIGHTS[x] for x in self._components)
+
+        self._weights = weights
+        self._weights_by_component: Dict[str, float] = dict.fromkeys(
+            OBJECTIVE_COMPONENTS, 0.0
+        )
+        self._weights_by_component.update(zip(self._components, weights))
+
+    # region Properties
+    @property
+    def instance(self) -> Instance:
+        return self._instance
+
+    @property
+    def components(self) -> Tuple[str, ...]:
+        return self._components
+
+    @property
+    def order(self) -> str:
+        return self._order
+
+    @property
+    def weights(self) -> Tuple[float, ...]:
+        return self._weights
+
+    @property
+    def uses_loads(self) -> bool:
+        return "concentration" in self._components
+
+    # endregion
+
+    def get_delta(
+        self,
+        n_routes: int = 0,
+        distance: float = 0.0,
+        old_loads: Iterable[int] = (),
+        new_loads: Iterable[int] = (),
+    ) -> Tuple[float, ...]:
+        # The change of every component caused by a move that changes
+        # the number of routes and the distance by the given amounts,
+        # and replaces routes with old_loads by routes with new_loads.
+        # Operators can describe a move this way without building any
+        # routes. Concentration is minus the sum of the squared
+        # loads relative to the vehicle capacity, so minimising it
+        # piles the load onto fewer routes and empties out the rest.
+        values = {"vehicles": float(n_routes), "distance": float(distance)}
+
+        if self.uses_loads:
+            capacity = float(self._instance.vehicle_capacity)
+            values["concentration"] = sum((x / capacity) ** 2 for x in old_loads) - sum(
+                (x / capacity) ** 2 for x in new_loads
+            )
+
+        return tuple(values[x] for x in self._components)
+
+    def evaluate(self, routes: Iterable[Route]) -> Tuple[float, ...]:
+        routes = list(routes)
+
+        return self.get_delta(
+            n_routes=len(routes),
+            distance=sum(route.distance for route in routes),
+            new_loads=[route.cost for route in routes] if self.uses_loads else (),
+        )
+
+    def delta(
+        self, old_routes: List[Route], new_routes: List[Route]
+    ) -> Tuple[float, ...]:
+        # Routes aren't changed once they're part of a solution, so
+        # the ones both sides share cancel out and only the replaced
+        # ones are looked at.
+        shared = {id(x) for x in old_routes}.intersection(id(x) for x in new_routes)
+        old_routes = [x for x in old_routes if id(x) not in shared]
+        new_routes = [x for x in new_routes if id(x) not in shared]
+
+        return self.get_delta(
+            n_routes=len(new_routes) - len(old_routes),
+            distance=sum(x.distance for x in new_routes)
+            - sum(x.distance for x in old_routes),
+            old_loads=[x.cost for x in old_routes] if self.uses_loads else (),
+            new_loads=[x.cost for x in new_routes] if self.uses_loads else (),
+        )
+
+    def scalarize(self, values: Tuple[float, ...]) -> float:
+        return sum(weight * value for weight, value in zip(self._weights, values))
+
+    def get_move_cost(
+        self,
+        n_routes: int = 0,
+        distance: float = 0.0,
+        old_loads: Iterable[int] = (),
+        new_loads: Iterable[int] = (),
+    ) -> float:
+        # scalarize(get_delta(...)), without the tuple for the common
+        # case of an objective that doesn't look at loads.
+        if not self.uses_loads:
+            return (
+                self._weights_by_component["vehicles"] * n_routes
+                + self._weights_by_component["distance"] * distance
+            )
+
+        return self.scalarize(
+            self.get_delta(
+                n_routes=n_routes,
+                distance=distance,
+                old_loads=old_loads,
+                new_loads=new_loads,
+            )
+        )
+
+    def cost(self, routes: Iterable[Route]) -> float:
+        return self.scalarize(self.evaluate(routes=routes))
+
+    def cost_delta(self, old_routes: List[Route], new_routes: List[Route]) -> float:
+        return self.scalarize(self.delta(old_routes=old_routes, new_routes=new_routes))
+
+    def get_scale(self, routes: Iterable[Route]) -> float:
+        # The folded value of every component but the first, e.g. the
+        # distance under the default objective. Acceptance thresholds
+        # are relative to it, since the first component barely ever
+        # changes.
+        values = self.evaluate(routes=routes)
+
+        return abs(self.scalarize(values) - self._weights[0] * values[0])
+
+    def get_key(self, routes: Iterable[Route]) -> Tuple[float, ...]:
+        # Sort key of a solution, the smaller the better.
+        values = self.evaluate(routes=routes)
+
+        if self._order == "weighted":
+            return (self.scalarize(values),)
+
+        return values
+
+    def is_improvement(self, delta: Tuple[float, ...]) -> bool:
+        if self._order == "weighted":
+            return self.scalarize(delta) < -OBJECTIVE_EPSILON
+
+        for value in delta:
+            if value < -OBJECTIVE_EPSILON:
+                return True
+
+            if value > OBJECTIVE_EPSILON:
+                return False
+
+        return False
+
+    # region Dunder Methods
+    def __repr__(self):
+        weights = ",".join(
+            f"{x}={y:g}" for x, y in zip(self._components, self._weights)
+        )
+
+        return f"Objective({self._order},{weights})"
+
+    def __str__(self):
+        return repr(self)
+
+    # endregion
@@ -0,0 +1,330 @@
+import signal
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .elite import EliteArchive
+from .instance import Instance
+from .objective import Objective
+from .route import Route
+from .search import Search
+
+# Workers other than the first one cycle through these (optimizer,
+# local search mode) pairs, so the portfolio doesn't just run the
+# same search with different seeds.
+PORTFOLIO_CONFIGURATIONS = (
+    ("merger", "first"),
+    ("local_search", "first"),
+    ("local_search", "best"),
+    ("alns", "first"),
+)
+
+# Set once per worker process by the pool initializer, so the
+# instance is only sent over to each worker once.
+_worker_instance: Optional[Instance] = None
+
+# Built by the first call in every worker process and restarted from
+# the shared solution by the later ones, so the merge cache, the
+# operator weights and the cooling schedule last for the whole run.
+_worker_search: Optional[Search] = None
+
+
+def get_solution_key(routes: List[Route]) -> Tuple[int, float]:
+    return len(routes), sum(route.distance for route in routes)
+
+
+def routes_to_indices(routes: List[Route]) -> List[List[int]]:
+    return [list(route.indices) for route in routes]
+
+
+def indices_to_routes(instance: Instance, indices: List[List[int]]) -> List[Route]:
+    return [
+        Route(instance=instance, customers=[instance.get_customer(x) for x in route])
+        for route in indices
+    ]
+
+
+def _initialize_worker(instance: Instance):
+    global _worker_instance
+
+    # Interrupts are handled by the parent process, which needs to
+    # be able to terminate the workers with SIGTERM.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    _worker_instance = instance
+
+
+def _run_worker(
+    optimizer: str,
+    local_search_mode: str,
+    acceptance: str,
+    seed: int,
+    indices: List[List[int]],
+    seconds: float,
+    duration: float,
+    elimination_time: float,
+    objective_args: Optional[Dict[str, Any]],
+    merge_criterion: str,
+) -> Tuple[List[List[int]], int, Dict[str, Dict[str, float]], Dict[str, int]]:
+    # Returns the best routes, the number of iterations of this call
+    # and the statistics of the whole run so far.
+    global _worker_search
+
+    np.random.seed(seed)
+
+    routes = indices_to_routes(instance=_worker_instance, indices=indices)
+
+    if _worker_search is None:
+        objective = None
+
+        if objective_args is not None:
+            objective = Objective(instance=_worker_instance, **objective_args)
+
+        _worker_search = Search(
+            instance=_worker_instance,
+            routes=routes,
+            optimizer=optimizer,
+            local_search_mode=local_search_mode,
+            acceptance=acceptance,
+            duration=duration,
+            elimination_time=elimination_time,
+            objective=objective,
+            merge_criterion=merge_criterion,
+        )
+    else:
+        _worker_search.restart(routes=routes)
+
+    n_iterations = _worker_search.n_iterations
+    routes = _worker_search.run(seconds=seconds)
+
+    return (
+        routes_to_indices(routes=routes),
+        _worker_search.n_iterations - n_iterations,
+        _worker_search.statistics,
+        _worker_search.cache_statistics,
+    )
+
+
+def merge_statistics(
+    statistics: List[Dict[str, Dict[str, float]]],
+) -> Dict[str, Dict[str, float]]:
+    # Counts and times add up over the workers, weights are averaged
+    # over the workers that use the operator.
+    merged = dict()
+    n_workers = dict()
+
+    for worker_statistics in statistics:
+        for name, values in worker_statistics.items():
+            n_workers[name] = n_workers.get(name, 0) + 1
+            merged_values = merged.setdefault(name, dict.fromkeys(values, 0))
+
+            for key, value in values.items():
+                merged_values[key] += value
+
+    for name, values in merged.items():
+        values["weight"] /= n_workers[name]
+
+    return merged
+
+
+class PortfolioRunner:
+    @staticmethod
+    def _check_init_args(
+        instance: Instance, n_workers: int, archive: Optional[EliteArchive]
+    ):
+        if not isinstance(instance, Instance):
+            raise TypeError(
+                "Expected argument instance to be an Instance, instead it is "
+                f"{type(instance)}."
+            )
+
+        if not isinstance(n_workers, int):
+            raise TypeError(
+                "Expected argument n_workers to be an int, instead it is "
+                f"{type(n_workers)}."
+            )
+
+        if n_workers < 1:
+            raise ValueError(
+                "Expected argument n_workers to be a positive integer, instead it is "
+                f"{n_workers}."
+            )
+
+        if archive is not None and not isinstance(archive, EliteArchive):
+            raise TypeError(
+                "Expected argument archive to be an EliteArchive, instead it is "
+                f"{type(archive)}."
+            )
+
+        return instance, n_workers, archive
+
+    def __init__(
+        self,
+        instance: Instance,
+        n_workers: int,
+        optimizer: str = "merger",
+        local_search_mode: str = "first",
+        acceptance: str = "improvement",
+        seed: Optional[int] = None,
+        objective: Optional[Objective] = None,
+        archive: Optional[EliteArchive] = None,
+        merge_criterion: str = "load_spread",
+    ):
+        self._instance, self._n_workers, self._archive = self._check_init_args(
+            instance=instance, n_workers=n_workers, archive=archive
+        )
+
+        # The first worker runs the configuration that was asked
+        # for, the rest diversify.
+        self._configurations = [(optimizer, local_search_mode)] + [
+            PORTFOLIO_CONFIGURATIONS[i % len(PORTFOLIO_CONFIGURATIONS)]
+            for i in range(n_workers - 1)
+        ]
+        self._acceptance = acceptance
+        self._merge_criterion = merge_criterion
+
+        # The workers already have the instance, so they only get
+        # what they need to build the same objective.
+        self._objective = objective
+        self._objective_args = None
+
+        if objective is not None:
+            self._objective_args = {
+                "components": objective.components,
+                "order": objective.order,
+                "weights": objective.weights if objective.order == "weighted" else None,
+            }
+        # Merge cache hits and misses so far, per worker.
+        self._worker_cache_statistics = [
+            {"n_hits": 0, "n_misses": 0} for _ in range(n_workers)
+        ]
+        self._random = np.random.default_rng(seed)
+
+        # A single process pool per worker, so every call of a worker
+        # ends up in the same process and finds its search there.
+        self._pools = [
+            Pool(processes=1, initializer=_initialize_worker, initargs=(instance,))
+            for _ in range(n_workers)
+        ]
+
+    # region Properties
+    @property
+    def instance(self) -> Instance:
+        return self._instance
+
+    @property
+    def n_workers(self) -> int:
+        return self._n_workers
+
+    @property
+    def configurations(self) -> List[Tuple[str, str]]:
+        return list(self._configurations)
+
+    @property
+    def archive(self) -> Optional[EliteArchive]:
+        return self._archive
+
+    @property
+    def cache_statistics(self) -> Dict[str, int]:
+        # Merge cache hits and misses of all workers over all calls.
+        return {
+            key: sum(x[key] for x in self._worker_cache_statistics)
+            for key in ("n_hits", "n_misses")
+        }
+
+    # endregion
+
+    def run(
+        self,
+        routes: List[Route],
+        seconds: float,
+        elimination_time: float = 0.0,
+        duration: float = 0.0,
+    ) -> Tuple[List[Route], int, Dict[str, Dict[str, float]]]:
+        # Every worker continues from the given solution and
+        # searches on its own for the given number of seconds. The
+        # best solution they find is returned, along with the total
+        # number of iterations of this call and the operator
+        # statistics so far, so it can be shared with all of the
+        # workers at the next call. With an archive, the workers
+        # other than the first continue from a solution drawn from
+        # it instead, so they don't all pick up from the same place.
+        # The duration (of the whole run) and the elimination time
+        # only matter to the first call, which builds the searches.
+        indices = routes_to_indices(routes=routes)
+        seeds = self._random.integers(2**31, size=self._n_workers).tolist()
+        starts = [indices] * self._n_workers
+
+        if self._archive is not None:
+            self._archive.add(routes=routes)
+
+            starts = [indices] + [
+                routes_to_indices(routes=self._archive.sample(random=self._random))
+                for _ in range(self._n_workers - 1)
+            ]
+
+        pending = [
+            pool.apply_async(
+                _run_worker,
+                (
+                    optimizer,
+                    local_search_mode,
+                    self._acceptance,
+                    seed,
+                    start,
+                    seconds,
+                    max(duration, seconds),
+                    elimination_time,
+                    self._objective_args,
+                    self._merge_criterion,
+                ),
+            )
+            for pool, (optimizer, local_search_mode), seed, start in zip(
+                self._pools, self._configurations, seeds, starts
+            )
+        ]
+        results = [x.get() for x in pending]
+
+        get_key = get_solution_key
+
+        if self._objective is not None:
+            get_key = self._objective.get_key
+
+        best_routes = routes
+
+        for i, (worker_indices, _, _, worker_cache_statistics) in enumerate(results):
+            self._worker_cache_statistics[i] = worker_cache_statistics
+
+            worker_routes = indices_to_routes(
+                instance=self._instance, indices=worker_indices
+            )
+
+            if self._archive is not None:
+                self._archive.add(routes=worker_routes)
+
+            if get_key(routes=worker_routes) < get_key(routes=best_routes):
+                best_routes = worker_routes
+
+        return (
+            best_routes,
+            sum(n_iterations for _, n_iterations, _, _ in results),
+            merge_statistics(statistics=[x for _, _, x, _ in results]),
+        )
+
+    def close(self):
+        for pool in self._pools:
+            pool.terminate()
+
+        for pool in self._pools:
+            pool.join()
+
+    # region Dunder Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # endregion
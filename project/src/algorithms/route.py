@@ -1,39 +1,57 @@
-import copy
-from typing import Callable, Iterable, List, Optional
+from collections.abc import Sequence
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import numpy as np
 
 from .customer import Customer
+from .instance import Instance
+
+
+class SequenceView(Sequence):
+    __slots__ = ("_sequence", "_function")
+
+    def __init__(
+        self, sequence: Sequence, function: Optional[Callable[[Any], Any]] = None
+    ):
+        self._sequence = sequence
+        self._function = function
+
+    def __getitem__(self, key):
+        if self._function is None:
+            return self._sequence[key]
+
+        if isinstance(key, slice):
+            return [self._function(x) for x in self._sequence[key]]
+
+        return self._function(self._sequence[key])
+
+    def __iter__(self):
+        if self._function is None:
+            return iter(self._sequence)
+
+        return map(self._function, self._sequence)
+
+    def __len__(self):
+        return len(self._sequence)
+
+    def __repr__(self):
+        return f"SequenceView({list(self)})"
 
 
 class Route:
     @staticmethod
-    def _default_function(
-        current: Customer, previous: Optional[Customer] = None
-    ) -> Customer:
-        if previous is None:
-            current.serviced_at = 0
-        else:
-            current.serviced_at = max(
-                current.ready_time,
-                previous.serviced_at
-                + previous.service_time
-                + int(np.ceil(previous.distance(current)) + 0.1),
+    def _check_init_args(
+        instance: Instance, customers: Optional[Iterable[Customer]]
+    ) -> List[Customer]:
+        if not isinstance(instance, Instance):
+            raise TypeError(
+                "Expected argument instance to be an Instance, instead it is "
+                f"{type(instance)}."
             )
 
-        return current
-
-    def _check_init_args(
-        self,
-        customers: Optional[Iterable[Customer]],
-        function: Optional[Callable[[List], int]],
-    ):
         if customers is None:
             customers = list()
 
-        if function is None:
-            function = self._default_function
-
         try:
             iter(customers)
         except TypeError:
@@ -42,64 +60,185 @@ class Route:
                 f"{type(customers)}."
             )
 
-        if not callable(function):
-            raise TypeError(
-                "Expected argument function to be callable, instead it is "
-                f"{type(function)}."
-            )
-
         customers = list(customers)
 
-        return customers, function
+        for customer in customers:
+            if not isinstance(customer, Customer):
+                raise TypeError(
+                    "Expected all elements of argument customers to be of type "
+                    f"Customer, but found an element of type {type(customer)}."
+                )
+
+        return customers
 
     def __init__(
-        self,
-        customers: Optional[Iterable[Customer]] = None,
-        function: Optional[Callable[[List], int]] = None,
+        self, instance: Instance, customers: Optional[Iterable[Customer]] = None
     ):
-        customers, function = self._check_init_args(
-            customers=customers, function=function
-        )
+        customers = self._check_init_args(instance=instance, customers=customers)
 
-        self._customers = copy.deepcopy(customers)
-        self._function = copy.deepcopy(function)
+        self._instance = instance
 
-        for i in range(len(self._customers)):
-            self._customers[i] = self.function(
-                self._customers[i], self._customers[i - 1] if i > 0 else None
-            )
+        # Parallel arrays: the customer number, the time the
+        # customer is serviced at and the latest time it could be
+        # serviced at without breaking any later due time.
+        self._indices: List[int] = list()
+        self._arrival_times: List[int] = list()
+        self._latest_arrival_times: List[int] = list()
+
+        # Kept up to date by every change to the stops, each of which
+        # only adds or removes a couple of legs and a single demand.
+        self._distance = 0.0
+        self._load = 0
+
+        # The load of the vehicle after every stop, only built when
+        # a move evaluation asks for it, and dropped by any change in
+        # the middle of the route.
+        self._loads: Optional[List[int]] = None
+
+        # Set for routes that are handed out to more than one holder,
+        # e.g. by the merge cache, so changing one of them fails
+        # instead of changing it for everyone.
+        self._is_frozen = False
+
+        for customer in customers:
+            self.add_stop(customer=customer)
 
     # region Properties
     @property
-    def customers(self):
-        return copy.deepcopy(self._customers)
+    def instance(self) -> Instance:
+        return self._instance
 
     @property
-    def function(self):
-        return copy.deepcopy(self._function)
+    def customers(self) -> SequenceView:
+        return SequenceView(self._indices, self._instance.get_customer)
 
     @property
-    def cost(self):
-        return sum(x.demand for x in self._customers)
+    def indices(self) -> SequenceView:
+        return SequenceView(self._indices)
 
     @property
-    def distance(self):
-        if len(self._customers) < 2:
-            return 0.0
+    def arrival_times(self) -> SequenceView:
+        return SequenceView(self._arrival_times)
 
-        return sum(
-            customer.distance(self._customers[i - 1])
-            for i, customer in enumerate(self._customers[1:])
-        )
+    @property
+    def latest_arrival_times(self) -> SequenceView:
+        return SequenceView(self._latest_arrival_times)
+
+    @property
+    def loads(self) -> SequenceView:
+        if self._loads is None:
+            self._loads = np.cumsum(
+                self._instance.demands[self._indices], dtype=int
+            ).tolist()
+
+        return SequenceView(self._loads)
+
+    @property
+    def cost(self) -> int:
+        return self._load
+
+    @property
+    def distance(self) -> float:
+        return self._distance
+
+    @property
+    def is_frozen(self) -> bool:
+        return self._is_frozen
+
+    @property
+    def duration(self) -> int:
+        # Vehicles leave the depot at time 0, so a route takes as
+        # long as it takes to get to its last stop.
+        return self._arrival_times[-1] if len(self._arrival_times) != 0 else 0
 
     # endregion
 
-    def add_stop(self, customer: Customer):
-        self._customers.append(
-            self.function(customer, self._customers[-1] if len(self) != 0 else None)
+    def freeze(self):
+        self._is_frozen = True
+
+    def _check_not_frozen(self):
+        if self._is_frozen:
+            raise RuntimeError(
+                "Attempted to modify a frozen route! Modify a copy of it instead."
+            )
+
+    def _get_leg_distance(self, start: int, end: int) -> float:
+        return float(self._instance.distances[start, end])
+
+    def _get_detour(self, previous: int, current: int, following: int) -> float:
+        # How much longer the route gets by visiting current between
+        # previous and following.
+        return (
+            self._get_leg_distance(start=previous, end=current)
+            + self._get_leg_distance(start=current, end=following)
+            - self._get_leg_distance(start=previous, end=following)
+        )
+
+    def _get_arrival_time(self, index: int) -> int:
+        if index == 0:
+            return 0
+
+        return self._instance.get_arrival_time(
+            previous=self._indices[index - 1],
+            previous_arrival_time=self._arrival_times[index - 1],
+            current=self._indices[index],
+        )
+
+    def _get_latest_arrival_time(self, index: int) -> int:
+        if index == len(self._indices) - 1:
+            return int(self._instance.due_times[self._indices[index]])
+
+        return self._instance.get_latest_arrival_time(
+            current=self._indices[index],
+            successor=self._indices[index + 1],
+            successor_latest_arrival_time=self._latest_arrival_times[index + 1],
         )
 
+    def _propagate(self, start: int):
+        # The arrival time of a stop depends only on the stop
+        # before it, so once a stop keeps its old arrival time
+        # the rest of the schedule stays the same as well.
+        for i in range(start, len(self._indices)):
+            arrival_time = self._get_arrival_time(i)
+
+            if arrival_time == self._arrival_times[i]:
+                break
+
+            self._arrival_times[i] = arrival_time
+
+    def _propagate_backward(self, start: int):
+        # Same as above, but latest arrival times depend only on
+        # the stop after them.
+        for i in range(start, -1, -1):
+            latest_arrival_time = self._get_latest_arrival_time(i)
+
+            if latest_arrival_time == self._latest_arrival_times[i]:
+                break
+
+            self._latest_arrival_times[i] = latest_arrival_time
+
+    def add_stop(self, customer: Customer):
+        self._check_not_frozen()
+
+        if len(self._indices) != 0:
+            self._distance += self._get_leg_distance(
+                start=self._indices[-1], end=customer.number
+            )
+
+        self._indices.append(customer.number)
+        self._arrival_times.append(0)
+        self._arrival_times[-1] = self._get_arrival_time(len(self._indices) - 1)
+        self._latest_arrival_times.append(customer.due_time)
+        self._load += customer.demand
+
+        if self._loads is not None:
+            self._loads.append(self._load)
+
+        self._propagate_backward(len(self._indices) - 2)
+
     def insert_stop(self, customer: Customer, index: int):
+        self._check_not_frozen()
+
         if index > len(self):
             raise IndexError(
                 f"Attempted to insert at index {index} but there are only {len(self)} "
@@ -108,15 +247,50 @@ class Route:
         elif index == len(self):
             return self.add_stop(customer=customer)
 
-        self._customers = self._customers[:index] + [customer] + self._customers[index:]
+        if index == 0:
+            self._distance += self._get_leg_distance(
+                start=customer.number, end=self._indices[0]
+            )
+        else:
+            self._distance += self._get_detour(
+                previous=self._indices[index - 1],
+                current=customer.number,
+                following=self._indices[index],
+            )
+
+        self._indices.insert(index, customer.number)
+        self._arrival_times.insert(index, 0)
+        self._arrival_times[index] = self._get_arrival_time(index)
+        self._latest_arrival_times.insert(index, 0)
+        self._latest_arrival_times[index] = self._get_latest_arrival_time(index)
+        self._load += customer.demand
+        self._loads = None
 
-        for i, customer in enumerate(self._customers[index:], index):
-            self._customers[i] = self.function(customer, self._customers[i - 1])
+        self._propagate(index + 1)
+        self._propagate_backward(index - 1)
 
     def pop_stop(self):
-        self._customers.pop()
+        self._check_not_frozen()
+
+        if len(self._indices) > 2:
+            self._distance -= self._get_leg_distance(
+                start=self._indices[-2], end=self._indices[-1]
+            )
+        else:
+            self._distance = 0.0
+
+        self._load -= int(self._instance.demands[self._indices.pop()])
+        self._arrival_times.pop()
+        self._latest_arrival_times.pop()
+
+        if self._loads is not None:
+            self._loads.pop()
+
+        self._propagate_backward(len(self._indices) - 1)
 
     def remove_stop(self, index: int):
+        self._check_not_frozen()
+
         if index >= len(self):
             raise IndexError(
                 f"Attempted to remove at index {index} but there are only {len(self)} "
@@ -125,10 +299,115 @@ class Route:
         elif index == len(self) - 1:
             return self.pop_stop()
 
-        self._customers = self._customers[:index] + self._customers[index + 1 :]
+        demand = self._instance.get_customer(self._indices[index]).demand
+
+        if len(self._indices) == 2:
+            self._distance = 0.0
+        elif index == 0:
+            self._distance -= self._get_leg_distance(
+                start=self._indices[0], end=self._indices[1]
+            )
+        else:
+            self._distance -= self._get_detour(
+                previous=self._indices[index - 1],
+                current=self._indices[index],
+                following=self._indices[index + 1],
+            )
+
+        del self._indices[index]
+        del self._arrival_times[index]
+        del self._latest_arrival_times[index]
+        self._load -= demand
+        self._loads = None
+
+        self._propagate(index)
+        self._propagate_backward(index - 1)
+
+    def get_insertion_arrival_time(self, customer: Customer, index: int) -> int:
+        if index == 0:
+            return 0
+
+        return self._instance.get_arrival_time(
+            previous=self._indices[index - 1],
+            previous_arrival_time=self._arrival_times[index - 1],
+            current=customer.number,
+        )
+
+    def can_insert(self, customer: Customer, index: int) -> bool:
+        # Inserting between stops index - 1 and index only shifts
+        # the schedule after the new stop, so it's enough to check
+        # the new stop against its due time and its successor
+        # against its latest arrival time.
+        if index < 0 or index > len(self):
+            return False
+
+        feasible_arcs = self._instance.feasible_arcs
+
+        if index > 0 and not feasible_arcs[self._indices[index - 1], customer.number]:
+            return False
+
+        if (
+            index < len(self)
+            and not feasible_arcs[customer.number, self._indices[index]]
+        ):
+            return False
+
+        if self.cost + customer.demand > self._instance.vehicle_capacity:
+            return False
+
+        arrival_time = self.get_insertion_arrival_time(customer=customer, index=index)
+
+        if arrival_time > customer.due_time:
+            return False
+
+        if index == len(self):
+            return True
+
+        successor_arrival_time = self._instance.get_arrival_time(
+            previous=customer.number,
+            previous_arrival_time=arrival_time,
+            current=self._indices[index],
+        )
 
-        for i, customer in enumerate(self._customers[index:], index):
-            self._customers[i] = self.function(customer, self._customers[i - 1])
+        return successor_arrival_time <= self._latest_arrival_times[index]
+
+    def evaluate_insertions(
+        self, customers: Iterable[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # A vectorised can_insert for every given customer number
+        # and every position between two consecutive stops. Rows
+        # are customers, column i is the insertion at index i + 1.
+        # Returns the feasibility mask, the arrival times at the
+        # inserted customers and the new arrival times at their
+        # successors.
+        instance = self._instance
+        customers = np.asarray(customers, dtype=int)[:, np.newaxis]
+        indices = np.array(self._indices)
+        previous, following = indices[np.newaxis, :-1], indices[np.newaxis, 1:]
+
+        insertion_arrival_times = np.maximum(
+            instance.ready_times[customers],
+            np.array(self._arrival_times[:-1])[np.newaxis, :]
+            + instance.service_times[previous]
+            + instance.travel_times[previous, customers],
+        )
+        successor_arrival_times = np.maximum(
+            instance.ready_times[following],
+            insertion_arrival_times
+            + instance.service_times[customers]
+            + instance.travel_times[customers, following],
+        )
+
+        feasible = (
+            (insertion_arrival_times <= instance.due_times[customers])
+            & (
+                successor_arrival_times
+                <= np.array(self._latest_arrival_times[1:])[np.newaxis, :]
+            )
+            & (self.cost + instance.demands[customers] <= instance.vehicle_capacity)
+        )
+
+        return feasible, insertion_arrival_times, successor_arrival_times
 
     @staticmethod
     def output_result(routes: Iterable["Route"]) -> str:
@@ -146,22 +425,26 @@ class Route:
     # region Dunder Methods
     def __repr__(self):
         return "->".join(
-            f"{customer.number}({customer.serviced_at})" for customer in self._customers
+            f"{index}({arrival_time})"
+            for index, arrival_time in zip(self._indices, self._arrival_times)
         )
 
     def __str__(self):
         return repr(self)
 
     def __len__(self):
-        return len(self._customers)
+        return len(self._indices)
 
     def __getitem__(self, key):
-        return self._customers[key]
+        return self.customers[key]
+
+    def __iter__(self):
+        return iter(self.customers)
 
     def __eq__(self, other: "Route"):
-        if other is None or not isinstance(other, Route) or len(self) != len(other):
+        if other is None or not isinstance(other, Route):
             return False
 
-        return all(self[i] == other[i] for i in range(len(self)))
+        return self._indices == other._indices
 
     # endregion
@@ -0,0 +1,281 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .instance import Instance
+from .route import Route
+from .scheduler import Scheduler
+
+
+class RouteEliminationScheduler(Scheduler):
+    @staticmethod
+    def _check_elimination_args(
+        max_iterations_per_customer: int, n_perturbation_moves: int
+    ):
+        if not isinstance(max_iterations_per_customer, int):
+            raise TypeError(
+                "Expected argument max_iterations_per_customer to be an int, "
+                f"instead it is {type(max_iterations_per_customer)}."
+            )
+
+        if not isinstance(n_perturbation_moves, int):
+            raise TypeError(
+                "Expected argument n_perturbation_moves to be an int, instead it is "
+                f"{type(n_perturbation_moves)}."
+            )
+
+        if max_iterations_per_customer < 1 or n_perturbation_moves < 0:
+            raise ValueError(
+                "Expected argument max_iterations_per_customer to be positive and "
+                "n_perturbation_moves to be non-negative, instead they are "
+                f"{max_iterations_per_customer} and {n_perturbation_moves}."
+            )
+
+        return max_iterations_per_customer, n_perturbation_moves
+
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Instance,
+        max_iterations_per_customer: int = 50,
+        n_perturbation_moves: int = 10,
+        n_neighbours: int = 20,
+    ):
+        super().__init__(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
+        )
+
+        (
+            self._max_iterations_per_customer,
+            self._n_perturbation_moves,
+        ) = self._check_elimination_args(
+            max_iterations_per_customer=max_iterations_per_customer,
+            n_perturbation_moves=n_perturbation_moves,
+        )
+
+        # Ejections are only tried in routes that visit one of the
+        # customer's nearest neighbours, anything else is unlikely
+        # to take it in anyway.
+        graph = instance.get_graph(
+            customers=[x for x in instance.customers if x.number != 0]
+        )
+        self._neighbours = {
+            x.number: graph.get_neighbours(customer=x)[:n_neighbours]
+            for x in instance.customers
+            if x.number != 0
+        }
+
+        # Penalty counters: how often a customer couldn't be put
+        # back directly. Customers that keep coming back to the pool
+        # are the hard ones, so they're the last we want to eject.
+        self._penalties = np.zeros(len(instance.demands), dtype=int)
+
+        # State of the elimination attempt in progress.
+        self._routes: Optional[List[Route]] = None
+        self._pool: List[int] = list()
+        self._n_iterations = 0
+        self._max_iterations = 0
+        self._n_failures = 0
+
+    # region Properties
+    @property
+    def in_progress(self) -> bool:
+        return self._routes is not None
+
+    @property
+    def pool(self) -> List[int]:
+        return list(self._pool)
+
+    # endregion
+
+    def start(self, routes: List[Route]) -> bool:
+        # Copies the routes without the one with the fewest customers
+        # and puts its customers in the pool. Routes that failed to be
+        # eliminated before are skipped by moving on to the next
+        # smallest one each time. Returns whether there's anything to
+        # eliminate.
+        if len(routes) < 2:
+            return False
+
+        order = sorted(range(len(routes)), key=lambda x: (len(routes[x]), x))
+        eliminated = order[self._n_failures % len(order)]
+
+        instance = self.instance
+        self._routes = [
+            Route(instance=instance, customers=route.customers)
+            for i, route in enumerate(routes)
+            if i != eliminated
+        ]
+        self._pool = [x for x in routes[eliminated].indices if x != 0]
+        self._n_iterations = 0
+        self._max_iterations = self._max_iterations_per_customer * len(self._pool)
+
+        return True
+
+    def clear(self):
+        # Drops the attempt in progress without counting it as a
+        # failure, e.g. when the solution it started from is replaced.
+        self._routes = None
+        self._pool = list()
+
+    def abort(self):
+        self.clear()
+        self._n_failures += 1
+
+    def get_best_insertion(
+        self, customer: int, routes: List[Route]
+    ) -> Optional[Tuple[float, int, int]]:
+        # Cheapest feasible (detour, route index, position) over all
+        # routes, or None if it fits nowhere.
+        distances = self.instance.distances
+        best = None
+
+        for route_index, route in enumerate(routes):
+            feasible, _, _ = route.evaluate_insertions(customers=[customer])
+            feasible = feasible[0]
+
+            if not np.any(feasible):
+                continue
+
+            indices = np.array(route.indices)
+            detours = (
+                distances[indices[:-1], customer]
+                + distances[customer, indices[1:]]
+                - distances[indices[:-1], indices[1:]]
+            )
+            detours[~feasible] = np.inf
+            position = int(np.argmin(detours))
+
+            if best is None or detours[position] < best[0]:
+                best = (float(detours[position]), route_index, position + 1)
+
+        return best
+
+    def get_best_ejection(
+        self, customer: int, routes: List[Route]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        # Finds the customer whose removal lets the given one in,
+        # preferring the least penalised one, then the smallest
+        # detour. Returns (route index, ejected position, insertion
+        # position in the route without the ejected customer, ejected
+        # customer number).
+        instance = self.instance
+        demand = int(instance.demands[customer])
+        best_key, best = None, None
+
+        neighbours = set(self._neighbours[customer])
+        candidates = [
+            i
+            for i, route in enumerate(routes)
+            if not neighbours.isdisjoint(route.indices)
+        ]
+
+        for route_index in candidates:
+            route = routes[route_index]
+            indices = route.indices
+
+            for position in range(1, len(route) - 1):
+                ejected = indices[position]
+
+                if (
+                    route.cost - int(instance.demands[ejected]) + demand
+                    > instance.vehicle_capacity
+                ):
+                    continue
+
+                # Cheap to skip: removing a customer can't help if it's
+                # penalised more than the best one found so far.
+                if best_key is not None and self._penalties[ejected] > best_key[0]:
+                    continue
+
+                reduced = Route(
+                    instance=instance,
+                    customers=[
+                        instance.get_customer(x)
+                        for i, x in enumerate(indices)
+                        if i != position
+                    ],
+                )
+                insertion = self.get_best_insertion(customer=customer, routes=[reduced])
+
+                if insertion is None:
+                    continue
+
+                key = (int(self._penalties[ejected]), insertion[0])
+
+                if best_key is None or key < best_key:
+                    best_key = key
+                    best = (route_index, position, insertion[2], ejected)
+
+        return best
+
+    def perturb(self, routes: List[Route]):
+        # A few random feasible relocations, so the next attempt to
+        # insert from the pool sees different routes.
+        instance = self.instance
+
+        for _ in range(self._n_perturbation_moves):
+            if len(routes) < 2:
+                return
+
+            source, target = np.random.choice(len(routes), size=2, replace=False)
+
+            if len(routes[source]) < 4:
+                continue
+
+            position = np.random.randint(1, len(routes[source]) - 1)
+            customer = instance.get_customer(routes[source].indices[position])
+            insertion = self.get_best_insertion(
+                customer=customer.number, routes=[routes[target]]
+            )
+
+            if insertion is not None:
+                routes[source].remove_stop(index=position)
+                routes[target].insert_stop(customer=customer, index=insertion[2])
+
+    def step(self) -> Optional[List[Route]]:
+        # Puts one customer from the pool back. Returns the routes
+        # once the pool is empty, i.e. a route has been eliminated,
+        # and None otherwise. Gives up after too many iterations.
+        if not self.in_progress:
+            return None
+
+        instance = self.instance
+        routes = self._routes
+        customer = self._pool.pop()
+        self._n_iterations += 1
+
+        insertion = self.get_best_insertion(customer=customer, routes=routes)
+
+        if insertion is not None:
+            _, route_index, position = insertion
+            routes[route_index].insert_stop(
+                customer=instance.get_customer(customer), index=position
+            )
+        else:
+            self._penalties[customer] += 1
+            ejection = self.get_best_ejection(customer=customer, routes=routes)
+
+            if ejection is None:
+                self._pool.insert(0, customer)
+            else:
+                route_index, ejected_position, position, ejected = ejection
+                routes[route_index].remove_stop(index=ejected_position)
+                routes[route_index].insert_stop(
+                    customer=instance.get_customer(customer), index=position
+                )
+                self._pool.append(ejected)
+
+            self.perturb(routes=routes)
+
+        if len(self._pool) == 0:
+            self._routes = None
+            self._n_failures = 0
+
+            return [route for route in routes if len(route) > 2]
+
+        if self._n_iterations >= self._max_iterations:
+            self.abort()
+
+        return None
@@ -1,11 +1,14 @@
-from typing import Iterable
+from typing import Iterable, Optional
 
-from .customer import Customer, CustomerGraph
+from .customer import Customer
+from .instance import Instance
 
 
 class Scheduler:
     @staticmethod
-    def _check_init_args(n_vehicles: int, vehicle_capacity: int):
+    def _check_init_args(
+        n_vehicles: int, vehicle_capacity: int, instance: Optional[Instance]
+    ):
         if not isinstance(n_vehicles, int):
             raise TypeError(
                 "Expected argument n_vehicles to be an int, instead it is "
@@ -30,15 +33,27 @@ class Scheduler:
                 f"it is {vehicle_capacity}."
             )
 
-        return n_vehicles, vehicle_capacity
+        if instance is not None and not isinstance(instance, Instance):
+            raise TypeError(
+                "Expected argument instance to be an Instance, instead it is "
+                f"{type(instance)}."
+            )
 
-    def __init__(self, n_vehicles: int, vehicle_capacity: int):
-        n_vehicles, vehicle_capacity = self._check_init_args(
-            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity
+        return n_vehicles, vehicle_capacity, instance
+
+    def __init__(
+        self,
+        n_vehicles: int,
+        vehicle_capacity: int,
+        instance: Optional[Instance] = None,
+    ):
+        n_vehicles, vehicle_capacity, instance = self._check_init_args(
+            n_vehicles=n_vehicles, vehicle_capacity=vehicle_capacity, instance=instance
         )
 
         self._n_vehicles = n_vehicles
         self._vehicle_capacity = vehicle_capacity
+        self._instance = instance
 
     # region Properties
     @property
@@ -49,8 +64,22 @@ class Scheduler:
     def vehicle_capacity(self) -> int:
         return self._vehicle_capacity
 
+    @property
+    def instance(self) -> Optional[Instance]:
+        return self._instance
+
     # endregion
 
+    def get_instance(self, customers: Iterable[Customer]) -> Instance:
+        if self._instance is not None:
+            return self._instance
+
+        return Instance(
+            customers=customers,
+            n_vehicles=self.n_vehicles,
+            vehicle_capacity=self.vehicle_capacity,
+        )
+
     def __repr__(self):
         return f"Scheduler(n={self.n_vehicles},c={self.vehicle_capacity})"
 
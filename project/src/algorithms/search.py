@@ -0,0 +1,372 @@
+import time
+from typing import Dict, List, Optional
+
+from timing.budget import Checkpoint, TimeBudget
+
+from .acceptance import AcceptanceCriterion, get_acceptance_criterion
+from .alns import ALNSScheduler
+from .elite import EliteArchive
+from .instance import Instance
+from .local_search import LOCAL_SEARCH_MODES, LocalSearchScheduler
+from .merger import MergerScheduler
+from .objective import Objective
+from .route_elimination import RouteEliminationScheduler
+from .route import Route
+
+OPTIMIZERS = ("merger", "local_search", "alns")
+
+
+class Search:
+    @staticmethod
+    def _check_init_args(
+        instance: Instance, routes: List[Route], optimizer: str, local_search_mode: str
+    ):
+        if not isinstance(instance, Instance):
+            raise TypeError(
+                "Expected argument instance to be an Instance, instead it is "
+                f"{type(instance)}."
+            )
+
+        routes = list(routes)
+
+        for route in routes:
+            if not isinstance(route, Route):
+                raise TypeError(
+                    "Expected all elements of argument routes to be of type Route, "
+                    f"but found an element of type {type(route)}."
+                )
+
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(
+                f"Expected argument optimizer to be one of {OPTIMIZERS}, instead it "
+                f"is {optimizer}."
+            )
+
+        if local_search_mode not in LOCAL_SEARCH_MODES:
+            raise ValueError(
+                "Expected argument local_search_mode to be one of "
+                f"{LOCAL_SEARCH_MODES}, instead it is {local_search_mode}."
+            )
+
+        return instance, routes, optimizer, local_search_mode
+
+    def __init__(
+        self,
+        instance: Instance,
+        routes: List[Route],
+        optimizer: str = "merger",
+        local_search_mode: str = "first",
+        acceptance: str = "improvement",
+        duration: float = 0.0,
+        elimination_time: float = 0.0,
+        elimination_iterations: int = 0,
+        objective: Optional[Objective] = None,
+        archive: Optional[EliteArchive] = None,
+        merge_criterion: str = "load_spread",
+    ):
+        (
+            self._instance,
+            self._routes,
+            self._optimizer,
+            self._local_search_mode,
+        ) = self._check_init_args(
+            instance=instance,
+            routes=routes,
+            optimizer=optimizer,
+            local_search_mode=local_search_mode,
+        )
+
+        # Every optimizer and the acceptance criterion compare
+        # solutions by the same objective.
+        if objective is None:
+            objective = Objective(instance=instance)
+
+        self._objective = objective
+
+        self._merger_scheduler = MergerScheduler(
+            n_vehicles=instance.n_vehicles,
+            vehicle_capacity=instance.vehicle_capacity,
+            instance=instance,
+            objective=objective,
+            criterion=merge_criterion,
+        )
+        self._local_search_scheduler = None
+        self._alns_scheduler = None
+
+        if optimizer == "alns":
+            self._alns_scheduler = ALNSScheduler(
+                n_vehicles=instance.n_vehicles,
+                vehicle_capacity=instance.vehicle_capacity,
+                instance=instance,
+                merger_scheduler=self._merger_scheduler,
+                objective=objective,
+            )
+        elif optimizer == "local_search":
+            self._local_search_scheduler = LocalSearchScheduler(
+                n_vehicles=instance.n_vehicles,
+                vehicle_capacity=instance.vehicle_capacity,
+                instance=instance,
+                mode=local_search_mode,
+                objective=objective,
+            )
+
+        # Plain improvement has no criterion: every change is an
+        # improvement, so the current solution is also the best one.
+        self._acceptance = get_acceptance_criterion(
+            name=acceptance,
+            routes=self._routes,
+            duration=duration,
+            objective=objective,
+        )
+        # The cost of the current routes, only ever updated with the
+        # difference a step makes.
+        self._cost = objective.cost(routes=self._routes)
+        self._best_routes = self._routes
+        self._best_cost = self._cost
+
+        # Every solution the search moves to is offered to the
+        # archive, not just new best ones, so it also collects good
+        # alternatives the acceptance criterion walked through.
+        if archive is not None and not isinstance(archive, EliteArchive):
+            raise TypeError(
+                "Expected argument archive to be an EliteArchive, instead it is "
+                f"{type(archive)}."
+            )
+
+        self._archive = archive
+
+        if archive is not None:
+            archive.add(routes=self._routes, cost=self._cost)
+
+        # Fleet size dominates the objective, so the first
+        # elimination_time seconds (or elimination_iterations
+        # iterations, which is reproducible) only try to get rid of
+        # routes.
+        self._elimination_scheduler = None
+        self._elimination_budget = None
+        self._elimination_iterations = elimination_iterations
+
+        # The acceptance criterion isn't used while routes are being
+        # eliminated, so its schedule only starts afterwards, with
+        # whatever is left of the duration.
+        self._duration = duration
+        self._start_time = time.monotonic()
+
+        if elimination_time > 0 or elimination_iterations > 0:
+            self._elimination_scheduler = RouteEliminationScheduler(
+                n_vehicles=instance.n_vehicles,
+                vehicle_capacity=instance.vehicle_capacity,
+                instance=instance,
+            )
+
+        if elimination_time > 0:
+            self._elimination_budget = TimeBudget(
+                checkpoints=[Checkpoint(seconds=elimination_time)]
+            )
+
+        self._n_iterations = 0
+        self._n_no_change = 0
+
+    # region Properties
+    @property
+    def instance(self) -> Instance:
+        return self._instance
+
+    @property
+    def routes(self) -> List[Route]:
+        return self._routes
+
+    @property
+    def objective(self) -> Objective:
+        return self._objective
+
+    @property
+    def cost(self) -> float:
+        return self._cost
+
+    @property
+    def best_routes(self) -> List[Route]:
+        return self._best_routes
+
+    @property
+    def archive(self) -> Optional[EliteArchive]:
+        return self._archive
+
+    @property
+    def acceptance(self) -> Optional[AcceptanceCriterion]:
+        return self._acceptance
+
+    @property
+    def optimizer(self) -> str:
+        return self._optimizer
+
+    @property
+    def local_search_mode(self) -> str:
+        return self._local_search_mode
+
+    @property
+    def n_iterations(self) -> int:
+        return self._n_iterations
+
+    @property
+    def is_eliminating(self) -> bool:
+        return self._elimination_scheduler is not None
+
+    @property
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        # Per-operator statistics, only ALNS keeps any.
+        if self._alns_scheduler is None:
+            return dict()
+
+        return self._alns_scheduler.statistics
+
+    @property
+    def cache_statistics(self) -> Dict[str, int]:
+        return self._merger_scheduler.cache_statistics
+
+    # endregion
+
+    def _set_routes(self, routes: List[Route]):
+        self._cost += self._objective.cost_delta(
+            old_routes=self._routes, new_routes=routes
+        )
+        self._routes = routes
+
+        if self._archive is not None:
+            self._archive.add(routes=routes, cost=self._cost)
+
+    def restart(self, routes: List[Route]):
+        # Continues the search from other routes, e.g. the best ones
+        # of a portfolio. Everything else it built up (operator
+        # weights, the merge cache, the cooling schedule) is kept.
+        self._routes = list(routes)
+        self._cost = self._objective.cost(routes=self._routes)
+        self._best_routes = self._routes
+        self._best_cost = self._cost
+        self._n_no_change = 0
+
+        if self._acceptance is not None:
+            self._acceptance.restart(cost=self._cost)
+
+        if self._elimination_scheduler is not None:
+            self._elimination_scheduler.clear()
+
+        if self._archive is not None:
+            self._archive.add(routes=self._routes, cost=self._cost)
+
+    def stop_elimination(self):
+        self._elimination_scheduler = None
+        self._elimination_budget = None
+
+        if self._acceptance is not None:
+            self._acceptance.start(
+                duration=self._duration - (time.monotonic() - self._start_time)
+            )
+
+    def eliminate_step(self) -> bool:
+        if (
+            self._elimination_budget is not None and self._elimination_budget.expired()
+        ) or 0 < self._elimination_iterations < self._n_iterations:
+            self.stop_elimination()
+
+            return False
+
+        scheduler = self._elimination_scheduler
+
+        if not scheduler.in_progress and not scheduler.start(routes=self._routes):
+            # Nothing else changes the routes while eliminating, so
+            # the next start would fail all the same.
+            self.stop_elimination()
+
+            return False
+
+        new_routes = scheduler.step()
+
+        if new_routes is None:
+            return False
+
+        self._set_routes(routes=new_routes)
+
+        if self._acceptance is not None:
+            self._acceptance.set_current_cost(cost=self._cost)
+
+        # One route less is always an improvement.
+        self._best_routes = new_routes
+        self._best_cost = self._cost
+
+        return True
+
+    def step(self) -> bool:
+        # Runs a single iteration and returns whether the best
+        # routes have changed.
+        self._n_iterations += 1
+        new_routes = None
+        # Whether the acceptance criterion still has to be told about
+        # the new routes, the other optimizers update it themselves.
+        is_local_search_move = False
+
+        if self.is_eliminating:
+            return self.eliminate_step()
+
+        if self._alns_scheduler is not None:
+            # ALNS already perturbs the solution itself, and updates
+            # the acceptance criterion when it takes a move.
+            new_routes = self._alns_scheduler.optimize_solution(
+                routes=self._routes, acceptance=self._acceptance, cost=self._cost
+            )
+
+            if new_routes is None:
+                self._n_no_change += 1
+
+                return False
+        elif self._local_search_scheduler is not None:
+            new_routes = self._local_search_scheduler.optimize_solution(
+                routes=self._routes
+            )
+
+            is_local_search_move = new_routes is not None
+
+        # Local search is stuck in a local optimum (or disabled),
+        # so perturb the solution with a merge step.
+        if new_routes is None:
+            new_routes = self._merger_scheduler.optimize_solution(
+                routes=self._routes,
+                max_selected_routes=self._n_no_change,
+                acceptance=self._acceptance,
+            )
+
+        if new_routes is None:
+            self._n_no_change += 1
+
+            return False
+
+        if len(new_routes) < len(self._routes):
+            self._n_no_change = 0
+        else:
+            self._n_no_change += 1
+
+        self._set_routes(routes=new_routes)
+
+        if self._acceptance is None:
+            self._best_routes = new_routes
+
+            return True
+
+        if is_local_search_move:
+            self._acceptance.set_current_cost(cost=self._cost)
+
+        if self._acceptance.current_cost < self._best_cost:
+            self._best_routes = new_routes
+            self._best_cost = self._acceptance.current_cost
+
+            return True
+
+        return False
+
+    def run(self, seconds: float) -> List[Route]:
+        budget = TimeBudget(checkpoints=[Checkpoint(seconds=max(0, seconds))])
+
+        while not budget.expired():
+            self.step()
+
+        return self._best_routes
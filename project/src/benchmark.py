@@ -0,0 +1,450 @@
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from algorithms.greedy import GreedyScheduler
+from algorithms.instance import Instance
+from algorithms.portfolio import get_solution_key
+from algorithms.route import Route
+from algorithms.search import Search
+from conversion.compiled import get_instance
+from dumping.writer import write_atomically
+from parsing.benchmark_parser import get_benchmark_parser
+from timing.budget import Checkpoint, TimeBudget
+from validation.engine import Validator
+
+# Bumped whenever the layout of the results changes, so results
+# are never compared against an incompatible baseline.
+RESULTS_FORMAT_VERSION = 1
+
+
+def get_environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "n_cpus": os.cpu_count(),
+    }
+
+
+def get_solution_summary(routes: List[Route]) -> Dict[str, Any]:
+    n_vehicles, distance = get_solution_key(routes=routes)
+
+    return {"n_vehicles": n_vehicles, "distance": round(distance, 6)}
+
+
+def run_instance(
+    instance: Instance,
+    checkpoints: List[Union[Checkpoint, int]],
+    seed: int,
+    optimizer: str,
+    local_search_mode: str,
+    acceptance: str,
+    elimination_budget: Union[float, int],
+) -> Dict[str, Any]:
+    # Greedy construction followed by the search, the same way
+    # main.py runs it, recording the solution and throughput at every
+    # checkpoint. Checkpoints are either times, or numbers of
+    # iterations, in which case the elimination budget is a number
+    # of iterations too and the whole run is reproducible.
+    np.random.seed(seed)
+
+    construction_start = time.perf_counter()
+    routes = GreedyScheduler(
+        n_vehicles=instance.n_vehicles,
+        vehicle_capacity=instance.vehicle_capacity,
+        instance=instance,
+    ).construct_solution(customers=instance.customers)
+    construction_time = time.perf_counter() - construction_start
+
+    if isinstance(checkpoints[0], Checkpoint):
+        results = run_timed_search(
+            instance=instance,
+            routes=routes,
+            checkpoints=checkpoints,
+            optimizer=optimizer,
+            local_search_mode=local_search_mode,
+            acceptance=acceptance,
+            elimination_time=elimination_budget,
+        )
+    else:
+        results = run_counted_search(
+            instance=instance,
+            routes=routes,
+            checkpoints=checkpoints,
+            optimizer=optimizer,
+            local_search_mode=local_search_mode,
+            acceptance=acceptance,
+            elimination_iterations=elimination_budget,
+        )
+
+    best_routes = results.pop(None)
+    report = Validator.from_instance(instance).validate_routes(routes=best_routes)
+
+    return {
+        "seed": seed,
+        "construction_time": construction_time,
+        "construction": get_solution_summary(routes=routes),
+        "checkpoints": results,
+        "is_valid": report.is_valid,
+    }
+
+
+def get_checkpoint_result(search: Search, search_time: float) -> Dict[str, Any]:
+    return dict(
+        get_solution_summary(routes=search.best_routes),
+        n_iterations=search.n_iterations,
+        iterations_per_second=search.n_iterations / max(search_time, 1e-9),
+    )
+
+
+def run_timed_search(
+    instance: Instance,
+    routes: List[Route],
+    checkpoints: List[Checkpoint],
+    optimizer: str,
+    local_search_mode: str,
+    acceptance: str,
+    elimination_time: float,
+) -> Dict[Optional[str], Any]:
+    # Checkpoint times count from the start of the search. The best
+    # routes are stored under None.
+    budget = TimeBudget(checkpoints=checkpoints)
+    search = Search(
+        instance=instance,
+        routes=routes,
+        optimizer=optimizer,
+        local_search_mode=local_search_mode,
+        acceptance=acceptance,
+        duration=checkpoints[-1].seconds,
+        elimination_time=max(0.0, elimination_time),
+    )
+    search_start = time.perf_counter()
+    budget.start()
+    results = dict()
+
+    while not budget.is_finished:
+        checkpoint = budget.current
+
+        search.step()
+
+        if budget.poll() and budget.current != checkpoint:
+            search_time = time.perf_counter() - search_start
+
+            # A slow iteration can go past more than one checkpoint,
+            # they all get the same solution.
+            for passed in budget.checkpoints[: budget.current_index]:
+                results.setdefault(
+                    str(passed.label),
+                    get_checkpoint_result(search=search, search_time=search_time),
+                )
+
+    results[None] = search.best_routes
+
+    return results
+
+
+def run_counted_search(
+    instance: Instance,
+    routes: List[Route],
+    checkpoints: List[int],
+    optimizer: str,
+    local_search_mode: str,
+    acceptance: str,
+    elimination_iterations: int,
+) -> Dict[Optional[str], Any]:
+    # The best routes are stored under None.
+    search = Search(
+        instance=instance,
+        routes=routes,
+        optimizer=optimizer,
+        local_search_mode=local_search_mode,
+        acceptance=acceptance,
+        elimination_iterations=elimination_iterations,
+    )
+    search_start = time.perf_counter()
+    results = dict()
+
+    for checkpoint in checkpoints:
+        while search.n_iterations < checkpoint:
+            search.step()
+
+        results[f"{checkpoint}it"] = get_checkpoint_result(
+            search=search, search_time=time.perf_counter() - search_start
+        )
+
+    results[None] = search.best_routes
+
+    return results
+
+
+def aggregate_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # The search is bounded by time, so even with fixed seeds the
+    # number of iterations, and with it the solution, varies a bit
+    # between runs. Quality is taken from the best run and
+    # throughput from the median one, which both move a lot less
+    # than a single run does.
+    checkpoints = dict()
+
+    for label in runs[0]["checkpoints"]:
+        values = [x["checkpoints"][label] for x in runs if label in x["checkpoints"]]
+        best = min(values, key=lambda x: (x["n_vehicles"], x["distance"]))
+
+        checkpoints[label] = {
+            "n_vehicles": best["n_vehicles"],
+            "distance": best["distance"],
+            "n_iterations": int(np.median([x["n_iterations"] for x in values])),
+            "iterations_per_second": float(
+                np.median([x["iterations_per_second"] for x in values])
+            ),
+        }
+
+    return {
+        "construction_time": float(np.median([x["construction_time"] for x in runs])),
+        "construction": runs[0]["construction"],
+        "checkpoints": checkpoints,
+        "is_valid": all(x["is_valid"] for x in runs),
+        "runs": runs,
+    }
+
+
+def run_benchmark(
+    instance_paths: List[Path],
+    checkpoints: List[Union[Checkpoint, int]],
+    seed: int,
+    n_runs: int,
+    optimizer: str,
+    local_search_mode: str,
+    acceptance: str,
+    elimination_budget: Union[float, int],
+) -> Dict[str, Any]:
+    results = {
+        "version": RESULTS_FORMAT_VERSION,
+        "configuration": {
+            "checkpoints": [
+                str(x.label) if isinstance(x, Checkpoint) else f"{x}it"
+                for x in checkpoints
+            ],
+            "seed": seed,
+            "n_runs": n_runs,
+            "optimizer": optimizer,
+            "local_search_mode": local_search_mode,
+            "acceptance": acceptance,
+            "elimination_budget": elimination_budget,
+        },
+        "environment": get_environment(),
+        "instances": dict(),
+    }
+
+    for instance_path in instance_paths:
+        print(f"Running {instance_path.stem}...", file=sys.stderr)
+
+        instance = get_instance(source_path=instance_path)
+        runs = [
+            run_instance(
+                instance=instance,
+                checkpoints=checkpoints,
+                seed=seed + i,
+                optimizer=optimizer,
+                local_search_mode=local_search_mode,
+                acceptance=acceptance,
+                elimination_budget=elimination_budget,
+            )
+            for i in range(n_runs)
+        ]
+
+        results["instances"][instance_path.stem] = dict(
+            n_customers=len(instance) - 1, **aggregate_runs(runs=runs)
+        )
+
+    return results
+
+
+def compare_results(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    distance_tolerance: float,
+    throughput_tolerance: float,
+) -> List[str]:
+    # Returns a description of every regression against the
+    # baseline: more vehicles, a distance more than
+    # distance_tolerance (relative) longer, fewer iterations per
+    # second by more than throughput_tolerance (relative), or an
+    # invalid solution.
+    regressions = list()
+
+    if baseline.get("version") != results["version"]:
+        return [
+            f"The baseline has format version {baseline.get('version')}, instead of "
+            f"{results['version']}."
+        ]
+
+    if baseline["configuration"] != results["configuration"]:
+        regressions.append(
+            "The baseline was recorded with a different configuration: "
+            f"{baseline['configuration']}."
+        )
+
+    for name, result in results["instances"].items():
+        baseline_result = baseline["instances"].get(name)
+
+        if baseline_result is None:
+            continue
+
+        if not result["is_valid"]:
+            regressions.append(f"{name}: the final solution is invalid.")
+
+        for label, values in result["checkpoints"].items():
+            baseline_values = baseline_result["checkpoints"].get(label)
+
+            if baseline_values is None:
+                continue
+
+            if values["n_vehicles"] > baseline_values["n_vehicles"]:
+                regressions.append(
+                    f"{name} @ {label}: {values['n_vehicles']} vehicles, the baseline "
+                    f"has {baseline_values['n_vehicles']}."
+                )
+            elif values["n_vehicles"] == baseline_values["n_vehicles"] and values[
+                "distance"
+            ] > baseline_values["distance"] * (1 + distance_tolerance):
+                regressions.append(
+                    f"{name} @ {label}: distance {values['distance']:.2f}, the "
+                    f"baseline has {baseline_values['distance']:.2f}."
+                )
+
+            if values["iterations_per_second"] < baseline_values[
+                "iterations_per_second"
+            ] * (1 - throughput_tolerance):
+                regressions.append(
+                    f"{name} @ {label}: {values['iterations_per_second']:.1f} "
+                    "iterations/s, the baseline has "
+                    f"{baseline_values['iterations_per_second']:.1f}."
+                )
+
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [
+        f"{'Instance':<36}{'Checkpoint':>16}{'Vehicles':>10}{'Distance':>12}"
+        f"{'Iter/s':>10}"
+    ]
+
+    for name, result in results["instances"].items():
+        construction = result["construction"]
+        construction_label = f"greedy {result['construction_time']:.3f}s"
+        lines.append(
+            f"{name:<36}{construction_label:>16}"
+            f"{construction['n_vehicles']:>10}{construction['distance']:>12.2f}"
+        )
+
+        for label, values in result["checkpoints"].items():
+            lines.append(
+                f"{'':<36}{label:>16}{values['n_vehicles']:>10}"
+                f"{values['distance']:>12.2f}{values['iterations_per_second']:>10.1f}"
+            )
+
+    return "\n".join(lines)
+
+
+def load_results(path: Union[Path, str]) -> Dict[str, Any]:
+    with open(path, encoding="utf8", errors="replace") as file:
+        return json.load(file)
+
+
+def save_results(path: Union[Path, str], results: Dict[str, Any]):
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    write_atomically(path=path, content=json.dumps(results, indent=2))
+
+
+def main():
+    parser = get_benchmark_parser()
+    args = parser.parse_args()
+
+    instance_folder = Path(args.instance_folder_path)
+
+    if not os.path.isdir(instance_folder):
+        raise NotADirectoryError(
+            f"Path {instance_folder} doesn't point to a directory!"
+        )
+
+    if args.runs < 1:
+        raise ValueError(
+            f"Expected argument runs to be a positive integer, instead it is "
+            f"{args.runs}."
+        )
+
+    instance_paths = sorted(
+        x for x in instance_folder.iterdir() if x.suffix in (".txt", ".json")
+    )
+    if args.iterations:
+        checkpoints = sorted({int(x) for x in args.checkpoints})
+        elimination_budget = args.elimination_budget
+
+        if elimination_budget is None:
+            elimination_budget = checkpoints[-1] // 10
+
+        elimination_budget = int(elimination_budget)
+    else:
+        checkpoints = sorted({Checkpoint.parse(x) for x in args.checkpoints})
+        elimination_budget = args.elimination_budget
+
+        if elimination_budget is None:
+            elimination_budget = 0.1 * checkpoints[-1].seconds
+
+    results = run_benchmark(
+        instance_paths=instance_paths,
+        checkpoints=checkpoints,
+        seed=args.seed,
+        n_runs=args.runs,
+        optimizer=args.optimizer,
+        local_search_mode=args.local_search_mode,
+        acceptance=args.acceptance,
+        elimination_budget=elimination_budget,
+    )
+
+    print(format_results(results=results))
+
+    if args.results_path is not None:
+        save_results(path=args.results_path, results=results)
+
+    if args.baseline_path is None:
+        return
+
+    if args.save_baseline:
+        save_results(path=args.baseline_path, results=results)
+        return
+
+    if not os.path.exists(args.baseline_path):
+        print(
+            f"WARNING - There's no baseline at {args.baseline_path}, record one with "
+            "--save_baseline.",
+            file=sys.stderr,
+        )
+        return
+
+    regressions = compare_results(
+        results=results,
+        baseline=load_results(path=args.baseline_path),
+        distance_tolerance=args.distance_tolerance,
+        throughput_tolerance=args.throughput_tolerance,
+    )
+
+    for regression in regressions:
+        print(f"REGRESSION - {regression}", file=sys.stderr)
+
+    if len(regressions) != 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from algorithms.customer import CustomerTable, MatrixCustomerGraph
+from algorithms.instance import Instance
+from dumping.writer import open_atomically
+
+from .txt_to_json import read_txt
+
+# Bumped whenever the arrays stored in a compiled instance change,
+# so stale files are rebuilt instead of misread.
+COMPILED_FORMAT_VERSION = 1
+COMPILED_SUFFIX = ".npz"
+DEFAULT_CACHE_FOLDER_NAME = "compiled"
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_content_hash(path: Union[Path, str]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, mode="rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def get_compiled_path(
+    source_path: Union[Path, str], cache_folder: Optional[Union[Path, str]] = None
+) -> Path:
+    # Compiled instances are named after the hash of their source,
+    # so an edited source never picks up an old compiled file.
+    source_path = Path(source_path)
+
+    if cache_folder is None:
+        cache_folder = source_path.parent / DEFAULT_CACHE_FOLDER_NAME
+
+    return Path(cache_folder) / f"{get_content_hash(source_path)}{COMPILED_SUFFIX}"
+
+
+def read_instance(source_path: Union[Path, str]) -> Tuple[int, int, np.ndarray]:
+    # Returns the number of vehicles, their capacity, and the customer
+    # rows (depot included) as an integer array.
+    source_path = Path(source_path)
+
+    if source_path.suffix == ".txt":
+        vehicle, _, customers = read_txt(source_path=source_path)
+    elif source_path.suffix == ".json":
+        with open(source_path, encoding="utf8", errors="replace") as file:
+            json_dict = json.load(file)
+
+        vehicle = json_dict["vehicle"]
+        customers = np.array(json_dict["customers"][1:], dtype=np.int64)
+    else:
+        raise RuntimeError(
+            "Expected an instance path with suffix .txt or .json, instead got "
+            f"instance path suffix {source_path.suffix}."
+        )
+
+    return vehicle["number"], vehicle["capacity"], customers
+
+
+def get_instance_arrays(
+    n_vehicles: int, vehicle_capacity: int, customers: np.ndarray
+) -> Dict[str, np.ndarray]:
+    # The matrices are indexed by customer number, like the ones an
+    # Instance computes itself.
+    coordinates = np.zeros((np.max(customers[:, 0]) + 1, 2), dtype=np.int64)
+    coordinates[customers[:, 0]] = customers[:, 1:3]
+    distances = MatrixCustomerGraph.get_distance_matrix(coordinates=coordinates)
+
+    return {
+        "version": np.array(COMPILED_FORMAT_VERSION),
+        "n_vehicles": np.array(n_vehicles),
+        "vehicle_capacity": np.array(vehicle_capacity),
+        "customers": customers,
+        "distances": distances,
+        "travel_times": Instance.initialize_travel_times(distances=distances),
+    }
+
+
+def save_compiled_instance(path: Union[Path, str], arrays: Dict[str, np.ndarray]):
+    # Written next to its final location and renamed, so a run that
+    # is loading it never sees half a file.
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+
+    with open_atomically(path=path, binary=True) as file:
+        np.savez(file, **arrays)
+
+
+def load_compiled_instance(path: Union[Path, str]) -> Optional[Dict[str, np.ndarray]]:
+    # Returns None if there is no usable compiled instance at path.
+    try:
+        with np.load(path) as file:
+            arrays = {key: file[key] for key in file.files}
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+    if arrays.get("version") != COMPILED_FORMAT_VERSION:
+        return None
+
+    return arrays
+
+
+def compile_instance(
+    source_path: Union[Path, str], cache_folder: Optional[Union[Path, str]] = None
+) -> Path:
+    compiled_path = get_compiled_path(
+        source_path=source_path, cache_folder=cache_folder
+    )
+
+    save_compiled_instance(
+        path=compiled_path,
+        arrays=get_instance_arrays(*read_instance(source_path=source_path)),
+    )
+
+    return compiled_path
+
+
+def get_compiled_instance(
+    source_path: Union[Path, str], cache_folder: Optional[Union[Path, str]] = None
+) -> Dict[str, np.ndarray]:
+    # Loads the compiled instance of the source, or compiles it if
+    # there isn't one yet. A .npz source is loaded as it is. Failing
+    # to save the compiled instance only costs the next run time,
+    # so it's not an error.
+    source_path = Path(source_path)
+
+    if source_path.suffix == COMPILED_SUFFIX:
+        arrays = load_compiled_instance(path=source_path)
+
+        if arrays is None:
+            raise RuntimeError(f"{source_path} is not a compiled instance!")
+
+        return arrays
+
+    compiled_path = get_compiled_path(
+        source_path=source_path, cache_folder=cache_folder
+    )
+    arrays = load_compiled_instance(path=compiled_path)
+
+    if arrays is None:
+        arrays = get_instance_arrays(*read_instance(source_path=source_path))
+
+        try:
+            save_compiled_instance(path=compiled_path, arrays=arrays)
+        except OSError as error:
+            print(
+                f"WARNING - Couldn't save the compiled instance to {compiled_path}: "
+                f"{error}",
+                file=sys.stderr,
+            )
+
+    return arrays
+
+
+def get_instance(
+    source_path: Union[Path, str], cache_folder: Optional[Union[Path, str]] = None
+) -> Instance:
+    arrays = get_compiled_instance(source_path=source_path, cache_folder=cache_folder)
+
+    return Instance(
+        # The rows were checked when the instance was compiled, so
+        # the table is made straight from them.
+        customers=CustomerTable(customers=arrays["customers"]),
+        n_vehicles=int(arrays["n_vehicles"]),
+        vehicle_capacity=int(arrays["vehicle_capacity"]),
+        distances=arrays["distances"],
+        travel_times=arrays["travel_times"],
+    )
@@ -1,39 +1,138 @@
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
 
 from .constants import WHITESPACE_REGEX, COLUMN_SEPARATOR_REGEX
 from .parsing.txt_to_json_parser import get_txt_to_json_parser
 
+# Lines before the customer rows: the vehicle block, the customer
+# column names and the blank lines around them.
+HEADER_LENGTH = 7
 
-def parse_txt(txt: str) -> Dict[str, Any]:
-    to_return = dict()
+# How much of the customer block is looked at at once when counting
+# its rows.
+READ_CHUNK_SIZE = 1 << 20
 
-    lines = txt.splitlines()
+
+def parse_header(lines: List[str]) -> Tuple[Dict[str, int], Tuple[str, ...]]:
     lines = [x.strip() for x in lines]
 
     vehicle_columns = WHITESPACE_REGEX.split(lines[1])
     vehicle_tuple = WHITESPACE_REGEX.split(lines[2])
     customer_columns = COLUMN_SEPARATOR_REGEX.split(lines[5])
-    customer_rows = [
-        WHITESPACE_REGEX.split(line)
-        for line in lines[7:]
-        if (line is not None and len(line) != 0)
-    ]
 
-    to_return["vehicle"] = dict()
+    vehicle = {
+        column.lower(): int(element)
+        for column, element in zip(vehicle_columns, vehicle_tuple)
+    }
+
+    return vehicle, tuple([x.lower() for x in customer_columns])
+
+
+def count_rows(chunks: Iterable[bytes]) -> int:
+    # The number of lines up to the last one with anything on it, so
+    # trailing blank lines don't count. Goes through the data a chunk
+    # at a time, without any per-byte temporaries.
+    n_rows = n_lines = 0
+
+    for chunk in chunks:
+        content = chunk.rstrip()
+
+        if len(content) != 0:
+            n_rows = n_lines + content.count(b"\n") + 1
+
+        n_lines += chunk.count(b"\n")
+
+    return n_rows
+
+
+def reshape_customers(
+    values: Optional[np.ndarray], n_rows: int, columns: Tuple[str, ...]
+) -> np.ndarray:
+    # Older versions of numpy stop parsing quietly at the first value
+    # that isn't an integer, newer ones raise, so either way the
+    # number of values read is checked against the number of rows.
+    if values is None:
+        found = "a value that isn't an integer"
+    elif len(values) != n_rows * len(columns):
+        found = f"{len(values)} values"
+    else:
+        return values.reshape(n_rows, len(columns))
+
+    raise ValueError(
+        f"Expected {n_rows} customer rows of {len(columns)} integers each, "
+        f"instead found {found}."
+    )
 
-    for column, element in zip(vehicle_columns, vehicle_tuple):
-        to_return["vehicle"][column.lower()] = int(element)
 
-    to_return["customers"] = [tuple([x.lower() for x in customer_columns])]
+def parse_customers(data: bytes, columns: Tuple[str, ...]) -> np.ndarray:
+    try:
+        values = np.fromstring(data, dtype=np.int64, sep=" ")
+    except ValueError:
+        values = None
+
+    return reshape_customers(
+        values=values, n_rows=count_rows(chunks=(data,)), columns=columns
+    )
+
+
+def read_customers(file: BinaryIO, columns: Tuple[str, ...]) -> np.ndarray:
+    # Parses the rest of the file straight into the array. The rows
+    # are counted beforehand in chunks, so the customer block is never
+    # held in memory as text.
+    start = file.tell()
+    n_rows = count_rows(chunks=iter(lambda: file.read(READ_CHUNK_SIZE), b""))
+    file.seek(start)
+
+    try:
+        values = np.fromfile(file, dtype=np.int64, sep=" ")
+    except ValueError:
+        values = None
+
+    return reshape_customers(values=values, n_rows=n_rows, columns=columns)
+
+
+def read_txt(
+    source_path: Union[Path, str],
+) -> Tuple[Dict[str, int], Tuple[str, ...], np.ndarray]:
+    # Only the header is read line by line, the customer rows are
+    # parsed straight from the file into a single integer array, so
+    # no intermediate strings or lists are built for them.
+    with open(source_path, mode="rb") as file:
+        header = [
+            file.readline().decode("utf8", errors="replace")
+            for _ in range(HEADER_LENGTH)
+        ]
+        vehicle, columns = parse_header(lines=header)
+
+        return vehicle, columns, read_customers(file=file, columns=columns)
+
+
+def to_json_dict(
+    vehicle: Dict[str, int], columns: Tuple[str, ...], customers: np.ndarray
+) -> Dict[str, Any]:
+    return {
+        "vehicle": dict(vehicle),
+        "customers": [columns] + [tuple(row) for row in customers.tolist()],
+    }
+
+
+def parse_txt(txt: str) -> Dict[str, Any]:
+    lines = txt.split("\n", HEADER_LENGTH)
+    customer_block = lines[HEADER_LENGTH] if len(lines) > HEADER_LENGTH else ""
 
-    for row in customer_rows:
-        row_to_add = tuple([int(x) for x in row])
-        to_return["customers"].append(row_to_add)
+    vehicle, columns = parse_header(lines=lines[:HEADER_LENGTH])
 
-    return to_return
+    return to_json_dict(
+        vehicle=vehicle,
+        columns=columns,
+        customers=parse_customers(
+            data=customer_block.encode("utf8", errors="replace"), columns=columns
+        ),
+    )
 
 
 def txt_to_json(source_path: Union[Path, str], destination_path: Union[Path, str]):
@@ -43,8 +142,7 @@ def txt_to_json(source_path: Union[Path, str], destination_path: Union[Path, str
     if not os.path.exists(src):
         raise FileNotFoundError(f"Source path {src} doesn't exist!")
 
-    with open(src, encoding="utf8", errors="replace") as file:
-        json_dict = parse_txt(file.read())
+    json_dict = to_json_dict(*read_txt(source_path=src))
 
     os.makedirs(dest.parent, exist_ok=True)
 
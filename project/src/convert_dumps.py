@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 from parsing.convert_dumps_parser import get_convert_dumps_parser
+from timing.budget import Checkpoint
 
 
 def main():
@@ -16,9 +17,8 @@ def main():
         with open(src, encoding="utf8", errors="replace") as file:
             json_dict = json.load(file)
 
-        keys = sorted([int(x) for x in json_dict.keys()])
-        keys = [str(x) for x in keys]
-        times = [f"{x}m" for x in keys[:-1]]
+        keys = sorted(json_dict.keys(), key=lambda x: Checkpoint.from_label(x))
+        times = [f"{x}m" if x.isdigit() else x for x in keys[:-1]]
         times.append("un")
         instance_number = int(Path(src).stem[-1])
 
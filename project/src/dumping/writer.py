@@ -0,0 +1,197 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Union
+
+# mkstemp creates its files readable only by their owner, so the
+# temporary file gets the mode a plain open would've given it. The
+# umask can only be read by setting it, which isn't safe once other
+# threads are running, so that's done once, on import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+DEFAULT_FILE_MODE = 0o666 & ~_UMASK
+
+
+def get_file_mode(path: Union[Path, str]) -> int:
+    # The mode of the file at path, or the default one if there is
+    # no such file yet.
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return DEFAULT_FILE_MODE
+
+
+@contextmanager
+def open_atomically(path: Union[Path, str], binary: bool = False) -> Iterator[IO]:
+    # Yields a temporary file next to the destination and renames it
+    # once it's written, so readers (and crashes) only ever see either
+    # the old or the new file, never a half-written one.
+    path = Path(path)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+
+    try:
+        if binary:
+            file = os.fdopen(file_descriptor, mode="wb")
+        else:
+            file = os.fdopen(
+                file_descriptor, mode="w", encoding="utf8", errors="replace"
+            )
+
+        with file:
+            yield file
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.chmod(temporary_path, get_file_mode(path=path))
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+        raise
+
+
+def write_atomically(path: Union[Path, str], content: Union[str, bytes]):
+    with open_atomically(path=path, binary=isinstance(content, bytes)) as file:
+        file.write(content)
+
+
+class DumpWriter:
+    @staticmethod
+    def _check_init_args(path: Optional[Union[Path, str]], keys: Iterable[Any]):
+        if path is not None:
+            path = Path(path)
+
+            if path.is_dir():
+                raise ValueError(
+                    f"Expected argument path to be a file path, instead it is the "
+                    f"directory {path}."
+                )
+
+        return path, list(keys)
+
+    def __init__(self, path: Optional[Union[Path, str]], keys: Iterable[Any]):
+        self._path, keys = self._check_init_args(path=path, keys=keys)
+
+        self._entries: Dict[Any, Optional[Dict[str, Any]]] = {x: None for x in keys}
+        self._n_writes = 0
+
+        self._condition = threading.Condition()
+        self._version = 0
+        self._written_version = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        self._thread = None
+
+        if self._path is not None:
+            self._thread = threading.Thread(
+                target=self._run, name="DumpWriter", daemon=True
+            )
+            self._thread.start()
+
+    # region Properties
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    @property
+    def entries(self) -> Dict[Any, Optional[Dict[str, Any]]]:
+        with self._condition:
+            return dict(self._entries)
+
+    @property
+    def n_writes(self) -> int:
+        return self._n_writes
+
+    # endregion
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._version == self._written_version and not self._closed:
+                    self._condition.wait()
+
+                if self._version == self._written_version:
+                    return
+
+                version = self._version
+                # Entries are replaced, never modified in place, so
+                # a shallow copy is a consistent snapshot.
+                entries = dict(self._entries)
+
+            try:
+                write_atomically(path=self._path, content=json.dumps(entries))
+            except BaseException as error:
+                with self._condition:
+                    self._error = error
+                    self._written_version = version
+                    self._condition.notify_all()
+
+                return
+
+            with self._condition:
+                self._n_writes += 1
+                self._written_version = version
+                self._condition.notify_all()
+
+    def _schedule(self):
+        self._version += 1
+        self._condition.notify_all()
+
+    def record(self, key: Any, result: str, n_iterations: int, **extra) -> bool:
+        # Only a new result makes the dump stale: the iteration count
+        # (and anything else) is picked up by the next write anyway.
+        # Returns whether a write was scheduled.
+        with self._condition:
+            old_entry = self._entries.get(key)
+            self._entries[key] = {"result": result, "n_iterations": n_iterations}
+            self._entries[key].update(extra)
+
+            if old_entry is not None and old_entry["result"] == result:
+                return False
+
+            self._schedule()
+
+            return True
+
+    def flush(self):
+        with self._condition:
+            if self._thread is None:
+                return
+
+            self._schedule()
+
+            while self._written_version < self._version and self._error is None:
+                self._condition.wait()
+
+            if self._error is not None:
+                raise self._error
+
+    def close(self):
+        if self._thread is None or self._closed:
+            return
+
+        self.flush()
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
+
+    # region Dunder Methods
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # endregion
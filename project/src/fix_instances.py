@@ -1,14 +1,105 @@
+import json
 import os
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, Optional, Tuple, Union
 
+from conversion.compiled import (
+    get_compiled_path,
+    get_content_hash,
+    get_instance_arrays,
+    read_instance,
+    save_compiled_instance,
+)
 from conversion.txt_to_json import txt_to_json
+from dumping.writer import write_atomically
 from parsing.fix_instances_parser import get_fix_instances_parser
 
+# Kept in the destination folder, maps every source file name to
+# what it looked like when it was last converted.
+MANIFEST_FILE_NAME = ".manifest.json"
+
+
+def load_manifest(path: Union[Path, str]) -> Dict[str, Dict[str, Any]]:
+    # A missing or broken manifest only means everything gets
+    # converted again.
+    try:
+        with open(path, encoding="utf8", errors="replace") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return dict()
+
+    return manifest if isinstance(manifest, dict) else dict()
+
+
+def is_up_to_date(
+    entry: Optional[Dict[str, Any]],
+    source_path: Union[Path, str],
+    destination_path: Union[Path, str],
+    compile_instances: bool,
+) -> Tuple[bool, Optional[str]]:
+    # Returns whether the outputs of the source can be kept, and the
+    # source hash if it had to be computed. The hash is only looked
+    # at if the modification time or size changed, so an unchanged
+    # folder is checked without reading any of the sources.
+    if entry is None or not os.path.exists(destination_path):
+        return False, None
+
+    compiled_paths = entry.get("compiled_paths", ())
+
+    if compile_instances and (
+        len(compiled_paths) == 0 or not all(os.path.exists(x) for x in compiled_paths)
+    ):
+        return False, None
+
+    stat = os.stat(source_path)
+
+    if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+        return True, None
+
+    content_hash = get_content_hash(source_path)
+
+    return content_hash == entry["hash"], content_hash
+
+
+def convert_instance(
+    source_path: str, destination_path: str, compile_instances: bool
+) -> Dict[str, Any]:
+    # Runs in a worker process. Returns the manifest entry of the
+    # source.
+    stat = os.stat(source_path)
+    entry = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": get_content_hash(source_path),
+        "compiled_paths": list(),
+    }
+
+    txt_to_json(source_path=source_path, destination_path=destination_path)
+
+    # Both the source and the JSON get a compiled instance in the
+    # default cache folder next to them, whichever a run uses. They
+    # hold the same arrays, so the instance is only read once.
+    if compile_instances:
+        arrays = get_instance_arrays(*read_instance(source_path=source_path))
+
+        for path in (source_path, destination_path):
+            compiled_path = get_compiled_path(source_path=path)
+            save_compiled_instance(path=compiled_path, arrays=arrays)
+            entry["compiled_paths"].append(str(compiled_path))
+
+    return entry
+
 
 def fix_instances(
-    source_folder_path: Union[Path, str], destination_folder_path: Union[Path, str]
-):
+    source_folder_path: Union[Path, str],
+    destination_folder_path: Union[Path, str],
+    compile_instances: bool = False,
+    n_workers: Optional[int] = None,
+    force: bool = False,
+) -> int:
+    # Converts every source that changed since the last run, in
+    # parallel, and returns how many were converted.
     src_folder = Path(source_folder_path)
     dest_folder = Path(destination_folder_path)
 
@@ -24,22 +115,74 @@ def fix_instances(
     else:
         os.makedirs(dest_folder)
 
-    for file_name in os.listdir(src_folder):
+    manifest_path = dest_folder / MANIFEST_FILE_NAME
+    old_manifest = dict() if force else load_manifest(path=manifest_path)
+    manifest = dict()
+    jobs = list()
+
+    for file_name in sorted(os.listdir(src_folder)):
         source_path = os.path.join(src_folder, file_name)
+
+        # Skips folders, such as the one with compiled instances.
+        if not os.path.isfile(source_path):
+            continue
+
         destination_path = os.path.join(dest_folder, f"{Path(file_name).stem}.json")
+        entry = old_manifest.get(file_name)
 
-        txt_to_json(source_path=source_path, destination_path=destination_path)
+        up_to_date, content_hash = is_up_to_date(
+            entry=entry,
+            source_path=source_path,
+            destination_path=destination_path,
+            compile_instances=compile_instances,
+        )
+
+        if up_to_date:
+            # Touched but unchanged sources get their new
+            # modification time, so they aren't hashed again.
+            if content_hash is not None:
+                stat = os.stat(source_path)
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+            manifest[file_name] = entry
+        else:
+            jobs.append((file_name, source_path, destination_path))
+
+    if len(jobs) != 0:
+        with Pool(processes=min(n_workers or os.cpu_count() or 1, len(jobs))) as pool:
+            entries = pool.starmap(
+                convert_instance,
+                [
+                    (source_path, destination_path, compile_instances)
+                    for _, source_path, destination_path in jobs
+                ],
+            )
+
+        for (file_name, _, _), entry in zip(jobs, entries):
+            manifest[file_name] = entry
+
+    if manifest != old_manifest:
+        write_atomically(
+            path=manifest_path, content=json.dumps(manifest, indent=2, sort_keys=True)
+        )
+
+    return len(jobs)
 
 
 def main():
     parser = get_fix_instances_parser()
     args = parser.parse_args()
 
-    fix_instances(
+    n_converted = fix_instances(
         source_folder_path=args.source_folder_path,
         destination_folder_path=args.destination_folder_path,
+        compile_instances=args.compile,
+        n_workers=args.workers,
+        force=args.force,
     )
 
+    print(f"Converted {n_converted} instance(s).")
+
 
 if __name__ == "__main__":
     main()
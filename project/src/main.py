@@ -1,17 +1,25 @@
-import json
 import os
+import sys
 from pathlib import Path
-from datetime import datetime
-from typing import Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 from tqdm import tqdm
 
-from algorithms.customer import Customer
+from algorithms.elite import EliteArchive
 from algorithms.greedy import GreedyScheduler
-from algorithms.merger import MergerScheduler
+from algorithms.insertion import InsertionScheduler
+from algorithms.instance import Instance
+from algorithms.objective import Objective
+from algorithms.portfolio import PortfolioRunner
 from algorithms.route import Route
-from conversion.txt_to_json import parse_txt
+from algorithms.scheduler import Scheduler
+from algorithms.search import Search
+from conversion.compiled import get_instance
+from dumping.writer import DumpWriter
 from parsing.main_parser import get_main_parser
+from profiling.profiler import Profiler
+from timing.budget import Checkpoint, Interrupted, TimeBudget, interrupt_handlers
+from validation.engine import Validator
 
 
 def resolve_file_name_duplicates(file_path: Union[Path, str]) -> Path:
@@ -32,7 +40,7 @@ def resolve_file_name_duplicates(file_path: Union[Path, str]) -> Path:
     return file_folder / file_name
 
 
-def check_args(args) -> Tuple[Path, Path, int]:
+def check_args(args) -> Tuple[Path, Path, List[Checkpoint]]:
     instance_path = Path(args.instance_path)
 
     if not os.path.exists(instance_path):
@@ -49,119 +57,400 @@ def check_args(args) -> Tuple[Path, Path, int]:
         if os.path.isdir(dump_path):
             dump_path = resolve_file_name_duplicates(dump_path / "dump.json")
 
-    max_runtime = {int(x) for x in args.max_runtime}
-    max_runtime = tuple(sorted(x for x in max_runtime if x > 0))
+    if args.checkpoints is not None:
+        checkpoints = [Checkpoint.parse(x) for x in args.checkpoints]
+    else:
+        max_runtime = {int(x) for x in args.max_runtime}
+        checkpoints = [Checkpoint(seconds=x * 60) for x in max_runtime if x > 0]
 
-    return instance_path, dump_path, max_runtime
+    return instance_path, dump_path, sorted(set(checkpoints))
 
 
-def main():
-    parser = get_main_parser()
-    args = parser.parse_args()
+def is_valid_solution(validator: Optional[Validator], routes: List[Route]) -> bool:
+    if validator is None:
+        return True
 
-    instance_path, dump_path, max_runtime = check_args(args)
+    report = validator.validate_routes(routes=routes)
 
-    instance_path_suffix = instance_path.suffix
+    if not report.is_valid:
+        print(
+            f"WARNING - Discarding an invalid solution:\n{report}",
+            file=sys.stderr,
+        )
 
-    with open(instance_path, encoding="utf8", errors="replace") as file:
-        if instance_path_suffix == ".txt":
-            json_dict = parse_txt(file.read())
-        elif instance_path_suffix == ".json":
-            json_dict = json.load(file)
-        else:
-            raise RuntimeError(
-                "Expected an instance path with suffix .txt or .json, instead got "
-                f"instance path suffix {instance_path_suffix}."
-            )
+    return report.is_valid
 
-    customers = [Customer(*customer) for customer in json_dict["customers"][1:]]
-    greedy_scheduler = GreedyScheduler(
-        n_vehicles=json_dict["vehicle"]["number"],
-        vehicle_capacity=json_dict["vehicle"]["capacity"],
-    )
-    merger_scheduler = MergerScheduler(
-        n_vehicles=json_dict["vehicle"]["number"],
-        vehicle_capacity=json_dict["vehicle"]["capacity"],
-    )
 
-    result_dict = {x: None for x in max_runtime}
-    current_time_index = 0
+def get_violation_kinds(
+    validator: Optional[Validator], routes: List[Route]
+) -> Set[str]:
+    if validator is None:
+        return set()
+
+    report = validator.validate_routes(routes=routes)
 
-    start_time = datetime.now()
+    if not report.is_valid:
+        print(f"WARNING - Invalid solution:\n{report}", file=sys.stderr)
 
-    routes = greedy_scheduler.construct_solution(customers=customers)
-    result = Route.output_result(routes=routes)
+    return {x.kind for x in report.violations}
 
-    greedy_time = (datetime.now() - start_time).seconds / 60
 
-    while (
-        current_time_index < len(max_runtime)
-        and greedy_time > max_runtime[current_time_index]
+def construct_solution(
+    instance: Instance,
+    construction_scheduler: Scheduler,
+    validator: Optional[Validator],
+) -> Tuple[List[Route], bool]:
+    # Returns the initial solution and whether it's valid. Too many
+    # vehicles is what the search gets rid of first, so such a
+    # solution is still searched from, it's just not dumped. With
+    # any other violation the greedy construction is used instead,
+    # and if that's broken too there's nothing to search from.
+    routes = construction_scheduler.construct_solution(customers=instance.customers)
+    violation_kinds = get_violation_kinds(validator=validator, routes=routes)
+
+    if len(violation_kinds - {"n_vehicles"}) != 0 and not isinstance(
+        construction_scheduler, GreedyScheduler
     ):
-        current_time_index += 1
+        print("WARNING - Falling back to the greedy construction.", file=sys.stderr)
+
+        routes = GreedyScheduler(
+            n_vehicles=instance.n_vehicles,
+            vehicle_capacity=instance.vehicle_capacity,
+            instance=instance,
+        ).construct_solution(customers=instance.customers)
+        violation_kinds = get_violation_kinds(validator=validator, routes=routes)
+
+    if len(violation_kinds - {"n_vehicles"}) != 0:
+        raise RuntimeError(
+            "Failed to construct a valid initial solution, violated constraints: "
+            f"{', '.join(sorted(violation_kinds))}."
+        )
 
-    if current_time_index < len(max_runtime):
-        result_dict[max_runtime[current_time_index]] = {
-            "result": result,
-            "n_iterations": 1,
-        }
-    else:
+    return routes, len(violation_kinds) == 0
+
+
+def record(
+    dump_writer: DumpWriter,
+    profiler: Profiler,
+    key: Union[int, str],
+    result: Optional[str],
+    n_iterations: int,
+    **extra,
+) -> bool:
+    # Nothing valid was found yet, see construct_solution.
+    if result is None:
+        return False
+
+    # Profiled runs also dump the time spent in every phase so far.
+    if profiler.enabled:
+        extra["profile"] = profiler.get_breakdown()
+
+    return dump_writer.record(
+        key=key, result=result, n_iterations=n_iterations, **extra
+    )
+
+
+def elite_statistics(archive: Optional[EliteArchive]) -> Dict[str, Any]:
+    if archive is None:
+        return dict()
+
+    return {**archive.statistics, "costs": archive.costs}
+
+
+def optimize(
+    args,
+    instance: Instance,
+    construction_scheduler: Scheduler,
+    validator: Optional[Validator],
+    budget: TimeBudget,
+    dump_writer: DumpWriter,
+    profiler: Profiler,
+    objective: Objective,
+    archive: Optional[EliteArchive],
+) -> Optional[str]:
+    budget.start()
+
+    routes, is_valid = construct_solution(
+        instance=instance,
+        construction_scheduler=construction_scheduler,
+        validator=validator,
+    )
+    result = Route.output_result(routes=routes) if is_valid else None
+
+    budget.update()
+
+    if budget.is_finished:
         return
 
-    with open(dump_path, mode="w+", encoding="utf8", errors="replace") as file:
-        json.dump(result_dict, file)
+    # Construction alone can take longer than the first checkpoints.
+    checkpoint = budget.current
+
+    for passed in budget.checkpoints[: budget.current_index + 1]:
+        record(
+            dump_writer=dump_writer,
+            profiler=profiler,
+            key=passed.label,
+            result=result,
+            n_iterations=1,
+        )
+
+    # Time (since the start) during which only route elimination runs.
+    elimination_time = args.elimination_time
+
+    if elimination_time is None:
+        elimination_time = 0.1 * budget.checkpoints[-1].seconds
 
     n_iterations = 1
-    n_no_change = 0
+    # Per-operator statistics of the search, if it keeps any, and
+    # hits and misses of the merge cache.
+    statistics = dict()
+    cache_statistics = dict()
 
-    iterator = tqdm(range(int(greedy_time), max_runtime[-1]))
-    current_run_time = greedy_time
+    iterator = tqdm(
+        total=int(budget.checkpoints[-1].seconds), initial=int(budget.elapsed), unit="s"
+    )
 
-    while True:
-        new_routes = merger_scheduler.optimize_solution(
-            routes=routes, max_selected_routes=n_no_change
+    try:
+        if args.workers > 1:
+            # Each checkpoint is a synchronisation point: the workers
+            # search independently until it's reached, and then all
+            # of them continue from the best solution any of them
+            # found.
+            with PortfolioRunner(
+                instance=instance,
+                n_workers=args.workers,
+                optimizer=args.optimizer,
+                local_search_mode=args.local_search_mode,
+                acceptance=args.acceptance,
+                objective=objective,
+                archive=archive,
+                merge_criterion=args.merge_criterion,
+            ) as portfolio_runner:
+                while not budget.is_finished:
+                    checkpoint_index = budget.current_index
+
+                    new_routes, worker_iterations, statistics = portfolio_runner.run(
+                        routes=routes,
+                        seconds=budget.remaining(checkpoint=budget.current),
+                        elimination_time=max(0.0, elimination_time - budget.elapsed),
+                        duration=budget.remaining(),
+                    )
+                    n_iterations += worker_iterations
+                    cache_statistics = portfolio_runner.cache_statistics
+
+                    if is_valid_solution(validator=validator, routes=new_routes):
+                        routes = new_routes
+                        result = Route.output_result(routes=routes)
+
+                    # The workers can overrun the checkpoint past the
+                    # next ones, which then get the same solution.
+                    budget.update()
+                    iterator.update(max(0, int(budget.elapsed) - iterator.n))
+
+                    for passed in budget.checkpoints[
+                        checkpoint_index : max(
+                            checkpoint_index + 1, budget.current_index
+                        )
+                    ]:
+                        record(
+                            dump_writer=dump_writer,
+                            profiler=profiler,
+                            key=passed.label,
+                            result=result,
+                            n_iterations=n_iterations,
+                            operators=statistics,
+                            merge_cache=cache_statistics,
+                            elite=elite_statistics(archive=archive),
+                        )
+
+            return result
+
+        search = Search(
+            instance=instance,
+            routes=routes,
+            optimizer=args.optimizer,
+            local_search_mode=args.local_search_mode,
+            acceptance=args.acceptance,
+            duration=budget.remaining(),
+            elimination_time=max(0.0, elimination_time - budget.elapsed),
+            objective=objective,
+            archive=archive,
+            merge_criterion=args.merge_criterion,
         )
+        checkpoint_index = budget.current_index
 
-        if new_routes is None:
-            n_no_change += 1
-        else:
-            result = Route.output_result(routes=routes)
+        while True:
+            changed = search.step() and is_valid_solution(
+                validator=validator, routes=search.best_routes
+            )
 
-            if len(new_routes) < len(routes):
-                n_no_change = 0
-            else:
-                n_no_change += 1
+            if changed:
+                routes = search.best_routes
+                result = Route.output_result(routes=routes)
+
+            # The clock is only read every so often, see TimeBudget.
+            if budget.poll():
+                iterator.update(max(0, int(budget.elapsed) - iterator.n))
+
+                if budget.current != checkpoint:
+                    # Make sure the checkpoints that just passed have
+                    # their final iteration count. A slow iteration can
+                    # go past more than one, they all get the same
+                    # solution.
+                    statistics = search.statistics
+                    cache_statistics = search.cache_statistics
+
+                    for passed in budget.checkpoints[
+                        checkpoint_index : budget.current_index
+                    ]:
+                        record(
+                            dump_writer=dump_writer,
+                            profiler=profiler,
+                            key=passed.label,
+                            result=result,
+                            n_iterations=n_iterations,
+                            operators=statistics,
+                            merge_cache=cache_statistics,
+                            elite=elite_statistics(archive=archive),
+                        )
+
+                    checkpoint = budget.current
+                    checkpoint_index = budget.current_index
+                    changed = True
+
+                    if checkpoint is None:
+                        break
+
+            if changed:
+                statistics = search.statistics
+                cache_statistics = search.cache_statistics
+                record(
+                    dump_writer=dump_writer,
+                    profiler=profiler,
+                    key=checkpoint.label,
+                    result=result,
+                    n_iterations=n_iterations,
+                    operators=statistics,
+                    merge_cache=cache_statistics,
+                    elite=elite_statistics(archive=archive),
+                )
+
+            n_iterations += 1
+    except Interrupted as interrupted:
+        # Whatever's left would never be written otherwise, so give
+        # every pending checkpoint the best solution so far.
+        print(
+            f"WARNING - {interrupted} Saving the current solution for "
+            f"{len(budget.pending)} pending checkpoint(s).",
+            file=sys.stderr,
+        )
 
-            routes = new_routes
+        for checkpoint in budget.pending:
+            record(
+                dump_writer=dump_writer,
+                profiler=profiler,
+                key=checkpoint.label,
+                result=result,
+                n_iterations=n_iterations,
+                operators=statistics,
+                merge_cache=cache_statistics,
+                elite=elite_statistics(archive=archive),
+            )
 
-        merger_time = (datetime.now() - start_time).seconds / 60
+        raise
 
-        while merger_time > current_run_time:
-            current_run_time += 1
-            iterator.update()
+    return result
 
-        while (
-            current_time_index < len(max_runtime)
-            and merger_time > max_runtime[current_time_index]
-        ):
-            current_time_index += 1
 
-        if current_time_index < len(max_runtime):
-            result_dict[max_runtime[current_time_index]] = {
-                "result": result,
-                "n_iterations": n_iterations,
-            }
-        else:
-            with open(dump_path, mode="w+", encoding="utf8", errors="replace") as file:
-                json.dump(result_dict, file)
-            break
+def solve(
+    args,
+    instance: Instance,
+    dump_path: Optional[Path],
+    checkpoints: List[Checkpoint],
+    profiler: Profiler,
+) -> Optional[str]:
+    if args.construction == "greedy":
+        construction_scheduler = GreedyScheduler(
+            n_vehicles=instance.n_vehicles,
+            vehicle_capacity=instance.vehicle_capacity,
+            instance=instance,
+        )
+    else:
+        construction_scheduler = InsertionScheduler(
+            n_vehicles=instance.n_vehicles,
+            vehicle_capacity=instance.vehicle_capacity,
+            instance=instance,
+            method=args.construction,
+            regret_k=args.regret_k,
+        )
+
+    validator = Validator.from_instance(instance) if args.validate else None
+
+    # What the search minimises, and so what its acceptance criterion
+    # compares.
+    objective = Objective(
+        instance=instance,
+        components=args.objective_components,
+        order=args.objective,
+        weights=args.objective_weights,
+    )
+    # The best distinct solutions found, see EliteArchive.
+    archive = None
+
+    if args.elite_size > 0:
+        archive = EliteArchive(objective=objective, capacity=args.elite_size)
+
+    # Only results that change are written, in the background, so
+    # the loop below never waits on the disk.
+    budget = TimeBudget(checkpoints=checkpoints)
+
+    try:
+        with DumpWriter(
+            path=dump_path, keys=[x.label for x in budget.checkpoints]
+        ) as dump_writer, interrupt_handlers():
+            result = optimize(
+                args=args,
+                instance=instance,
+                construction_scheduler=construction_scheduler,
+                validator=validator,
+                budget=budget,
+                dump_writer=dump_writer,
+                profiler=profiler,
+                objective=objective,
+                archive=archive,
+            )
+    except Interrupted as interrupted:
+        sys.exit(128 + interrupted.signal_number)
+
+    return result
 
-        with open(dump_path, mode="w+", encoding="utf8", errors="replace") as file:
-            json.dump(result_dict, file)
 
-        n_iterations += 1
+def main():
+    parser = get_main_parser()
+    args = parser.parse_args()
+
+    instance_path, dump_path, checkpoints = check_args(args)
+
+    with Profiler(enabled=args.profile) as profiler:
+        try:
+            with profiler.measure(name="instance"):
+                instance = get_instance(
+                    source_path=instance_path, cache_folder=args.instance_cache_path
+                )
+
+            result = solve(
+                args=args,
+                instance=instance,
+                dump_path=dump_path,
+                checkpoints=checkpoints,
+                profiler=profiler,
+            )
+        finally:
+            if profiler.enabled:
+                print(profiler.format_breakdown(), file=sys.stderr)
 
-    print(result)
+    if result is not None:
+        print(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+import argparse
+
+
+def get_benchmark_parser():
+    parser = argparse.ArgumentParser()
+
+    file_group = parser.add_argument_group(
+        "File Arguments", "Arguments relating to file paths."
+    )
+
+    constraint_group = parser.add_argument_group(
+        "Constraint Arguments", "Arguments relating to constraints."
+    )
+
+    algorithm_group = parser.add_argument_group(
+        "Algorithm Arguments", "Arguments relating to the algorithms used."
+    )
+
+    comparison_group = parser.add_argument_group(
+        "Comparison Arguments", "Arguments relating to the baseline comparison."
+    )
+
+    # region File Arguments
+    file_group.add_argument(
+        "--instance_folder_path",
+        type=str,
+        default="data/original",
+        help=(
+            "A string representing the path to the folder with the instances to "
+            "run, either .txt or JSON. Default: data/original"
+        ),
+    )
+
+    file_group.add_argument(
+        "--results_path",
+        type=str,
+        default=None,
+        help=(
+            "A string representing the path of the JSON file the results are saved "
+            "to. Default: None (not saved)."
+        ),
+    )
+
+    file_group.add_argument(
+        "--baseline_path",
+        type=str,
+        default=None,
+        help=(
+            "A string representing the path of the JSON file with the baseline "
+            "results to compare against. Iterations per second depend on the "
+            "machine, so the baseline should be recorded on the one that runs the "
+            "comparison. Default: None (no comparison)."
+        ),
+    )
+
+    file_group.add_argument(
+        "--save_baseline",
+        action="store_true",
+        help=(
+            "If set, the results are saved as the new baseline instead of being "
+            "compared against it. Default: False"
+        ),
+    )
+
+    # endregion
+
+    # region Constraint Arguments
+    constraint_group.add_argument(
+        "--checkpoints",
+        type=str,
+        nargs="+",
+        default=["5s", "10s"],
+        help=(
+            "A list of strings representing the times (since the start of the "
+            "search) at which the solution and throughput are recorded. Each one is "
+            "a number of seconds, optionally followed by a unit: s, m or h. With "
+            "--iterations, they're numbers of iterations instead. Default: 5s 10s"
+        ),
+    )
+
+    constraint_group.add_argument(
+        "--iterations",
+        action="store_true",
+        help=(
+            "If set, the checkpoints and the elimination budget are numbers of "
+            "iterations rather than times. Runs then don't depend on how fast the "
+            "machine is, so the solutions are reproducible (except for annealing "
+            "and ALNS, which adapt to the time spent). Default: False"
+        ),
+    )
+
+    # endregion
+
+    # region Algorithm Arguments
+    algorithm_group.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help=(
+            "An int representing the seed NumPy is set to before the first run of "
+            "every instance. Default: 0"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help=(
+            "An int representing the number of runs per instance, with seeds seed, "
+            "seed + 1, and so on. Solutions are compared by the best run and "
+            "throughput by the median one. Default: 3"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--optimizer",
+        type=str,
+        choices=("merger", "local_search", "alns"),
+        default="merger",
+        help="A string representing the heuristic used. Default: merger",
+    )
+
+    algorithm_group.add_argument(
+        "--local_search_mode",
+        type=str,
+        choices=("first", "best"),
+        default="first",
+        help=(
+            "A string representing whether local search applies the first "
+            "improving move or the best one. Default: first"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--acceptance",
+        type=str,
+        choices=("improvement", "annealing", "record_to_record", "late_acceptance"),
+        default="improvement",
+        help=(
+            "A string representing the criterion deciding which moves are taken. "
+            "Default: improvement"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--elimination_budget",
+        type=float,
+        default=None,
+        help=(
+            "A float representing the number of seconds (or iterations, with "
+            "--iterations) at the start of the search spent only on eliminating "
+            "routes. Default: None (10%% of the last checkpoint)."
+        ),
+    )
+
+    # endregion
+
+    # region Comparison Arguments
+    comparison_group.add_argument(
+        "--distance_tolerance",
+        type=float,
+        default=0.02,
+        help=(
+            "A float representing how much longer (relative) the distance at a "
+            "checkpoint can be than in the baseline, with the same number of "
+            "vehicles, before it's reported as a regression. Default: 0.02"
+        ),
+    )
+
+    comparison_group.add_argument(
+        "--throughput_tolerance",
+        type=float,
+        default=0.25,
+        help=(
+            "A float representing how much lower (relative) the number of "
+            "iterations per second can be than in the baseline before it's "
+            "reported as a regression. Default: 0.25"
+        ),
+    )
+
+    # endregion
+
+    return parser
@@ -25,4 +25,40 @@ def get_fix_instances_parser():
         help="A string representing the destination folder path of the converted JSON.",
     )
 
+    file_group.add_argument(
+        "--compile",
+        action="store_true",
+        help=(
+            "If set, also compiles every instance into a .npz file holding the "
+            "customers along with their distance and travel time matrices, in a "
+            "folder named compiled next to both the source and the JSON. Runs then "
+            "load those instead of parsing the instance. Default: False"
+        ),
+    )
+
+    performance_group = parser.add_argument_group(
+        "Performance Arguments", "Arguments relating to how the conversion is run."
+    )
+
+    performance_group.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "An int representing the number of processes converting instances in "
+            "parallel. Default: None (one per CPU)."
+        ),
+    )
+
+    performance_group.add_argument(
+        "--force",
+        action="store_true",
+        help=(
+            "If set, converts every instance, even if its source hasn't changed "
+            "since the last conversion. Otherwise unchanged sources, according to "
+            "the manifest kept in the destination folder, are skipped. Default: "
+            "False"
+        ),
+    )
+
     return parser
@@ -12,6 +12,14 @@ def get_main_parser():
         "Constraint Arguments", "Arguments relating to constraints."
     )
 
+    algorithm_group = parser.add_argument_group(
+        "Algorithm Arguments", "Arguments relating to the algorithms used."
+    )
+
+    diagnostic_group = parser.add_argument_group(
+        "Diagnostic Arguments", "Arguments relating to inspecting a run."
+    )
+
     # region File Arguments
     file_group.add_argument(
         "--instance_path",
@@ -19,7 +27,20 @@ def get_main_parser():
         required=True,
         help=(
             "A string representing the path to the instance. Can be either the .txt "
-            "variant, or the JSON variant."
+            "variant, the JSON variant, or a compiled .npz instance."
+        ),
+    )
+
+    file_group.add_argument(
+        "--instance_cache_path",
+        type=str,
+        default=None,
+        help=(
+            "A string representing the path to the folder with compiled instances, "
+            "which hold the customers along with their distance and travel time "
+            "matrices and are named after the hash of their source file. An "
+            "instance that isn't compiled yet is compiled and saved there. Default: "
+            "None (a folder named compiled next to the instance)."
         ),
     )
 
@@ -48,6 +69,197 @@ def get_main_parser():
         ),
     )
 
+    constraint_group.add_argument(
+        "--checkpoints",
+        type=str,
+        nargs="+",
+        default=None,
+        help=(
+            "A list of strings representing the times at which the best solution is "
+            "saved, e.g. 10s 60s 5m 1h (a plain number is in seconds). Whole minutes "
+            "are dumped under the number of minutes, like --max_runtime, and the rest "
+            "under the number of seconds followed by s. Overrides --max_runtime. "
+            "Default: None (use --max_runtime)"
+        ),
+    )
+
+    constraint_group.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "An int representing the number of processes searching in parallel. "
+            "Each one uses a different seed and optimizer configuration, and they "
+            "share the best solution found at every checkpoint. Default: 1"
+        ),
+    )
+
+    constraint_group.add_argument(
+        "--validate",
+        action="store_true",
+        help=(
+            "If set, every solution is checked against all of the constraints "
+            "before it's dumped, and invalid ones are reported and discarded. "
+            "Default: False"
+        ),
+    )
+
+    constraint_group.add_argument(
+        "--elite_size",
+        type=int,
+        default=8,
+        help=(
+            "An int representing the number of best distinct solutions kept "
+            "during the search. With more than one worker, every worker but the "
+            "first starts each checkpoint from one of them instead of the best "
+            "solution. 0 disables it. Default: 8"
+        ),
+    )
+
+    # endregion
+
+    # region Algorithm Arguments
+    algorithm_group.add_argument(
+        "--construction",
+        type=str,
+        choices=("greedy", "i1", "regret"),
+        default="greedy",
+        help=(
+            "A string representing the heuristic used to construct the initial "
+            "solution: the greedy scheduler, Solomon's I1 insertion or parallel "
+            "regret-k insertion. Default: greedy"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--regret_k",
+        type=int,
+        default=2,
+        help=(
+            "An int representing the number of routes considered when computing "
+            "the regret of a customer in regret-k insertion. Default: 2"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--optimizer",
+        type=str,
+        choices=("merger", "local_search", "alns"),
+        default="merger",
+        help=(
+            "A string representing the heuristic used to improve the solution: "
+            "merging random subsets of routes, a granular local search "
+            "(relocate, swap, 2-opt*, Or-opt and cross-exchange) that falls back to "
+            "a merge step whenever it reaches a local optimum, or adaptive large "
+            "neighbourhood search, which picks destroy and repair operators by "
+            "how much they improved the solution per CPU-second. Default: merger"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--local_search_mode",
+        type=str,
+        choices=("first", "best"),
+        default="first",
+        help=(
+            "A string representing whether local search applies the first "
+            "improving move it finds or the best one in the neighbourhood. "
+            "Default: first"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--elimination_time",
+        type=float,
+        default=None,
+        help=(
+            "A float representing the number of seconds from the start spent only "
+            "on eliminating routes (ejecting the customers of a route and "
+            "reinserting them elsewhere) before optimising distance. 0 disables "
+            "it. Default: None (10%% of the last checkpoint)"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--acceptance",
+        type=str,
+        choices=("improvement", "annealing", "record_to_record", "late_acceptance"),
+        default="improvement",
+        help=(
+            "A string representing which merge results are accepted: only "
+            "improving ones, simulated annealing cooled over the remaining time, "
+            "record-to-record travel or late acceptance hill climbing. The best "
+            "solution found is what gets dumped. Default: improvement"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--objective",
+        type=str,
+        choices=("lexicographic", "weighted"),
+        default="lexicographic",
+        help=(
+            "A string representing how solutions are compared: component by "
+            "component in the order of --objective_components, or by the weighted "
+            "sum of the components. Default: lexicographic"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--objective_components",
+        type=str,
+        nargs="+",
+        choices=("vehicles", "distance", "concentration"),
+        default=("vehicles", "distance"),
+        help=(
+            "A list of strings representing what the objective minimises: the "
+            "number of vehicles, the total distance and the concentration of the "
+            "load (minus the sum of the squared loads relative to the capacity, "
+            "which favours a few full routes over many half-empty ones and so "
+            "routes that are about to be emptied). Default: (vehicles, distance)"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--merge_criterion",
+        type=str,
+        choices=("load_spread", "objective"),
+        default="load_spread",
+        help=(
+            "A string representing when a merge step counts as an improvement "
+            "without an acceptance criterion: when it uses fewer vehicles or, "
+            "with as many, spreads the loads of consecutive routes further apart, "
+            "or when it improves the objective. Default: load_spread"
+        ),
+    )
+
+    algorithm_group.add_argument(
+        "--objective_weights",
+        type=float,
+        nargs="+",
+        default=None,
+        help=(
+            "A list of floats representing the weight of every objective component "
+            "for a weighted objective, in the order of --objective_components. "
+            "Default: None (1000000 for vehicles, 1 for the rest)"
+        ),
+    )
+
+    # endregion
+
+    # region Diagnostic Arguments
+    diagnostic_group.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "If set, the constructors, neighbour queries, feasibility checks, "
+            "search steps and dump writes are timed and counted. The time spent in "
+            "every phase is printed to stderr at exit and dumped along with every "
+            "checkpoint. With more than one worker, only the main process is "
+            "profiled. Default: False"
+        ),
+    )
+
     # endregion
 
     return parser
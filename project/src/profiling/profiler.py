@@ -0,0 +1,235 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from algorithms.alns import ALNSScheduler
+from algorithms.customer import MatrixCustomerGraph
+from algorithms.greedy import GreedyScheduler
+from algorithms.insertion import InsertionScheduler
+from algorithms.local_search import LocalSearchScheduler
+from algorithms.merger import MergerScheduler
+from algorithms.route import Route
+from algorithms.search import Search
+from dumping import writer
+from dumping.writer import DumpWriter
+from validation.engine import Validator
+
+# (phase, owner, attribute) of every function a profiled run times.
+# The owner is a class or a module, and the function is only
+# replaced while the profiler is enabled, so runs without it don't
+# pay anything for the instrumentation.
+HOT_PATHS = (
+    ("construction.greedy", GreedyScheduler, "construct_solution"),
+    ("construction.insertion", InsertionScheduler, "construct_solution"),
+    ("constructors.graph", MatrixCustomerGraph, "__init__"),
+    ("constructors.route", Route, "__init__"),
+    # iterate_neighbours is a generator, so calling it takes no time:
+    # the queries are timed where its neighbours are consumed.
+    ("neighbours.greedy", GreedyScheduler, "get_nearest_viable_customer"),
+    ("neighbours.merge", MergerScheduler, "get_nearest_viable_customer"),
+    ("neighbours.granular", MatrixCustomerGraph, "get_neighbours"),
+    ("feasibility.can_insert", Route, "can_insert"),
+    ("feasibility.evaluate_insertions", Route, "evaluate_insertions"),
+    ("search.step", Search, "step"),
+    ("search.elimination", Search, "eliminate_step"),
+    ("search.merge", MergerScheduler, "optimize_solution"),
+    ("search.local_search", LocalSearchScheduler, "optimize_solution"),
+    ("search.alns", ALNSScheduler, "optimize_solution"),
+    ("merge.cached_rebuild", MergerScheduler, "rebuild_routes"),
+    ("merge.rebuild", MergerScheduler, "_rebuild_routes"),
+    ("validation", Validator, "validate_routes"),
+    ("output", Route, "output_result"),
+    ("dump.record", DumpWriter, "record"),
+    ("dump.write", writer, "write_atomically"),
+)
+
+
+class PhaseTimer:
+    __slots__ = ("n_calls", "seconds")
+
+    def __init__(self):
+        self.n_calls = 0
+        self.seconds = 0.0
+
+    def as_dict(self, total_seconds: float) -> Dict[str, float]:
+        return {
+            "n_calls": self.n_calls,
+            "seconds": self.seconds,
+            "mean_seconds": self.seconds / self.n_calls if self.n_calls != 0 else 0.0,
+            "share": self.seconds / total_seconds if total_seconds > 0 else 0.0,
+        }
+
+
+class Profiler:
+    @staticmethod
+    def _check_init_args(enabled: bool):
+        if not isinstance(enabled, bool):
+            raise TypeError(
+                "Expected argument enabled to be a bool, instead it is "
+                f"{type(enabled)}."
+            )
+
+        return enabled
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        hot_paths: Tuple[Tuple[str, Any, str], ...] = HOT_PATHS,
+    ):
+        self._enabled = self._check_init_args(enabled=enabled)
+        self._hot_paths = tuple(hot_paths)
+
+        self._phases: Dict[str, PhaseTimer] = dict()
+        # (owner, attribute, original) of every replaced function, so
+        # they can be put back in reverse order.
+        self._patches: List[Tuple[Any, str, Any]] = list()
+        self._start_time: Optional[float] = None
+        self._stop_time: Optional[float] = None
+
+    # region Properties
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def is_running(self) -> bool:
+        return len(self._patches) != 0
+
+    @property
+    def elapsed(self) -> float:
+        if self._start_time is None:
+            return 0.0
+
+        stop_time = self._stop_time
+
+        if stop_time is None:
+            stop_time = time.perf_counter()
+
+        return stop_time - self._start_time
+
+    # endregion
+
+    def get_phase(self, name: str) -> PhaseTimer:
+        phase = self._phases.get(name)
+
+        if phase is None:
+            phase = self._phases[name] = PhaseTimer()
+
+        return phase
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        # The timer is looked up once, so a call only costs two clock
+        # reads and two additions on top of the function itself.
+        phase = self.get_phase(name=name)
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start_time = perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                phase.seconds += perf_counter() - start_time
+                phase.n_calls += 1
+
+        return wrapper
+
+    def instrument(self, name: str, owner: Any, attribute: str):
+        # Static and class methods have to be unwrapped and wrapped
+        # again, or they'd turn into plain methods.
+        original = inspect.getattr_static(owner, attribute)
+
+        if isinstance(original, staticmethod):
+            replacement = staticmethod(self.wrap(name, original.__func__))
+        elif isinstance(original, classmethod):
+            replacement = classmethod(self.wrap(name, original.__func__))
+        else:
+            replacement = self.wrap(name, original)
+
+        setattr(owner, attribute, replacement)
+        self._patches.append((owner, attribute, original))
+
+    @contextmanager
+    def measure(self, name: str):
+        # Times a block outside of the hot paths, e.g. loading the
+        # instance. Does nothing if the profiler is disabled.
+        if not self._enabled:
+            yield
+            return
+
+        phase = self.get_phase(name=name)
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            phase.seconds += time.perf_counter() - start_time
+            phase.n_calls += 1
+
+    def start(self):
+        if not self._enabled or self.is_running:
+            return
+
+        for name, owner, attribute in self._hot_paths:
+            self.instrument(name=name, owner=owner, attribute=attribute)
+
+        self._start_time = time.perf_counter()
+        self._stop_time = None
+
+    def stop(self):
+        if not self.is_running:
+            return
+
+        self._stop_time = time.perf_counter()
+
+        while len(self._patches) != 0:
+            owner, attribute, original = self._patches.pop()
+            setattr(owner, attribute, original)
+
+    def get_breakdown(self) -> Dict[str, Any]:
+        # Phases are timed inclusively: a phase that calls another
+        # one also counts the time spent in it, so the shares add
+        # up to more than one.
+        total_seconds = self.elapsed
+
+        return {
+            "seconds": total_seconds,
+            "phases": {
+                name: phase.as_dict(total_seconds=total_seconds)
+                for name, phase in sorted(
+                    self._phases.items(), key=lambda x: x[1].seconds, reverse=True
+                )
+                if phase.n_calls != 0
+            },
+        }
+
+    def format_breakdown(self) -> str:
+        breakdown = self.get_breakdown()
+
+        lines = [
+            f"Profile of {breakdown['seconds']:.3f}s (inclusive times):",
+            f"  {'phase':<32} {'calls':>10} {'seconds':>10} {'mean (us)':>11} "
+            f"{'share':>7}",
+        ]
+
+        for name, phase in breakdown["phases"].items():
+            lines.append(
+                f"  {name:<32} {phase['n_calls']:>10} {phase['seconds']:>10.3f} "
+                f"{phase['mean_seconds'] * 1e6:>11.1f} {phase['share']:>7.1%}"
+            )
+
+        return "\n".join(lines)
+
+    # region Dunder Methods
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # endregion
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# The modules are imported the same way main.py imports them, from
+# the source folder.
+SOURCE_FOLDER = Path(__file__).resolve().parent.parent
+INSTANCE_PATH = (
+    SOURCE_FOLDER.parent / "data" / "original" / "HMO_2020-21_project_instance-1.txt"
+)
+
+if str(SOURCE_FOLDER) not in sys.path:
+    sys.path.insert(0, str(SOURCE_FOLDER))
+
+from algorithms.greedy import GreedyScheduler  # noqa: E402
+from algorithms.instance import Instance  # noqa: E402
+from algorithms.route import Route  # noqa: E402
+from conversion.compiled import get_instance  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def instance(tmp_path_factory) -> Instance:
+    # Compiled into a temporary folder, so the tests never touch the
+    # cache of the data folder.
+    return get_instance(
+        source_path=INSTANCE_PATH, cache_folder=tmp_path_factory.mktemp("compiled")
+    )
+
+
+@pytest.fixture(scope="session")
+def greedy_routes(instance: Instance) -> List[Route]:
+    # Deterministic, and valid apart from using more vehicles than
+    # instance-1 allows.
+    return GreedyScheduler(
+        n_vehicles=instance.n_vehicles,
+        vehicle_capacity=instance.vehicle_capacity,
+        instance=instance,
+    ).construct_solution(customers=instance.customers)
@@ -0,0 +1,110 @@
+from typing import Dict, List, Tuple
+
+import pytest
+
+from algorithms.instance import Instance
+from algorithms.local_search import LOCAL_SEARCH_OPERATORS, LocalSearchScheduler
+from algorithms.objective import Objective
+from algorithms.route import Route
+from validation.engine import Validator
+
+OBJECTIVES = (
+    dict(),
+    dict(components=("vehicles", "distance", "concentration")),
+    dict(
+        components=("vehicles", "distance", "concentration"),
+        order="weighted",
+        weights=(100.0, 1.0, 10.0),
+    ),
+)
+
+
+def get_locations(routes: List[Route]) -> Dict[int, Tuple[int, int]]:
+    return {
+        customer: (route_index, position)
+        for route_index, route in enumerate(routes)
+        for position, customer in enumerate(route.indices)
+        if customer != 0
+    }
+
+
+@pytest.mark.parametrize("objective_kwargs", OBJECTIVES)
+def test_move_costs_match_recomputation(
+    instance: Instance, greedy_routes: List[Route], objective_kwargs
+):
+    objective = Objective(instance=instance, **objective_kwargs)
+    scheduler = LocalSearchScheduler(
+        n_vehicles=instance.n_vehicles,
+        vehicle_capacity=instance.vehicle_capacity,
+        instance=instance,
+        objective=objective,
+    )
+    validator = Validator.from_instance(instance)
+    locations = get_locations(routes=greedy_routes)
+    values = objective.evaluate(routes=greedy_routes)
+    n_moves = dict.fromkeys(LOCAL_SEARCH_OPERATORS, 0)
+    n_emptying_moves = 0
+
+    # Every pair of customers, not only the granular neighbourhood,
+    # so moves that empty a route come up as well.
+    for customer in locations:
+        for neighbour in locations:
+            if neighbour == customer:
+                continue
+
+            for distance, operator, arguments in scheduler.get_moves(
+                routes=greedy_routes,
+                locations=locations,
+                customer=customer,
+                neighbour=neighbour,
+            ):
+                new_routes = scheduler.apply_move(
+                    routes=greedy_routes, operator=operator, arguments=arguments
+                )
+                move_cost = scheduler.get_move_cost(
+                    routes=greedy_routes,
+                    operator=operator,
+                    arguments=arguments,
+                    distance=distance,
+                )
+
+                assert distance == pytest.approx(
+                    sum(x.distance for x in new_routes)
+                    - sum(x.distance for x in greedy_routes),
+                    abs=1e-6,
+                )
+                # Compared per component, since the lexicographic
+                # weights make the folded costs too large to compare
+                # to the last decimal.
+                old_loads, new_loads = scheduler.get_loads(
+                    routes=greedy_routes, operator=operator, arguments=arguments
+                )
+                delta = objective.get_delta(
+                    n_routes=len(new_routes) - len(greedy_routes),
+                    distance=distance,
+                    old_loads=old_loads,
+                    new_loads=new_loads,
+                )
+
+                assert delta == pytest.approx(
+                    tuple(
+                        x - y
+                        for x, y in zip(objective.evaluate(routes=new_routes), values)
+                    ),
+                    abs=1e-6,
+                )
+                assert move_cost == pytest.approx(objective.scalarize(delta))
+
+                # Moves are only generated if they keep every route
+                # feasible, the fleet size aside.
+                kinds = {
+                    x.kind for x in validator.validate_routes(new_routes).violations
+                }
+
+                assert kinds <= {"n_vehicles"}
+
+                n_moves[operator] += 1
+                n_emptying_moves += len(new_routes) < len(greedy_routes)
+
+    assert all(x > 0 for x in n_moves.values())
+    assert n_emptying_moves > 0
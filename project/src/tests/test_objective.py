@@ -0,0 +1,84 @@
+from typing import List
+
+import pytest
+
+from algorithms.instance import Instance
+from algorithms.objective import OBJECTIVE_COMPONENTS, Objective
+from algorithms.route import Route
+
+OBJECTIVES = (
+    dict(),
+    dict(components=OBJECTIVE_COMPONENTS),
+    dict(components=("distance", "concentration"), order="weighted"),
+    dict(components=OBJECTIVE_COMPONENTS, order="weighted", weights=(50, 1, 200)),
+)
+
+
+def copy_route(instance: Instance, indices: List[int]) -> Route:
+    return Route(
+        instance=instance, customers=[instance.get_customer(x) for x in indices]
+    )
+
+
+def get_changed_solutions(instance: Instance, routes: List[Route]):
+    # Solutions that share most routes with the given one, by
+    # identity, the way the schedulers build them.
+    first, second = list(routes[0].indices), list(routes[1].indices)
+
+    yield routes[2:] + [copy_route(instance, first[:-1] + second[1:])]
+    yield routes[1:] + [
+        copy_route(instance, first[:2] + [0]),
+        copy_route(instance, [0] + first[2:]),
+    ]
+    yield [copy_route(instance, second)] + routes[:1] + routes[2:]
+    yield routes[:-1]
+    yield list(routes)
+
+
+@pytest.mark.parametrize("objective_kwargs", OBJECTIVES)
+def test_delta_matches_recomputation(instance, greedy_routes, objective_kwargs):
+    objective = Objective(instance=instance, **objective_kwargs)
+    values = objective.evaluate(routes=greedy_routes)
+
+    for new_routes in get_changed_solutions(instance=instance, routes=greedy_routes):
+        delta = objective.delta(old_routes=greedy_routes, new_routes=new_routes)
+        new_values = objective.evaluate(routes=new_routes)
+
+        assert delta == pytest.approx(
+            tuple(x - y for x, y in zip(new_values, values)), abs=1e-6
+        )
+        assert objective.cost_delta(
+            old_routes=greedy_routes, new_routes=new_routes
+        ) == pytest.approx(objective.scalarize(delta))
+
+        if objective.order == "weighted":
+            assert objective.cost_delta(
+                old_routes=greedy_routes, new_routes=new_routes
+            ) == pytest.approx(
+                objective.cost(routes=new_routes)
+                - objective.cost(routes=greedy_routes),
+                abs=1e-6,
+            )
+
+
+def test_lexicographic_order_puts_vehicles_first(instance, greedy_routes):
+    objective = Objective(instance=instance)
+    first, second = list(greedy_routes[0].indices), list(greedy_routes[1].indices)
+    merged = greedy_routes[2:] + [copy_route(instance, first[:-1] + second[1:])]
+    delta = objective.delta(old_routes=greedy_routes, new_routes=merged)
+
+    assert delta[0] == -1
+    assert objective.is_improvement(delta=delta)
+    assert objective.get_key(routes=merged) < objective.get_key(routes=greedy_routes)
+    assert not objective.is_improvement(
+        delta=objective.delta(old_routes=merged, new_routes=greedy_routes)
+    )
+    assert not objective.is_improvement(
+        delta=objective.delta(old_routes=greedy_routes, new_routes=greedy_routes)
+    )
+
+    # Saving a vehicle is worth any amount of distance, and distance
+    # only counts when the number of vehicles stays the same.
+    assert objective.is_improvement(delta=(-1.0, 1000.0))
+    assert not objective.is_improvement(delta=(1.0, -1000.0))
+    assert objective.is_improvement(delta=(0.0, -0.5))
@@ -0,0 +1,121 @@
+from typing import List
+
+import numpy as np
+
+from algorithms.instance import Instance
+from algorithms.route import Route
+
+
+def get_expected_schedule(instance: Instance, indices: List[int]):
+    # The schedule of a route recomputed from scratch, without any of
+    # the propagation shortcuts Route takes.
+    arrival_times = [0]
+
+    for previous, current in zip(indices, indices[1:]):
+        arrival_times.append(
+            max(
+                int(instance.ready_times[current]),
+                arrival_times[-1]
+                + int(instance.service_times[previous])
+                + int(instance.travel_times[previous, current]),
+            )
+        )
+
+    latest_arrival_times = [int(instance.due_times[indices[-1]])]
+
+    for current, successor in zip(indices[-2::-1], indices[:0:-1]):
+        latest_arrival_times.insert(
+            0,
+            min(
+                int(instance.due_times[current]),
+                latest_arrival_times[0]
+                - int(instance.service_times[current])
+                - int(instance.travel_times[current, successor]),
+            ),
+        )
+
+    return arrival_times, latest_arrival_times
+
+
+def check_route(instance: Instance, route: Route):
+    indices = list(route.indices)
+    arrival_times, latest_arrival_times = get_expected_schedule(
+        instance=instance, indices=indices
+    )
+    demands = instance.demands[indices]
+
+    assert list(route.arrival_times) == arrival_times
+    assert list(route.latest_arrival_times) == latest_arrival_times
+    assert route.cost == int(np.sum(demands))
+    assert list(route.loads) == np.cumsum(demands).tolist()
+    assert np.isclose(
+        route.distance,
+        sum(float(instance.distances[x, y]) for x, y in zip(indices, indices[1:])),
+    )
+
+
+def test_greedy_routes_match_recomputation(instance, greedy_routes):
+    for route in greedy_routes:
+        check_route(instance=instance, route=route)
+
+
+def test_changes_propagate_like_recomputation(instance):
+    random = np.random.default_rng(0)
+    depot = instance.depot
+    route = Route(instance=instance, customers=[depot, depot])
+    outside = [x.number for x in instance.customers if x.number != 0]
+
+    for step in range(400):
+        n_inside = len(route) - 2
+
+        # Reading the loads on some steps builds the prefix cache, so
+        # both the cached and the uncached updates get checked.
+        if step % 3 == 0:
+            route.loads
+
+        if n_inside > 0 and (random.random() < 0.4 or len(outside) == 0):
+            index = int(random.integers(1, n_inside + 1))
+            outside.append(route.indices[index])
+            route.remove_stop(index=index)
+        else:
+            customer = outside.pop(int(random.integers(len(outside))))
+            route.insert_stop(
+                customer=instance.get_customer(customer),
+                index=int(random.integers(1, n_inside + 2)),
+            )
+
+        check_route(instance=instance, route=route)
+
+    rebuilt = Route(
+        instance=instance, customers=[instance.get_customer(x) for x in route.indices]
+    )
+
+    assert list(rebuilt.arrival_times) == list(route.arrival_times)
+    assert list(rebuilt.latest_arrival_times) == list(route.latest_arrival_times)
+
+
+def test_can_insert_matches_rebuilt_route(instance, greedy_routes):
+    outcomes = set()
+
+    for route in greedy_routes:
+        inside = set(route.indices)
+
+        for customer in instance.customers[1:]:
+            if customer.number in inside:
+                continue
+
+            for index in range(1, len(route)):
+                indices = list(route.indices)
+                indices.insert(index, customer.number)
+                arrival_times, _ = get_expected_schedule(
+                    instance=instance, indices=indices
+                )
+                expected = route.cost + customer.demand <= instance.vehicle_capacity
+                expected &= all(
+                    x <= instance.due_times[y] for x, y in zip(arrival_times, indices)
+                )
+
+                assert route.can_insert(customer=customer, index=index) == expected
+                outcomes.add(expected)
+
+    assert outcomes == {False, True}
@@ -0,0 +1,134 @@
+from typing import List, Set, Tuple
+
+import pytest
+
+from algorithms.instance import Instance
+from algorithms.route import Route
+from validation.engine import Validator
+
+
+@pytest.fixture(scope="module")
+def validator(instance: Instance) -> Validator:
+    return Validator.from_instance(instance)
+
+
+def get_solution(routes: List[Route]) -> Tuple[List[List[int]], List[List[int]]]:
+    return [list(x.indices) for x in routes], [list(x.arrival_times) for x in routes]
+
+
+def get_violations(validator: Validator, locations, start_times) -> Set[tuple]:
+    # The number of routes is passed as the fleet size, so only the
+    # constraints a test breaks on purpose are reported.
+    report = validator.validate(
+        locations=locations,
+        start_times=start_times,
+        n_routes=validator.n_vehicles,
+    )
+
+    return {(x.kind, x.route, x.customer) for x in report.violations}
+
+
+def test_greedy_solution_only_breaks_the_fleet_size(instance, greedy_routes, validator):
+    report = validator.validate_routes(greedy_routes)
+
+    assert len(greedy_routes) > instance.n_vehicles
+    assert [x.kind for x in report.violations] == ["n_vehicles"]
+    assert report.totals["n_vehicles"] == 1
+    assert report.n_routes == len(greedy_routes)
+    assert report.distance == pytest.approx(sum(x.distance for x in greedy_routes))
+    assert get_violations(validator, *get_solution(greedy_routes)) == set()
+
+
+def test_missing_and_duplicate_visits(greedy_routes, validator):
+    locations, start_times = get_solution(greedy_routes)
+    customer = locations[0][1]
+
+    # Leaving a customer out only makes the rest of the route earlier,
+    # so the start times stay feasible.
+    del locations[0][1], start_times[0][1]
+
+    assert get_violations(validator, locations, start_times) == {
+        ("missing_visit", None, customer)
+    }
+
+    locations[1].insert(1, customer)
+    start_times[1].insert(1, start_times[1][1])
+
+    assert ("missing_visit", None, customer) not in get_violations(
+        validator, locations, start_times
+    )
+
+    locations[2].insert(1, customer)
+    start_times[2].insert(1, start_times[2][1])
+
+    assert ("duplicate_visit", None, customer) in get_violations(
+        validator, locations, start_times
+    )
+
+
+def test_time_violations(instance, greedy_routes, validator):
+    locations, start_times = get_solution(greedy_routes)
+    customer = locations[0][1]
+
+    # Served right after its due time.
+    start_times[0][1] = int(instance.due_times[customer]) + 1
+
+    assert get_violations(validator, locations, start_times) == {
+        ("due_time", 1, customer)
+    }
+
+    # Served at the same time as the stop before it.
+    locations, start_times = get_solution(greedy_routes)
+    start_times[0][2] = start_times[0][1]
+
+    assert get_violations(validator, locations, start_times) == {
+        ("travel_time", 1, locations[0][2])
+    }
+
+    # Served before the vehicle could have got there from the depot.
+    locations, start_times = get_solution(greedy_routes)
+    start_times[1][1] = int(instance.travel_times[0, locations[1][1]]) - 1
+
+    assert get_violations(validator, locations, start_times) == {
+        ("travel_time", 2, locations[1][1])
+    }
+
+
+def test_capacity_violation(instance, greedy_routes, validator):
+    locations, start_times = get_solution(greedy_routes)
+    route = list(locations[0])
+
+    # One long route through the customers of as many routes as it
+    # takes to overload a vehicle.
+    for other in locations[1:]:
+        route = route[:-1] + other[1:]
+
+        if sum(instance.demands[route]) > instance.vehicle_capacity:
+            break
+
+    n_merged = locations.index(other)
+    locations = [route] + locations[n_merged + 1 :]
+    start_times = [
+        [0] * len(route),
+        *start_times[n_merged + 1 :],
+    ]
+
+    assert ("capacity", 1, None) in get_violations(validator, locations, start_times)
+
+
+def test_malformed_routes(greedy_routes, validator):
+    locations, start_times = get_solution(greedy_routes)
+    locations[0] = locations[0][1:]
+    start_times[0] = start_times[0][1:]
+    locations[1][1] = 1000
+    violations = get_violations(validator, locations, start_times)
+
+    assert ("depot", 1, None) in violations
+    assert ("unknown_customer", 2, 1000) in violations
+
+    report = validator.validate(
+        *get_solution(greedy_routes), distance=1.0, n_routes=validator.n_vehicles
+    )
+
+    assert report.is_valid
+    assert [x.kind for x in report.warnings] == ["distance"]
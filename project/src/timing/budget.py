@@ -0,0 +1,240 @@
+import signal
+import time
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Union
+
+CHECKPOINT_UNITS = {"s": 1, "m": 60, "h": 3600}
+INTERRUPT_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class Checkpoint:
+    __slots__ = ("_seconds",)
+
+    def __init__(self, seconds: Union[int, float]):
+        if not isinstance(seconds, (int, float)):
+            raise TypeError(
+                "Expected argument seconds to be an int or a float, instead it is "
+                f"{type(seconds)}."
+            )
+
+        if seconds < 0:
+            raise ValueError(
+                "Expected argument seconds to be non-negative, instead it is "
+                f"{seconds}."
+            )
+
+        self._seconds = seconds
+
+    @staticmethod
+    def parse(text: str) -> "Checkpoint":
+        # Accepts 10s, 5m, 1h or a plain number of seconds.
+        text = str(text).strip().lower()
+        unit = CHECKPOINT_UNITS.get(text[-1:], None)
+
+        try:
+            value = int(text[:-1] if unit is not None else text)
+        except ValueError:
+            value = 0
+
+        if value < 1:
+            raise ValueError(
+                f"Expected a checkpoint like 10s, 5m or 1h, instead got {text}."
+            )
+
+        return Checkpoint(seconds=value * (1 if unit is None else unit))
+
+    @staticmethod
+    def from_label(label: Union[int, str]) -> "Checkpoint":
+        # Inverse of label: dump keys are whole minutes unless they
+        # carry a unit.
+        label = str(label).strip()
+
+        if label.isdigit():
+            return Checkpoint(seconds=int(label) * 60)
+
+        return Checkpoint.parse(label)
+
+    # region Properties
+    @property
+    def seconds(self) -> Union[int, float]:
+        return self._seconds
+
+    @property
+    def label(self) -> Union[int, str]:
+        # Keeps dumps keyed by whole minutes the way they've always
+        # been, and only spells out the unit for the others.
+        if self._seconds % 60 == 0:
+            return int(self._seconds // 60)
+
+        return f"{self._seconds:g}s"
+
+    # endregion
+
+    # region Dunder Methods
+    def __repr__(self):
+        return f"Checkpoint({self._seconds}s)"
+
+    def __str__(self):
+        return repr(self)
+
+    def __eq__(self, other: "Checkpoint"):
+        if other is None or not isinstance(other, Checkpoint):
+            return False
+
+        return self._seconds == other._seconds
+
+    def __lt__(self, other: "Checkpoint"):
+        return self._seconds < other._seconds
+
+    def __hash__(self):
+        return hash(self._seconds)
+
+    # endregion
+
+
+class Interrupted(Exception):
+    def __init__(self, signal_number: int):
+        super().__init__(f"Interrupted by {signal.Signals(signal_number).name}.")
+
+        self.signal_number = signal_number
+
+
+@contextmanager
+def interrupt_handlers():
+    # Turns SIGINT and SIGTERM into an Interrupted exception in the
+    # main thread, so the caller can still save whatever it has
+    # before exiting. The previous handlers are restored after.
+    def handler(signal_number, _):
+        raise Interrupted(signal_number=signal_number)
+
+    previous_handlers = {x: signal.signal(x, handler) for x in INTERRUPT_SIGNALS}
+
+    try:
+        yield
+    finally:
+        for signal_number, previous_handler in previous_handlers.items():
+            signal.signal(signal_number, previous_handler)
+
+
+class TimeBudget:
+    @staticmethod
+    def _check_init_args(checkpoints: Iterable[Checkpoint], resolution: float):
+        checkpoints = sorted(set(checkpoints))
+
+        if len(checkpoints) == 0:
+            raise ValueError("Expected argument checkpoints to be non-empty.")
+
+        for checkpoint in checkpoints:
+            if not isinstance(checkpoint, Checkpoint):
+                raise TypeError(
+                    "Expected all elements of argument checkpoints to be of type "
+                    f"Checkpoint, but found an element of type {type(checkpoint)}."
+                )
+
+        resolution = float(resolution)
+
+        if resolution <= 0:
+            raise ValueError(
+                "Expected argument resolution to be positive, instead it is "
+                f"{resolution}."
+            )
+
+        return checkpoints, resolution
+
+    def __init__(self, checkpoints: Iterable[Checkpoint], resolution: float = 0.01):
+        self._checkpoints, self._resolution = self._check_init_args(
+            checkpoints=checkpoints, resolution=resolution
+        )
+
+        self._start_time = time.monotonic()
+        self._last_time = self._start_time
+        self._current_index = 0
+
+        # The clock is only read every stride calls to poll, and
+        # the stride adapts so that reads happen about once every
+        # resolution seconds, however long an iteration takes.
+        self._stride = 1
+        self._n_calls = 0
+
+    # region Properties
+    @property
+    def checkpoints(self) -> List[Checkpoint]:
+        return list(self._checkpoints)
+
+    @property
+    def current_index(self) -> int:
+        return self._current_index
+
+    @property
+    def current(self) -> Optional[Checkpoint]:
+        if self.is_finished:
+            return None
+
+        return self._checkpoints[self._current_index]
+
+    @property
+    def pending(self) -> List[Checkpoint]:
+        return self._checkpoints[self._current_index :]
+
+    @property
+    def is_finished(self) -> bool:
+        return self._current_index >= len(self._checkpoints)
+
+    @property
+    def elapsed(self) -> float:
+        return self._last_time - self._start_time
+
+    # endregion
+
+    def start(self):
+        self._start_time = time.monotonic()
+        self._last_time = self._start_time
+        self._current_index = 0
+
+    def update(self) -> float:
+        # Reads the clock and moves past every checkpoint that has
+        # been reached. Returns the elapsed time.
+        self._last_time = time.monotonic()
+        elapsed = self._last_time - self._start_time
+
+        while (
+            self._current_index < len(self._checkpoints)
+            and elapsed >= self._checkpoints[self._current_index].seconds
+        ):
+            self._current_index += 1
+
+        return elapsed
+
+    def poll(self) -> bool:
+        # Cheap enough to call every iteration. Returns whether the
+        # clock was actually read.
+        self._n_calls += 1
+
+        if self._n_calls < self._stride:
+            return False
+
+        last_time = self._last_time
+        self.update()
+
+        interval = self._last_time - last_time
+        self._stride = max(
+            1,
+            min(
+                2 * self._stride,
+                int(self._stride * self._resolution / max(interval, 1e-9)),
+            ),
+        )
+        self._n_calls = 0
+
+        return True
+
+    def expired(self) -> bool:
+        self.poll()
+
+        return self.is_finished
+
+    def remaining(self, checkpoint: Optional[Checkpoint] = None) -> float:
+        if checkpoint is None:
+            checkpoint = self._checkpoints[-1]
+
+        return max(0.0, checkpoint.seconds - (time.monotonic() - self._start_time))
@@ -0,0 +1,420 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# Columns of the customer array, same as in the instance files.
+NUMBER, X, Y, DEMAND, READY_TIME, DUE_TIME, SERVICE_TIME = range(7)
+
+VIOLATION_TYPES = (
+    "n_vehicles",
+    "unknown_customer",
+    "depot",
+    "due_time",
+    "travel_time",
+    "capacity",
+    "duplicate_visit",
+    "missing_visit",
+)
+WARNING_TYPES = ("ready_time", "distance")
+
+
+class Violation:
+    __slots__ = ("_kind", "_route", "_customer", "_message")
+
+    def __init__(
+        self, kind: str, route: Optional[int], customer: Optional[int], message: str
+    ):
+        self._kind = kind
+        self._route = route
+        self._customer = customer
+        self._message = message
+
+    # region Properties
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def route(self) -> Optional[int]:
+        return self._route
+
+    @property
+    def customer(self) -> Optional[int]:
+        return self._customer
+
+    @property
+    def message(self) -> str:
+        return self._message
+
+    # endregion
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self._kind,
+            "route": self._route,
+            "customer": self._customer,
+            "message": self._message,
+        }
+
+    # region Dunder Methods
+    def __repr__(self):
+        return f"Violation({self._kind}: {self._message})"
+
+    def __str__(self):
+        return self._message
+
+    # endregion
+
+
+class ValidationReport:
+    def __init__(
+        self,
+        violations: List[Violation],
+        warnings: List[Violation],
+        n_routes: int,
+        distance: float,
+    ):
+        self._violations = violations
+        self._warnings = warnings
+        self._n_routes = n_routes
+        self._distance = distance
+
+    # region Properties
+    @property
+    def violations(self) -> List[Violation]:
+        return self._violations
+
+    @property
+    def warnings(self) -> List[Violation]:
+        return self._warnings
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self._violations) == 0
+
+    @property
+    def n_routes(self) -> int:
+        return self._n_routes
+
+    @property
+    def distance(self) -> float:
+        return self._distance
+
+    @property
+    def totals(self) -> Dict[str, int]:
+        totals = {x: 0 for x in VIOLATION_TYPES + WARNING_TYPES}
+
+        for violation in self._violations + self._warnings:
+            totals[violation.kind] += 1
+
+        return totals
+
+    # endregion
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "valid": self.is_valid,
+            "n_routes": self._n_routes,
+            "distance": self._distance,
+            "totals": self.totals,
+            "violations": [x.as_dict() for x in self._violations],
+            "warnings": [x.as_dict() for x in self._warnings],
+        }
+
+    # region Dunder Methods
+    def __repr__(self):
+        return (
+            f"ValidationReport(valid={self.is_valid},"
+            f"violations={len(self._violations)},warnings={len(self._warnings)})"
+        )
+
+    def __str__(self):
+        return "\n".join(
+            [repr(self)] + [str(x) for x in self._violations + self._warnings]
+        )
+
+    # endregion
+
+
+class Validator:
+    @staticmethod
+    def _check_init_args(n_vehicles: int, vehicle_capacity: int, customers):
+        if not isinstance(n_vehicles, (int, np.integer)):
+            raise TypeError(
+                "Expected argument n_vehicles to be an int, instead it is "
+                f"{type(n_vehicles)}."
+            )
+
+        if not isinstance(vehicle_capacity, (int, np.integer)):
+            raise TypeError(
+                "Expected argument vehicle_capacity to be an int, instead it is "
+                f"{type(vehicle_capacity)}."
+            )
+
+        customers = np.array(customers)
+
+        if customers.ndim != 2 or customers.shape[1] != 7:
+            raise ValueError(
+                "Expected argument customers to be a 2D array with 7 columns, "
+                f"instead it has shape {customers.shape}."
+            )
+
+        if not np.any(customers[:, NUMBER] == 0):
+            raise ValueError(
+                "Expected argument customers to contain the depot (customer 0), but "
+                "it wasn't found."
+            )
+
+        return int(n_vehicles), int(vehicle_capacity), customers
+
+    def __init__(self, n_vehicles: int, vehicle_capacity: int, customers):
+        self._n_vehicles, self._vehicle_capacity, customers = self._check_init_args(
+            n_vehicles=n_vehicles,
+            vehicle_capacity=vehicle_capacity,
+            customers=customers,
+        )
+
+        # Index the customers by number once, so every lookup
+        # afterwards is a plain array access.
+        numbers = customers[:, NUMBER].astype(int)
+        self._rows = np.full(np.max(numbers) + 1, -1, dtype=int)
+        self._rows[numbers] = np.arange(len(customers))
+
+        self._customers = customers
+        self._numbers = numbers
+        self._coordinates = customers[:, [X, Y]].astype(float)
+
+    @classmethod
+    def from_instance(cls, instance) -> "Validator":
+        table = instance.table.table
+        table = table[table["number"] >= 0]
+
+        return cls(
+            n_vehicles=instance.n_vehicles,
+            vehicle_capacity=instance.vehicle_capacity,
+            customers=np.column_stack(
+                [
+                    table[x]
+                    for x in (
+                        "number",
+                        "x",
+                        "y",
+                        "demand",
+                        "ready_time",
+                        "due_time",
+                        "service_time",
+                    )
+                ]
+            ),
+        )
+
+    # region Properties
+    @property
+    def n_vehicles(self) -> int:
+        return self._n_vehicles
+
+    @property
+    def vehicle_capacity(self) -> int:
+        return self._vehicle_capacity
+
+    # endregion
+
+    def validate(
+        self,
+        locations: Sequence[Sequence[int]],
+        start_times: Sequence[Sequence[int]],
+        route_ids: Optional[Sequence[int]] = None,
+        n_routes: Optional[int] = None,
+        distance: Optional[float] = None,
+        precision: float = 0.01,
+    ) -> ValidationReport:
+        if route_ids is None:
+            route_ids = range(1, len(locations) + 1)
+
+        route_ids = np.array(list(route_ids), dtype=int)
+
+        if n_routes is None:
+            n_routes = len(locations)
+
+        violations = list()
+        warnings = list()
+
+        if n_routes > self._n_vehicles:
+            violations.append(
+                Violation(
+                    "n_vehicles",
+                    None,
+                    None,
+                    f"Maximum allowed number of vehicles is {self._n_vehicles}, but "
+                    f"found {n_routes}",
+                )
+            )
+
+        # Flatten every route into one long array, and remember
+        # which route each stop belongs to.
+        lengths = np.array([len(x) for x in locations], dtype=int)
+        stops = np.array([x for route in locations for x in route], dtype=int)
+        times = np.array([x for route in start_times for x in route], dtype=int)
+        route_of_stop = np.repeat(np.arange(len(locations)), lengths)
+
+        known = (stops >= 0) & (stops < len(self._rows))
+        known[known] = self._rows[stops[known]] >= 0
+        rows = np.where(known, self._rows[np.where(known, stops, 0)], -1)
+
+        for stop in np.flatnonzero(~known):
+            violations.append(
+                Violation(
+                    "unknown_customer",
+                    int(route_ids[route_of_stop[stop]]),
+                    int(stops[stop]),
+                    f"Vehicle on the route {route_ids[route_of_stop[stop]]} is trying "
+                    f"to visit non-existing customer with id {stops[stop]}",
+                )
+            )
+
+        for route in (
+            i for i, x in enumerate(locations) if len(x) < 2 or x[0] != 0 or x[-1] != 0
+        ):
+            violations.append(
+                Violation(
+                    "depot",
+                    int(route_ids[route]),
+                    None,
+                    f"Vehicle on the route {route_ids[route]} doesn't start/end with a "
+                    "depot",
+                )
+            )
+
+        # From here on unknown customers are skipped, the same as
+        # they would be if they weren't in the route at all.
+        customers = self._customers[np.maximum(rows, 0)]
+
+        for stop in np.flatnonzero(known & (times > customers[:, DUE_TIME])):
+            violations.append(
+                Violation(
+                    "due_time",
+                    int(route_ids[route_of_stop[stop]]),
+                    int(stops[stop]),
+                    f"Vehicle on the route {route_ids[route_of_stop[stop]]} is trying "
+                    f"to visit customer {stops[stop]} at {times[stop]} after due date "
+                    f"which is at {customers[stop, DUE_TIME]}.",
+                )
+            )
+
+        # Consecutive pairs of stops within the same route.
+        first = np.flatnonzero(route_of_stop[:-1] == route_of_stop[1:])
+        second = first + 1
+        pairs = known[first] & known[second]
+        first, second = first[pairs], second[pairs]
+
+        pair_distances = np.sqrt(
+            np.sum(
+                (self._coordinates[rows[second]] - self._coordinates[rows[first]]) ** 2,
+                axis=1,
+            )
+        )
+        service_starts = np.maximum(times[first], customers[first, READY_TIME])
+        earliest_times = (
+            service_starts
+            + customers[first, SERVICE_TIME]
+            + np.ceil(pair_distances).astype(int)
+        )
+
+        for pair in np.flatnonzero(times[first] < customers[first, READY_TIME]):
+            stop = first[pair]
+            warnings.append(
+                Violation(
+                    "ready_time",
+                    int(route_ids[route_of_stop[stop]]),
+                    int(stops[stop]),
+                    f"Vehicle on the route {route_ids[route_of_stop[stop]]} is trying "
+                    f"to start delivery service to the customer {stops[stop]} at "
+                    f"{times[stop]}, but ready time is at "
+                    f"{customers[stop, READY_TIME]}. Waiting for the ready time...",
+                )
+            )
+
+        for pair in np.flatnonzero(times[second] < earliest_times):
+            stop = second[pair]
+            violations.append(
+                Violation(
+                    "travel_time",
+                    int(route_ids[route_of_stop[stop]]),
+                    int(stops[stop]),
+                    f"Vehicle on the route {route_ids[route_of_stop[stop]]} is trying "
+                    f"to start delivery service to the customer {stops[stop]} at "
+                    f"{times[stop]}, but cannot start before {earliest_times[pair]}",
+                )
+            )
+
+        loads = np.bincount(
+            route_of_stop[known],
+            weights=customers[known, DEMAND],
+            minlength=len(locations),
+        ).astype(int)
+
+        for route in np.flatnonzero(loads > self._vehicle_capacity):
+            violations.append(
+                Violation(
+                    "capacity",
+                    int(route_ids[route]),
+                    None,
+                    f"Vehicle on the route {route_ids[route]} has total demand of "
+                    f"{loads[route]} which is greater than the vehicles capacity "
+                    f"{self._vehicle_capacity}",
+                )
+            )
+
+        visits = np.bincount(rows[known], minlength=len(self._customers))
+        visits[self._rows[0]] = max(visits[self._rows[0]], 1)
+
+        for row in np.flatnonzero(visits > 1):
+            if self._numbers[row] != 0:
+                violations.append(
+                    Violation(
+                        "duplicate_visit",
+                        None,
+                        int(self._numbers[row]),
+                        f"Customer {self._numbers[row]} is visited {visits[row]} times",
+                    )
+                )
+
+        for row in np.flatnonzero(visits == 0):
+            violations.append(
+                Violation(
+                    "missing_visit",
+                    None,
+                    int(self._numbers[row]),
+                    f"Customer {self._numbers[row]} is never visited",
+                )
+            )
+
+        total_distance = float(np.sum(pair_distances))
+
+        if distance is not None and abs(distance - total_distance) > precision:
+            warnings.append(
+                Violation(
+                    "distance",
+                    None,
+                    None,
+                    f"Distance miscalculated. Got {distance}, but should be "
+                    f"{total_distance}",
+                )
+            )
+
+        return ValidationReport(
+            violations=violations,
+            warnings=warnings,
+            n_routes=n_routes,
+            distance=total_distance,
+        )
+
+    def validate_routes(self, routes: Iterable[Any]) -> ValidationReport:
+        # Accepts anything with indices and arrival_times, e.g.
+        # the routes the schedulers produce.
+        routes = list(routes)
+
+        return self.validate(
+            locations=[list(x.indices) for x in routes],
+            start_times=[list(x.arrival_times) for x in routes],
+        )
@@ -1,26 +1,40 @@
 import json
 import logging
-import math
 import os
 from os.path import isdir, isfile
 
 import click
 import numpy as np
 
+from conversion.compiled import get_compiled_path, load_compiled_instance
+from conversion.txt_to_json import read_txt
+from validation.engine import Validator
+
 
 def parse_input(input_file):
-    def parse_customer_line(line):
-        return [int(x.strip()) for x in line.strip().split()]
+    vehicle, _, customers = read_txt(input_file)
+    return vehicle['number'], vehicle['capacity'], customers[0], customers[1:]
 
-    customers = []
-    with open(input_file) as f:
-        lines = f.readlines()
-        vehicle_number, vehicle_capacity = parse_customer_line(lines[2])
-        depot = parse_customer_line(lines[7])
-        for i in range(8, len(lines)):
-            params = parse_customer_line(lines[i])
-            customers.append(params)
-    return vehicle_number, vehicle_capacity, depot, customers
+
+def load_input(input_file):
+    # Reads the compiled instance if there already is one, so validating many
+    # solutions of an instance only parses it once. Never writes one itself.
+    try:
+        compiled_path = get_compiled_path(input_file)
+    except (FileNotFoundError, OSError, ValueError):
+        compiled_path = None
+
+    arrays = None
+    if compiled_path is not None and isfile(compiled_path):
+        arrays = load_compiled_instance(compiled_path)
+        if arrays is None:
+            logging.warning(f"Ignoring unusable compiled instance {compiled_path}")
+
+    if arrays is None:
+        return parse_input(input_file)
+
+    customers = arrays['customers']
+    return int(arrays['n_vehicles']), int(arrays['vehicle_capacity']), customers[0], customers[1:]
 
 
 def parse_output(output_file):
@@ -45,61 +59,29 @@ def parse_output(output_file):
 
 def validate_output(vehicle_number, vehicle_capacity, depot, customers, num_routes, routes, distance,
                     PRECISION_DISTANCE=0.01):
-    dist_sum = 0.0
-    if num_routes > vehicle_number:
-        logging.error(f"Maximum allowed number of vehicles is {num_routes}, but found {vehicle_number}")
-        return False
-    visited_set = set()
-    for rid, r in routes.items():
-        for loc, start_t in zip(r['locations'], r['start_ts']):
-            c = depot if loc == 0 else customers[customers[:, 0] == loc].ravel()
-            if c is None or np.size(c) == 0:
-                logging.error(f"Vehicle on the route {rid} is trying to visit non-existing customer with id {loc}")
-                return False
-            if start_t > c[5]:
-                logging.error(f"Vehicle on the route {rid} is trying to visit customer {loc} at {start_t} after due "
-                              f"date which is at {c[5]}.")
-                return False
-        for loc1, st1, loc2, st2 in list(
-                zip(r['locations'][:-1], r['start_ts'][:-1], r['locations'][1:], r['start_ts'][1:])):
-            c1 = depot if loc1 == 0 else customers[customers[:, 0] == loc1].ravel()
-            c2 = depot if loc2 == 0 else customers[customers[:, 0] == loc2].ravel()
-            if c1 is None or np.size(c1) == 0 or c2 is None or np.size(c2) == 0:
-                continue
-            if st1 < c1[4]:
-                logging.warning(f"Vehicle on the route {rid} is trying to start delivery service to the customer "
-                                f"{loc1} at {st2}, but ready time is at {c1[4]}. Waiting for the ready time...")
-                stime = c1[4]
-            else:
-                stime = st1
-            dist_s1_s2 = ((c2[2] - c1[2]) ** 2 + (c2[1] - c1[1]) ** 2) ** 0.5
-            dist_sum += dist_s1_s2
-            min_start_time = stime + c1[6] + math.ceil(dist_s1_s2)
-            if st2 < min_start_time:
-                logging.error(f"Vehicle on the route {rid} is trying to start delivery service to the customer {loc2} "
-                              f"at {st2}, but cannot start before {min_start_time}")
-                return False
-        sum_demand = 0
-        for loc in r['locations']:
-            c = depot if loc == 0 else customers[customers[:, 0] == loc].ravel()
-            sum_demand += c[3]
-            visited_set.add(c[0])
-        if sum_demand > vehicle_capacity:
-            logging.error(f"Vehicle on the route {rid} has total demand of {sum_demand} which is greater than the"
-                          f" vehicles capacity {vehicle_capacity}")
-            return False
-        if r['locations'][0] != 0 or r['locations'][-1] != 0:
-            logging.error(f"Vehicle on the route {rid} doesn't start/end with a depot")
-            return False
-    if len(visited_set) < len(customers) + 1:
-        logging.error(f"Not all of the customers are visited. Visited {len(visited_set)} out of {len(customers)} "
-                      f"customers")
-        return False
-
-    if distance > dist_sum + PRECISION_DISTANCE or distance < dist_sum - PRECISION_DISTANCE:
-        logging.warning(f"Distance miscalculated. Got {distance}, but should be {dist_sum}")
-
-    return True
+    report = get_report(vehicle_number, vehicle_capacity, depot, customers, num_routes, routes, distance,
+                        PRECISION_DISTANCE=PRECISION_DISTANCE)
+
+    for warning in report.warnings:
+        logging.warning(warning.message)
+    for violation in report.violations:
+        logging.error(violation.message)
+
+    return report.is_valid
+
+
+def get_report(vehicle_number, vehicle_capacity, depot, customers, num_routes, routes, distance,
+               PRECISION_DISTANCE=0.01):
+    engine = Validator(vehicle_number, vehicle_capacity, np.vstack((depot, customers)))
+
+    return engine.validate(
+        locations=[r['locations'] for r in routes.values()],
+        start_times=[r['start_ts'] for r in routes.values()],
+        route_ids=list(routes),
+        n_routes=num_routes,
+        distance=distance,
+        precision=PRECISION_DISTANCE,
+    )
 
 
 logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.DEBUG)
@@ -146,7 +128,7 @@ def validator(**parameters):
             logging.info(f"instances_path = {hmo_in} ({os.path.abspath(hmo_in)})")
             logging.info(f"routes_path = {hmo_out} ({os.path.abspath(hmo_out)})")
 
-            vehicle_number, vehicle_capacity, depot, customers = parse_input(hmo_in)
+            vehicle_number, vehicle_capacity, depot, customers = load_input(hmo_in)
             depot = np.array(depot)
             customers = np.array(customers)
             locations = np.vstack((depot, customers))